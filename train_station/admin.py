@@ -7,8 +7,11 @@ from .models import (
     Train,
     Route,
     Journey,
+    JourneySchedule,
     Ticket,
     Order,
+    RequestProfile,
+    SlowQuery,
 )
 
 admin.site.register(Crew)
@@ -17,5 +20,8 @@ admin.site.register(TrainType)
 admin.site.register(Train)
 admin.site.register(Route)
 admin.site.register(Journey)
+admin.site.register(JourneySchedule)
 admin.site.register(Ticket)
 admin.site.register(Order)
+admin.site.register(RequestProfile)
+admin.site.register(SlowQuery)
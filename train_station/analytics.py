@@ -0,0 +1,240 @@
+from datetime import timedelta
+
+import numpy as np
+from django.core.cache import cache
+from django.utils import timezone
+
+from train_station.metrics import record_cache_lookups
+from train_station.models import (
+    ArchivedJourney,
+    ArchivedTicket,
+    Journey,
+    Route,
+    Ticket,
+    TrainType,
+)
+
+DAY_CACHE_KEY = "analytics_day_%s"
+PAST_DAY_CACHE_TIMEOUT = 24 * 60 * 60
+OPEN_DAY_CACHE_TIMEOUT = 5 * 60
+MAX_LEAD_DAYS = 90
+MAX_REPORT_DAYS = 366
+GROUP_BY_CHOICES = ("route", "train_type", "day")
+
+JOURNEY_COLUMNS = (
+    "id",
+    "route_id",
+    "train__train_type_id",
+    "train__cargo_number",
+    "train__places_in_cargo",
+)
+
+
+def empty_bucket():
+    return {
+        "journey_id": np.empty(0, dtype=np.int64),
+        "route_id": np.empty(0, dtype=np.int64),
+        "train_type_id": np.empty(0, dtype=np.int64),
+        "cargo_number": np.empty(0, dtype=np.int64),
+        "places_in_cargo": np.empty(0, dtype=np.int64),
+        "day": np.empty(0, dtype="datetime64[D]"),
+        "ticket_journey_id": np.empty(0, dtype=np.int64),
+        "ticket_cargo": np.empty(0, dtype=np.int64),
+        "ticket_lead_days": np.empty(0, dtype=np.int64),
+    }
+
+
+def fetch_day_buckets(days):
+    """
+    Loads journeys departing on `days` and their tickets, live and
+    archived, as columnar arrays with one query per table, and splits
+    them into one bucket per day.
+    """
+    journey_rows = []
+    ticket_rows = []
+    for journey_model, ticket_model in (
+        (Journey, Ticket),
+        (ArchivedJourney, ArchivedTicket),
+    ):
+        journey_rows += journey_model.objects.filter(
+            departure_time__date__in=days
+        ).values_list(*JOURNEY_COLUMNS, "departure_time__date")
+        ticket_rows += ticket_model.objects.filter(
+            journey__departure_time__date__in=days
+        ).values_list("journey_id", "cargo", "order__created_at__date")
+
+    journeys = np.array(journey_rows, dtype=object).reshape(
+        -1, len(JOURNEY_COLUMNS) + 1
+    )
+    journeys = journeys[np.argsort(journeys[:, 0].astype(np.int64))]
+    departure_day = journeys[:, -1].astype("datetime64[D]")
+    journeys = journeys[:, :-1].astype(np.int64)
+
+    tickets = np.array(ticket_rows, dtype=object).reshape(-1, 3)
+    ticket_journey_id = tickets[:, 0].astype(np.int64)
+    ticket_day = departure_day[
+        np.searchsorted(journeys[:, 0], ticket_journey_id)
+    ]
+    ticket_lead_days = (
+        ticket_day - tickets[:, 2].astype("datetime64[D]")
+    ).astype(np.int64)
+
+    buckets = {}
+    for day in days:
+        day64 = np.datetime64(day, "D")
+        in_day = departure_day == day64
+        tickets_in_day = ticket_day == day64
+        buckets[day] = {
+            "journey_id": journeys[in_day, 0],
+            "route_id": journeys[in_day, 1],
+            "train_type_id": journeys[in_day, 2],
+            "cargo_number": journeys[in_day, 3],
+            "places_in_cargo": journeys[in_day, 4],
+            "day": departure_day[in_day],
+            "ticket_journey_id": ticket_journey_id[tickets_in_day],
+            "ticket_cargo": tickets[tickets_in_day, 1].astype(np.int64),
+            "ticket_lead_days": ticket_lead_days[tickets_in_day],
+        }
+
+    return buckets
+
+
+def load_days(start, end):
+    days = [start + timedelta(days=n) for n in range((end - start).days + 1)]
+    cached = cache.get_many([DAY_CACHE_KEY % day for day in days])
+    buckets = {
+        day: cached[DAY_CACHE_KEY % day]
+        for day in days
+        if DAY_CACHE_KEY % day in cached
+    }
+    missing = [day for day in days if day not in buckets]
+    record_cache_lookups("analytics_day", len(buckets), len(missing))
+
+    if missing:
+        fetched = fetch_day_buckets(missing)
+        today = timezone.localdate()
+        for timeout, is_past in (
+            (PAST_DAY_CACHE_TIMEOUT, True),
+            (OPEN_DAY_CACHE_TIMEOUT, False),
+        ):
+            cache.set_many(
+                {
+                    DAY_CACHE_KEY % day: bucket
+                    for day, bucket in fetched.items()
+                    if (day < today) == is_past
+                },
+                timeout,
+            )
+        buckets.update(fetched)
+
+    merged = empty_bucket()
+    for column in merged:
+        merged[column] = np.concatenate(
+            [merged[column]] + [buckets[day][column] for day in days]
+        )
+
+    return merged
+
+
+def load_factor(data, group_by):
+    capacity = data["cargo_number"] * data["places_in_cargo"]
+    sold = np.zeros(len(data["journey_id"]), dtype=np.int64)
+    if len(data["ticket_journey_id"]):
+        # Days are merged in order, so journey ids are only sorted per day.
+        order = np.argsort(data["journey_id"])
+        journey_index = order[
+            np.searchsorted(
+                data["journey_id"][order], data["ticket_journey_id"]
+            )
+        ]
+        sold = np.bincount(journey_index, minlength=len(sold))
+
+    group_column = {
+        "route": data["route_id"],
+        "train_type": data["train_type_id"],
+        "day": data["day"],
+    }[group_by]
+    keys, inverse = np.unique(group_column, return_inverse=True)
+    group_sold = np.bincount(inverse, weights=sold, minlength=len(keys))
+    group_capacity = np.bincount(
+        inverse, weights=capacity, minlength=len(keys)
+    )
+    group_journeys = np.bincount(inverse, minlength=len(keys))
+
+    return keys, group_journeys, group_sold, group_capacity
+
+
+def sell_out_curve(data, max_lead_days=MAX_LEAD_DAYS):
+    """
+    Share of capacity sold by each number of days before departure.
+    """
+    total_capacity = np.sum(data["cargo_number"] * data["places_in_cargo"])
+    lead_days = np.clip(data["ticket_lead_days"], 0, max_lead_days)
+    sold_on_day = np.bincount(lead_days, minlength=max_lead_days + 1)
+    sold_by_day = np.cumsum(sold_on_day[::-1])[::-1]
+
+    return sold_by_day / max(total_capacity, 1)
+
+
+def car_fill_rate(data):
+    """
+    Fill rate of each car position, over the journeys that have that car.
+    """
+    if not len(data["cargo_number"]):
+        return np.empty(0)
+
+    places_by_car_count = np.bincount(
+        data["cargo_number"], weights=data["places_in_cargo"]
+    )
+    # Capacity of car n sums the journeys with at least n cars.
+    car_capacity = np.cumsum(places_by_car_count[::-1])[::-1][1:]
+    car_sold = np.bincount(
+        data["ticket_cargo"], minlength=len(car_capacity) + 1
+    )[1:]
+
+    return car_sold / np.maximum(car_capacity, 1)
+
+
+def group_labels(group_by, keys):
+    if group_by == "day":
+        return [str(key) for key in keys]
+    if group_by == "route":
+        routes = Route.objects.select_related("source", "destination").in_bulk(
+            keys.tolist()
+        )
+        return [str(routes[key]) for key in keys.tolist()]
+
+    train_types = TrainType.objects.in_bulk(keys.tolist())
+    return [train_types[key].name for key in keys.tolist()]
+
+
+def occupancy_report(start, end, group_by="route"):
+    data = load_days(start, end)
+    keys, journeys, sold, capacity = load_factor(data, group_by)
+    labels = group_labels(group_by, keys)
+
+    return {
+        "start": start,
+        "end": end,
+        "group_by": group_by,
+        "load_factor": [
+            {
+                "group": label,
+                "journeys": int(journey_count),
+                "tickets_sold": int(group_sold),
+                "capacity": int(group_capacity),
+                "load_factor": round(group_sold / max(group_capacity, 1), 4),
+            }
+            for label, journey_count, group_sold, group_capacity in zip(
+                labels, journeys, sold, capacity
+            )
+        ],
+        "sell_out_curve": [
+            {"days_before_departure": days, "share_sold": round(share, 4)}
+            for days, share in enumerate(sell_out_curve(data).tolist())
+        ],
+        "car_fill_rate": [
+            {"cargo": cargo, "fill_rate": round(rate, 4)}
+            for cargo, rate in enumerate(car_fill_rate(data).tolist(), 1)
+        ],
+    }
@@ -0,0 +1,78 @@
+from django.db import transaction
+
+from train_station.models import (
+    ArchivedJourney,
+    ArchivedTicket,
+    BoardEntry,
+    Journey,
+    Ticket,
+)
+
+JOURNEY_FIELDS = (
+    "id",
+    "route_id",
+    "train_id",
+    "departure_time",
+    "arrival_time",
+)
+TICKET_FIELDS = ("id", "cargo", "seat", "journey_id", "order_id")
+
+
+def archive_batch(cutoff, batch_size):
+    """
+    Moves up to `batch_size` journeys that arrived before `cutoff`, with
+    their tickets and crew links, to the archive tables in one
+    transaction. Returns the number of journeys moved.
+    """
+    with transaction.atomic():
+        journeys = list(
+            Journey.objects.select_for_update(skip_locked=True)
+            .filter(arrival_time__lt=cutoff)
+            .order_by("id")
+            .values(*JOURNEY_FIELDS)[:batch_size]
+        )
+        if not journeys:
+            return 0
+
+        journey_ids = [journey["id"] for journey in journeys]
+        crew_links = Journey.crew.through.objects.filter(
+            journey_id__in=journey_ids
+        )
+        tickets = Ticket.objects.filter(journey_id__in=journey_ids)
+
+        ArchivedJourney.objects.bulk_create(
+            [ArchivedJourney(**journey) for journey in journeys]
+        )
+        ArchivedJourney.crew.through.objects.bulk_create(
+            [
+                ArchivedJourney.crew.through(
+                    archivedjourney_id=journey_id, crew_id=crew_id
+                )
+                for journey_id, crew_id in crew_links.values_list(
+                    "journey_id", "crew_id"
+                )
+            ]
+        )
+        ArchivedTicket.objects.bulk_create(
+            [
+                ArchivedTicket(**ticket)
+                for ticket in tickets.values(*TICKET_FIELDS)
+            ]
+        )
+
+        # Departed journeys have no board rows to keep in sync, so the
+        # tickets skip the per-row delete signals.
+        tickets._raw_delete(tickets.db)
+        crew_links.delete()
+        BoardEntry.objects.filter(journey_id__in=journey_ids).delete()
+        Journey.objects.filter(id__in=journey_ids).delete()
+
+    return len(journeys)
+
+
+def archive_journeys(cutoff, batch_size=500):
+    archived = 0
+    while moved := archive_batch(cutoff, batch_size):
+        archived += moved
+
+    return archived
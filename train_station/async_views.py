@@ -0,0 +1,238 @@
+import json
+from functools import wraps
+from types import SimpleNamespace
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, F
+from django.http import JsonResponse
+from rest_framework import status
+from rest_framework.exceptions import (
+    APIException,
+    MethodNotAllowed,
+    NotAuthenticated,
+    NotFound,
+    PermissionDenied,
+    Throttled,
+    ValidationError,
+)
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+
+from train_station.geocoding import areverse_geocode
+from train_station.models import Journey, Ticket
+from train_station.pagintation import JourneyPagination
+from train_station.serializers import (
+    JourneyDetailSerializer,
+    JourneyListSerializer,
+    StationSerializer,
+)
+from train_station.views import filter_journeys
+from user.authentication import ClaimsJWTAuthentication
+
+journey_queryset = (
+    Journey.objects.all()
+    .select_related("route__source", "route__destination", "train")
+    .prefetch_related("crew")
+    .annotate(
+        tickets_available=(
+            F("train__cargo_number") * F("train__places_in_cargo")
+            - Count("tickets")
+        )
+    )
+)
+
+journey_detail_queryset = Journey.objects.select_related(
+    "route__source", "route__destination", "train__train_type"
+).prefetch_related("crew", "tickets")
+
+
+def json_response(data, status_code=status.HTTP_200_OK):
+    return JsonResponse(
+        data, status=status_code, encoder=JSONEncoder, safe=False
+    )
+
+
+def error_response(exc):
+    if isinstance(exc.detail, (list, dict)):
+        response = json_response(exc.detail, exc.status_code)
+    else:
+        response = json_response({"detail": exc.detail}, exc.status_code)
+    if getattr(exc, "wait", None):
+        response["Retry-After"] = "%d" % exc.wait
+
+    return response
+
+
+async def authenticate(request):
+    try:
+        user_auth = await sync_to_async(
+            ClaimsJWTAuthentication().authenticate
+        )(request)
+    except (AuthenticationFailed, InvalidToken):
+        return None
+
+    return user_auth[0] if user_auth else None
+
+
+async def check_throttles(request, view):
+    for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES:
+        throttle = throttle_class()
+        if not await sync_to_async(throttle.allow_request)(request, view):
+            raise Throttled(throttle.wait())
+
+
+def async_api_view(staff_only_methods=(), throttle_scope=None):
+    """
+    Wraps an async view with the JWT authentication,
+    `IsAdminOrIfAuthenticatedReadOnly` rules and default throttles of the
+    DRF viewsets; `throttle_scope` works like an entry of their
+    `throttle_scopes`.
+    """
+
+    def decorator(view):
+        throttle_view = SimpleNamespace(
+            action=view.__name__,
+            throttle_scopes=(
+                {view.__name__: throttle_scope} if throttle_scope else {}
+            ),
+        )
+
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            try:
+                request.user = await authenticate(request)
+                if request.user is None:
+                    raise NotAuthenticated()
+                if (
+                    request.method in staff_only_methods
+                    and not request.user.is_staff
+                ):
+                    raise PermissionDenied()
+                await check_throttles(request, throttle_view)
+
+                return await view(request, *args, **kwargs)
+            except APIException as exc:
+                return error_response(exc)
+
+        wrapper.csrf_exempt = True
+        return wrapper
+
+    return decorator
+
+
+async def paginate(request, queryset, pagination_class):
+    page_size = pagination_class.page_size
+    try:
+        page_size = min(
+            int(request.GET[pagination_class.page_size_query_param]),
+            pagination_class.max_page_size,
+        )
+    except (KeyError, ValueError):
+        pass
+    try:
+        page_number = max(int(request.GET.get("page", 1)), 1)
+    except ValueError:
+        page_number = 1
+
+    count = await queryset.acount()
+    offset = (page_number - 1) * page_size
+    page = [obj async for obj in queryset[offset : offset + page_size]]
+
+    url = request.build_absolute_uri()
+    next_url = None
+    previous_url = None
+    if offset + page_size < count:
+        next_url = replace_query_param(url, "page", page_number + 1)
+    if page_number == 2:
+        previous_url = remove_query_param(url, "page")
+    elif page_number > 2:
+        previous_url = replace_query_param(url, "page", page_number - 1)
+
+    return {
+        "count": count,
+        "next": next_url,
+        "previous": previous_url,
+    }, page
+
+
+@async_api_view(throttle_scope="journey_search")
+async def journey_list(request):
+    # Resolving station names may rebuild the index from the database.
+    queryset = await sync_to_async(filter_journeys)(
+        journey_queryset, request.GET
+    )
+    queryset = queryset.order_by("id")
+    data, page = await paginate(request, queryset, JourneyPagination)
+    data["results"] = JourneyListSerializer(page, many=True).data
+
+    return json_response(data)
+
+
+@async_api_view()
+async def journey_detail(request, pk):
+    journey = await journey_detail_queryset.filter(pk=pk).afirst()
+    if journey is None:
+        raise NotFound()
+
+    return json_response(JourneyDetailSerializer(journey).data)
+
+
+@async_api_view()
+async def journey_seats(request, pk):
+    journey = await (
+        Journey.objects.select_related("train").filter(pk=pk).afirst()
+    )
+    if journey is None:
+        raise NotFound()
+
+    taken = {cargo: [] for cargo in range(1, journey.train.cargo_number + 1)}
+    async for cargo, seat in (
+        Ticket.objects.filter(
+            journey_id=pk, departure_time=journey.departure_time
+        )
+        .order_by("cargo", "seat")
+        .values_list("cargo", "seat")
+    ):
+        taken[cargo].append(seat)
+
+    return json_response(
+        {
+            "journey": journey.id,
+            "places_in_cargo": journey.train.places_in_cargo,
+            "cargos": [
+                {
+                    "cargo": cargo,
+                    "taken_seats": seats,
+                    "seats_available": (
+                        journey.train.places_in_cargo - len(seats)
+                    ),
+                }
+                for cargo, seats in taken.items()
+            ],
+        }
+    )
+
+
+@async_api_view(staff_only_methods=("POST",))
+async def station_create(request):
+    if request.method != "POST":
+        raise MethodNotAllowed(request.method)
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        raise ValidationError({"detail": "Request body should be JSON."})
+
+    serializer = StationSerializer(data=payload)
+    await sync_to_async(serializer.is_valid)(raise_exception=True)
+    address = await areverse_geocode(
+        serializer.validated_data["latitude"],
+        serializer.validated_data["longitude"],
+    )
+    await sync_to_async(serializer.save)(address=address)
+
+    return json_response(serializer.data, status.HTTP_201_CREATED)
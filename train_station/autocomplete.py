@@ -0,0 +1,213 @@
+import threading
+import unicodedata
+
+from django.db.models import F
+
+from train_station.models import Station, StationIndexVersion
+
+INDEX_VERSION_ID = 1
+NAME = 0
+CITY = 1
+
+
+def normalize(text):
+    """Lowercases `text`, strips accents and turns punctuation to spaces."""
+    characters = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(
+        character if character.isalnum() else " "
+        for character in characters
+        if not unicodedata.combining(character)
+    )
+
+    return " ".join(text.split())
+
+
+def max_typos(length):
+    if length < 4:
+        return 0
+    if length < 8:
+        return 1
+    return 2
+
+
+def next_row(query, rows, characters):
+    """
+    Extends the edit distances of `query` prefixes to a term prefix by
+    one more character, given the rows and the last two characters of
+    the term prefix. Swapping two adjacent characters is one typo.
+    """
+    row = rows[-1]
+    character = characters[-1]
+    new_row = [row[0] + 1]
+    for index, query_character in enumerate(query, start=1):
+        distance = min(
+            row[index] + 1,
+            new_row[index - 1] + 1,
+            row[index - 1] + (query_character != character),
+        )
+        if (
+            index > 1
+            and len(rows) > 1
+            and query_character == characters[0]
+            and query[index - 2] == character
+        ):
+            distance = min(distance, rows[0][index - 2] + 1)
+        new_row.append(distance)
+
+    return new_row
+
+
+class TrieNode:
+    __slots__ = ("children", "matches")
+
+    def __init__(self):
+        self.children = {}
+        self.matches = set()
+
+
+class StationIndex:
+    """
+    Prefix trie over the normalized names and cities of stations, and
+    over each of their words, searched with a bounded edit distance.
+    """
+
+    def __init__(self, rows, version=None):
+        self.version = version
+        self.root = TrieNode()
+        self.stations = {}
+        for station_id, name, city in rows:
+            self.stations[station_id] = (name, city)
+            for field, value in ((NAME, name), (CITY, city)):
+                for term in self.terms(value):
+                    self.add(term, (station_id, field))
+
+    @staticmethod
+    def terms(value):
+        value = normalize(value or "")
+        if not value:
+            return set()
+
+        return {value, *value.split()}
+
+    def add(self, term, match):
+        node = self.root
+        for character in term:
+            node = node.children.setdefault(character, TrieNode())
+        node.matches.add(match)
+
+    @staticmethod
+    def collect(node, typos, found):
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for station_id, field in node.matches:
+                found[station_id] = min(
+                    found.get(station_id, (typos, field)), (typos, field)
+                )
+            stack.extend(node.children.values())
+
+    def match(self, query):
+        """
+        Returns `{station_id: (typos, field)}` for stations with a term
+        starting with `query`, allowing a few typos in longer queries.
+        """
+        query = normalize(query)
+        limit = max_typos(len(query))
+        found = {}
+        if not query:
+            return found
+
+        first_row = list(range(len(query) + 1))
+        stack = [(self.root, (first_row,), "", first_row[-1])]
+        while stack:
+            node, rows, previous, best = stack.pop()
+            for character, child in node.children.items():
+                characters = previous + character
+                child_row = next_row(query, rows, characters)
+                child_best = min(best, child_row[-1])
+                if min(child_row) <= limit:
+                    if child_best <= limit:
+                        for station_id, field in child.matches:
+                            found[station_id] = min(
+                                found.get(station_id, (child_best, field)),
+                                (child_best, field),
+                            )
+                    stack.append(
+                        (child, (rows[-1], child_row), character, child_best)
+                    )
+                elif child_best <= limit:
+                    # The whole query matched a shorter prefix already.
+                    self.collect(child, child_best, found)
+
+        return found
+
+    def suggest(self, query, limit=10):
+        found = self.match(query)
+        ranked = sorted(
+            found,
+            key=lambda station_id: (
+                found[station_id],
+                len(self.stations[station_id][0]),
+                self.stations[station_id][0],
+            ),
+        )
+
+        return [
+            {
+                "id": station_id,
+                "name": self.stations[station_id][0],
+                "city": self.stations[station_id][1],
+            }
+            for station_id in ranked[:limit]
+        ]
+
+    def resolve(self, query):
+        """Ids of the stations matching `query` with the fewest typos."""
+        found = self.match(query)
+        if not found:
+            return set()
+
+        fewest = min(typos for typos, _ in found.values())
+        return {
+            station_id
+            for station_id, (typos, _) in found.items()
+            if typos == fewest
+        }
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def index_version():
+    version = StationIndexVersion.objects.filter(pk=INDEX_VERSION_ID)
+
+    return version.values_list("version", flat=True).first() or 0
+
+
+def bump_index_version():
+    """
+    Makes every worker rebuild its index once the current transaction
+    commits. Concurrent bumps wait for each other on the version row.
+    """
+    version = StationIndexVersion.objects.filter(pk=INDEX_VERSION_ID)
+    if not version.update(version=F("version") + 1):
+        StationIndexVersion.objects.get_or_create(pk=INDEX_VERSION_ID)
+        version.update(version=F("version") + 1)
+
+
+def get_station_index():
+    global _index
+
+    version = index_version()
+    index = _index
+    if index is None or index.version != version:
+        with _index_lock:
+            if _index is None or _index.version != version:
+                _index = StationIndex(
+                    Station.objects.values_list("id", "name", "address__city"),
+                    version,
+                )
+            index = _index
+
+    return index
@@ -0,0 +1,74 @@
+from django.db.models import Count, F
+
+from train_station.models import BoardEntry, Journey
+
+BOARD_FIELDS = (
+    "time",
+    "source_name",
+    "destination_name",
+    "train_name",
+    "train_type_name",
+    "departure_time",
+    "arrival_time",
+    "seats_left",
+)
+
+
+def board_journeys():
+    return Journey.objects.select_related(
+        "route__source", "route__destination", "train__train_type"
+    ).annotate(tickets_sold=Count("tickets"))
+
+
+def build_board_entries(journey):
+    route = journey.route
+    train = journey.train
+    summary = {
+        "source_name": route.source.name,
+        "destination_name": route.destination.name,
+        "train_name": train.name,
+        "train_type_name": train.train_type.name,
+        "departure_time": journey.departure_time,
+        "arrival_time": journey.arrival_time,
+        "seats_left": train.capacity - journey.tickets_sold,
+    }
+
+    return [
+        BoardEntry(
+            journey=journey,
+            station=route.source,
+            kind=BoardEntry.DEPARTURE,
+            time=journey.departure_time,
+            **summary,
+        ),
+        BoardEntry(
+            journey=journey,
+            station=route.destination,
+            kind=BoardEntry.ARRIVAL,
+            time=journey.arrival_time,
+            **summary,
+        ),
+    ]
+
+
+def refresh_journey_boards(journey_ids, batch_size=1000):
+    """
+    Rewrites the board rows of the given journeys in one upsert.
+    """
+    entries = []
+    for journey in board_journeys().filter(id__in=journey_ids):
+        entries += build_board_entries(journey)
+
+    BoardEntry.objects.bulk_create(
+        entries,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=("journey", "kind"),
+        update_fields=("station",) + BOARD_FIELDS,
+    )
+
+
+def adjust_seats_left(journey_id, delta):
+    BoardEntry.objects.filter(journey_id=journey_id).update(
+        seats_left=F("seats_left") + delta
+    )
@@ -0,0 +1,210 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
+
+MAX_BULK_ITEMS = 1000
+
+
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Looks related objects up in `prefetched` when `BulkListSerializer`
+    loaded them for the whole payload, and in the database otherwise.
+    """
+
+    prefetched = None
+
+    def to_internal_value(self, data):
+        if self.prefetched is None:
+            return super().to_internal_value(data)
+
+        try:
+            pk = self.get_queryset().model._meta.pk.to_python(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if pk not in self.prefetched:
+            self.fail("does_not_exist", pk_value=data)
+
+        return self.prefetched[pk]
+
+
+class BulkCreateSerializerMixin:
+    """
+    Model serializer that can be validated and saved as a list.
+
+    Inside a `BulkListSerializer`, uniqueness is checked for the whole
+    list instead of once per item, and `bulk_create` writes all items.
+    """
+
+    serializer_related_field = PrefetchedPrimaryKeyRelatedField
+
+    @property
+    def in_bulk(self):
+        return isinstance(self.parent, BulkListSerializer)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.in_bulk:
+            for field in fields.values():
+                field.validators = [
+                    validator
+                    for validator in field.validators
+                    if not isinstance(validator, UniqueValidator)
+                ]
+
+        return fields
+
+    def get_validators(self):
+        validators = super().get_validators()
+        if self.in_bulk:
+            validators = [
+                validator
+                for validator in validators
+                if not isinstance(validator, UniqueTogetherValidator)
+            ]
+
+        return validators
+
+    def bulk_create(self, validated_data):
+        model = self.Meta.model
+
+        return model.objects.bulk_create(
+            [model(**attrs) for attrs in validated_data]
+        )
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """
+    Validates every item and reports errors per item, in payload order,
+    with `{}` for valid items. Related objects are loaded with one query
+    per field and unique fields are checked with one query per
+    constraint.
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not data:
+            self.fail("empty")
+        if len(data) > MAX_BULK_ITEMS:
+            raise ValidationError(
+                {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        f"At most {MAX_BULK_ITEMS} items can be created at "
+                        "once."
+                    ]
+                }
+            )
+
+        related_fields = self.prefetch_related_objects(data)
+        validated_data = []
+        errors = []
+        try:
+            for item in data:
+                try:
+                    validated_data.append(self.child.run_validation(item))
+                    errors.append({})
+                except ValidationError as exc:
+                    validated_data.append(None)
+                    errors.append(exc.detail)
+        finally:
+            for field in related_fields:
+                field.prefetched = None
+
+        for index, error in self.unique_errors(validated_data):
+            errors[index] = error
+        if any(errors):
+            raise ValidationError(errors)
+
+        return validated_data
+
+    def prefetch_related_objects(self, data):
+        related_fields = [
+            field
+            for field in self.child.fields.values()
+            if isinstance(field, PrefetchedPrimaryKeyRelatedField)
+            and not field.read_only
+        ]
+
+        for field in related_fields:
+            pk_field = field.get_queryset().model._meta.pk
+            pks = set()
+            for item in data:
+                if not isinstance(item, dict) or field.field_name not in item:
+                    continue
+                try:
+                    pks.add(pk_field.to_python(item[field.field_name]))
+                except (TypeError, ValueError, DjangoValidationError):
+                    pass
+            field.prefetched = field.get_queryset().in_bulk(pks)
+
+        return related_fields
+
+    def unique_errors(self, validated_data):
+        """Yields `(index, error)` for items that break a unique constraint."""
+        model = self.child.Meta.model
+        constraints = [
+            (field.name,)
+            for field in model._meta.fields
+            if field.unique and not field.primary_key
+        ]
+        constraints += [
+            tuple(fields) for fields in model._meta.unique_together
+        ]
+
+        for names in constraints:
+            fields = [model._meta.get_field(name) for name in names]
+            items = {
+                index: tuple(
+                    getattr(attrs[name], "pk", attrs[name]) for name in names
+                )
+                for index, attrs in enumerate(validated_data)
+                if attrs is not None and all(name in attrs for name in names)
+            }
+            if not items:
+                continue
+
+            existing = set(
+                model.objects.filter(
+                    **{
+                        f"{field.attname}__in": {
+                            key[i] for key in items.values()
+                        }
+                        for i, field in enumerate(fields)
+                    }
+                ).values_list(*(field.attname for field in fields))
+            )
+            seen = set()
+            for index, key in items.items():
+                if key in existing or key in seen:
+                    yield index, self.unique_error(names)
+                seen.add(key)
+
+    @staticmethod
+    def unique_error(names):
+        if len(names) == 1:
+            return {names[0]: [UniqueValidator.message]}
+
+        return {
+            api_settings.NON_FIELD_ERRORS_KEY: [
+                UniqueTogetherValidator.message.format(
+                    field_names=", ".join(names)
+                )
+            ]
+        }
+
+    def create(self, validated_data):
+        with transaction.atomic():
+            return self.child.bulk_create(validated_data)
+
+
+class BulkCreateMixin:
+    """Lets `create` accept a list of objects as well as a single one."""
+
+    def get_serializer(self, *args, **kwargs):
+        if isinstance(kwargs.get("data"), list):
+            kwargs["many"] = True
+
+        return super().get_serializer(*args, **kwargs)
@@ -0,0 +1,176 @@
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count
+
+from train_station.geo import geodesic_kilometers
+from train_station.models import Journey, Ticket
+
+CENT = Decimal("0.01")
+
+JOURNEY_COLUMNS = (
+    "id",
+    "route__source__latitude",
+    "route__source__longitude",
+    "route__destination__latitude",
+    "route__destination__longitude",
+    "train__train_type__name",
+    "train__cargo_number",
+    "train__places_in_cargo",
+)
+
+
+def load_fare_inputs(journey_ids):
+    """
+    Loads what the fares of `journey_ids` depend on in one query, as
+    arrays sorted by journey id.
+    """
+    rows = (
+        Journey.objects.filter(id__in=set(journey_ids))
+        .order_by("id")
+        .values_list(*JOURNEY_COLUMNS)
+        .annotate(sold=Count("tickets"))
+    )
+    ids = []
+    distances = []
+    train_types = []
+    cargo_numbers = []
+    places_in_cargo = []
+    sold = []
+    for (
+        journey_id,
+        source_latitude,
+        source_longitude,
+        destination_latitude,
+        destination_longitude,
+        train_type,
+        cargo_number,
+        places,
+        journey_sold,
+    ) in rows:
+        ids.append(journey_id)
+        distances.append(
+            geodesic_kilometers(
+                (source_latitude, source_longitude),
+                (destination_latitude, destination_longitude),
+            )
+        )
+        train_types.append(train_type)
+        cargo_numbers.append(cargo_number)
+        places_in_cargo.append(places)
+        sold.append(journey_sold)
+
+    return {
+        "id": np.array(ids, dtype=np.int64),
+        "distance": np.array(distances, dtype=np.float64),
+        "train_type": train_types,
+        "cargo_number": np.array(cargo_numbers, dtype=np.int64),
+        "places_in_cargo": np.array(places_in_cargo, dtype=np.int64),
+        "sold": np.array(sold, dtype=np.int64),
+    }
+
+
+def compute_fares(distance, train_types, load, tariff=None):
+    """
+    Prices journeys from their distance in kilometers, train type name
+    and share of seats sold: every kilometer is charged at the rate of
+    its distance band, then the train type multiplier and the surge of
+    the highest load threshold reached apply.
+    """
+    tariff = tariff or settings.FARE_TARIFF
+    upper = np.array(
+        [np.inf if bound is None else bound for bound, _ in tariff["bands"]],
+        dtype=np.float64,
+    )
+    lower = np.concatenate(([0.0], upper[:-1]))
+    rates = np.array([rate for _, rate in tariff["bands"]], dtype=np.float64)
+    band_kilometers = np.clip(distance[:, None] - lower, 0, upper - lower)
+    base = (band_kilometers * rates).sum(axis=1)
+
+    multipliers = tariff["train_type_multipliers"]
+    train_type_multiplier = np.array(
+        [multipliers.get(name, 1.0) for name in train_types],
+        dtype=np.float64,
+    )
+    thresholds = np.array([share for share, _ in tariff["surge"]])
+    surges = np.array([1.0] + [surge for _, surge in tariff["surge"]])
+    surge = surges[np.searchsorted(thresholds, load, side="right")]
+
+    fares = np.maximum(base * train_type_multiplier * surge, tariff["minimum"])
+    return np.round(fares, 2)
+
+
+def to_decimal(fare):
+    return Decimal(repr(fare)).quantize(CENT)
+
+
+def journey_fares(inputs):
+    capacity = np.maximum(
+        inputs["cargo_number"] * inputs["places_in_cargo"], 1
+    )
+
+    return compute_fares(
+        inputs["distance"], inputs["train_type"], inputs["sold"] / capacity
+    )
+
+
+def quote_journeys(journey_ids):
+    """Returns the current fare of each of `journey_ids` by id."""
+    inputs = load_fare_inputs(journey_ids)
+    fares = journey_fares(inputs)
+
+    return {
+        journey_id: to_decimal(fare)
+        for journey_id, fare in zip(inputs["id"].tolist(), fares.tolist())
+    }
+
+
+def quote_seats(items):
+    """
+    Prices `{"journey", "cargo", "seat"}` items with two queries for the
+    whole batch. Returns the quotes in item order, and the errors of the
+    items naming unknown journeys or seats by item index.
+    """
+    inputs = load_fare_inputs(item["journey"] for item in items)
+    position_by_id = {
+        journey_id: position
+        for position, journey_id in enumerate(inputs["id"].tolist())
+    }
+
+    errors = {}
+    for index, item in enumerate(items):
+        position = position_by_id.get(item["journey"])
+        if position is None:
+            errors[index] = {"journey": ["Journey not found."]}
+            continue
+        cargo_number = inputs["cargo_number"][position]
+        places_in_cargo = inputs["places_in_cargo"][position]
+        if item["cargo"] > cargo_number:
+            errors[index] = {"cargo": [f"Train has {cargo_number} cars."]}
+        elif item["seat"] > places_in_cargo:
+            errors[index] = {"seat": [f"Car has {places_in_cargo} seats."]}
+    if errors:
+        return [], errors
+
+    positions = np.array(
+        [position_by_id[item["journey"]] for item in items], dtype=np.int64
+    )
+    item_fares = journey_fares(inputs)[positions].tolist()
+    taken = set(
+        Ticket.objects.filter(
+            journey_id__in=position_by_id,
+            cargo__in={item["cargo"] for item in items},
+            seat__in={item["seat"] for item in items},
+        ).values_list("journey_id", "cargo", "seat")
+    )
+
+    return [
+        {
+            **item,
+            "price": to_decimal(fare),
+            "available": (item["journey"], item["cargo"], item["seat"])
+            not in taken,
+        }
+        for item, fare in zip(items, item_fares)
+    ], errors
@@ -0,0 +1,222 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.permissions import SAFE_METHODS
+
+from train_station.metrics import serializer_timer
+
+FIELDS_PARAM = "fields"
+EXPAND_PARAM = "expand"
+INCLUDE_PARAM = "include"
+
+FIELDSET_PARAMETERS = [
+    OpenApiParameter(
+        FIELDS_PARAM,
+        description="Comma separated fields to return, e.g. id,route",
+        type=OpenApiTypes.STR,
+    ),
+    OpenApiParameter(
+        EXPAND_PARAM,
+        description="Comma separated fields to nest, e.g. route,train",
+        type=OpenApiTypes.STR,
+    ),
+    OpenApiParameter(
+        INCLUDE_PARAM,
+        description="Comma separated optional fields to add, e.g. price",
+        type=OpenApiTypes.STR,
+    ),
+]
+
+
+def parse_field_names(query_params, name):
+    value = query_params.get(name, None)
+    if value is None:
+        return None
+
+    return {field.strip() for field in value.split(",") if field.strip()}
+
+
+def get_included_fields(request):
+    """Returns the `?include=` and `?fields=` names of a read request."""
+    if request is None or request.method not in SAFE_METHODS:
+        return set()
+
+    included = set()
+    for name in (FIELDS_PARAM, INCLUDE_PARAM):
+        included |= parse_field_names(request.query_params, name) or set()
+
+    return included
+
+
+def get_fieldset_params(request):
+    """Returns the `?fields=` and `?expand=` names of a read request."""
+    if request is None or request.method not in SAFE_METHODS:
+        return None, set()
+
+    return (
+        parse_field_names(request.query_params, FIELDS_PARAM),
+        parse_field_names(request.query_params, EXPAND_PARAM) or set(),
+    )
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Lets read requests trim the top level fields with `?fields=id,route`
+    and nest the ones in `expandable_fields` with `?expand=route`.
+
+    `field_querysets` and `expanded_field_querysets` map a field to the
+    `select_related`, `prefetch_related` and `annotate` arguments that
+    rendering it needs, so views only join and count what is returned.
+    Rendering time is added to the request metrics.
+
+    `optional_fields` are only rendered when named in `?include=` or
+    `?fields=`, and map to a function setting them on a whole page of
+    instances at once.
+    """
+
+    field_querysets = {}
+    expanded_field_querysets = {}
+    expandable_fields = {}
+    optional_fields = {}
+
+    @property
+    def is_top_level(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+
+        return parent is None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.is_top_level:
+            return fields
+
+        request = self.context.get("request")
+        requested, expanded = get_fieldset_params(request)
+        included = self.included_optional_fields(request)
+        unknown = (requested or set()) - fields.keys()
+        if unknown:
+            raise ParseError(
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}."
+            )
+        not_expandable = expanded - self.expandable_fields.keys()
+        if not_expandable:
+            raise ParseError(
+                detail="Fields that can be expanded: "
+                f"{', '.join(sorted(self.expandable_fields)) or 'none'}."
+            )
+
+        for name in expanded:
+            serializer_class = self.expandable_fields[name]
+            fields[name] = serializer_class(read_only=True)
+        for name in self.optional_fields.keys() - included:
+            fields.pop(name, None)
+        if requested is not None:
+            fields = {
+                name: field
+                for name, field in fields.items()
+                if name in requested or name in included
+            }
+
+        return fields
+
+    def to_representation(self, instance):
+        if not self.is_top_level:
+            return super().to_representation(instance)
+
+        with serializer_timer():
+            return super().to_representation(instance)
+
+    @classmethod
+    def prepare_queryset(cls, queryset, request):
+        requested, expanded = get_fieldset_params(request)
+        included = cls.included_optional_fields(request)
+        field_names = cls.Meta.fields
+        if field_names == serializers.ALL_FIELDS:
+            field_names = list(cls.field_querysets)
+        if requested is not None:
+            field_names = [
+                name
+                for name in field_names
+                if name in requested or name in included
+            ]
+        field_names = [
+            name
+            for name in field_names
+            if name not in cls.optional_fields or name in included
+        ]
+
+        select_related = []
+        prefetch_related = []
+        annotations = {}
+        for name in field_names:
+            if name in expanded and name in cls.expanded_field_querysets:
+                needs = cls.expanded_field_querysets[name]
+            else:
+                needs = cls.field_querysets.get(name, {})
+            select_related += needs.get("select_related", ())
+            prefetch_related += needs.get("prefetch_related", ())
+            annotations.update(needs.get("annotate", {}))
+
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+
+        return queryset
+
+    @classmethod
+    def included_optional_fields(cls, request):
+        return cls.optional_fields.keys() & get_included_fields(request)
+
+    @classmethod
+    def load_optional_fields(cls, instances, request):
+        for name in sorted(cls.included_optional_fields(request)):
+            cls.optional_fields[name](instances)
+
+        return instances
+
+
+class SparseFieldsetMixin:
+    """
+    Builds the queryset from the fields the serializer will render, and
+    loads the optional fields it renders for the page or object.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        serializer_class = self.get_fieldset_serializer_class()
+
+        if serializer_class is not None:
+            queryset = serializer_class.prepare_queryset(
+                queryset, self.request
+            )
+
+        return queryset
+
+    def get_fieldset_serializer_class(self):
+        serializer_class = self.get_serializer_class()
+        if issubclass(serializer_class, SparseFieldsetSerializerMixin):
+            return serializer_class
+
+        return None
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        serializer_class = self.get_fieldset_serializer_class()
+        if page is not None and serializer_class is not None:
+            serializer_class.load_optional_fields(page, self.request)
+
+        return page
+
+    def get_object(self):
+        instance = super().get_object()
+        serializer_class = self.get_fieldset_serializer_class()
+        if serializer_class is not None:
+            serializer_class.load_optional_fields([instance], self.request)
+
+        return instance
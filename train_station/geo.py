@@ -0,0 +1,156 @@
+import math
+from functools import lru_cache
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9
+KM_PER_DEGREE = 111.32
+MAX_COVERING_CELLS = 32
+ROUTE_DISTANCE_CACHE_SIZE = 8192
+
+
+@lru_cache(maxsize=ROUTE_DISTANCE_CACHE_SIZE)
+def geodesic_kilometers(source, destination):
+    """Whole kilometers between two `(latitude, longitude)` points."""
+    from geopy.distance import geodesic
+
+    return int(geodesic(source, destination).kilometers)
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    latitude_range = [-90.0, 90.0]
+    longitude_range = [-180.0, 180.0]
+    geohash = []
+    bit = 0
+    char_index = 0
+    even = True
+
+    while len(geohash) < precision:
+        if even:
+            value, value_range = float(longitude), longitude_range
+        else:
+            value, value_range = float(latitude), latitude_range
+
+        middle = (value_range[0] + value_range[1]) / 2
+        if value >= middle:
+            char_index = (char_index << 1) | 1
+            value_range[0] = middle
+        else:
+            char_index <<= 1
+            value_range[1] = middle
+
+        even = not even
+        bit += 1
+        if bit == 5:
+            geohash.append(GEOHASH_ALPHABET[char_index])
+            bit = 0
+            char_index = 0
+
+    return "".join(geohash)
+
+
+def geohash_cell_size(precision):
+    """Latitude and longitude span, in degrees, of a geohash cell."""
+    bits = 5 * precision
+    longitude_bits = math.ceil(bits / 2)
+    latitude_bits = bits // 2
+
+    return 180.0 / 2**latitude_bits, 360.0 / 2**longitude_bits
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    Returns `(min_lat, max_lat, longitude_ranges)`; longitude ranges are
+    split in two when the box crosses the antimeridian.
+    """
+    latitude_delta = radius_km / KM_PER_DEGREE
+    min_latitude = max(latitude - latitude_delta, -90.0)
+    max_latitude = min(latitude + latitude_delta, 90.0)
+
+    cos_latitude = math.cos(
+        math.radians(max(abs(min_latitude), abs(max_latitude)))
+    )
+    if max_latitude >= 90.0 or min_latitude <= -90.0 or cos_latitude <= 0:
+        return min_latitude, max_latitude, [(-180.0, 180.0)]
+
+    longitude_delta = radius_km / (KM_PER_DEGREE * cos_latitude)
+    if longitude_delta >= 180.0:
+        return min_latitude, max_latitude, [(-180.0, 180.0)]
+
+    min_longitude = longitude - longitude_delta
+    max_longitude = longitude + longitude_delta
+    if min_longitude < -180.0:
+        longitude_ranges = [
+            (min_longitude + 360.0, 180.0),
+            (-180.0, max_longitude),
+        ]
+    elif max_longitude > 180.0:
+        longitude_ranges = [
+            (min_longitude, 180.0),
+            (-180.0, max_longitude - 360.0),
+        ]
+    else:
+        longitude_ranges = [(min_longitude, max_longitude)]
+
+    return min_latitude, max_latitude, longitude_ranges
+
+
+def _frange(start, stop, step):
+    value = start
+    while value < stop:
+        yield value
+        value += step
+    yield stop
+
+
+def covering_geohashes(min_latitude, max_latitude, longitude_ranges):
+    """
+    Returns the smallest set of geohash prefixes, of at most
+    `MAX_COVERING_CELLS` cells, that covers the bounding box.
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        latitude_step, longitude_step = geohash_cell_size(precision)
+        rows = (max_latitude - min_latitude) / latitude_step + 2
+        columns = sum(
+            (max_lon - min_lon) / longitude_step + 2
+            for min_lon, max_lon in longitude_ranges
+        )
+        if rows * columns <= MAX_COVERING_CELLS:
+            break
+
+    return {
+        encode_geohash(lat, lon, precision)
+        for lat in _frange(min_latitude, max_latitude, latitude_step)
+        for min_lon, max_lon in longitude_ranges
+        for lon in _frange(min_lon, max_lon, longitude_step)
+    }
+
+
+def nearest(latitude, longitude, candidates, radius_km, limit):
+    """
+    Ranks `(id, latitude, longitude)` candidates by great-circle distance
+    and returns up to `limit` `(id, distance_km)` pairs within the radius.
+    """
+    if not candidates:
+        return []
+
+    # numpy is only loaded by the workers that serve nearby searches.
+    import numpy as np
+    from haversine import haversine_vector
+
+    ids, latitudes, longitudes = zip(*candidates)
+    points = np.column_stack(
+        (
+            np.asarray(latitudes, dtype=float),
+            np.asarray(longitudes, dtype=float),
+        )
+    )
+    distances = haversine_vector(
+        np.array([[latitude, longitude]], dtype=float), points, comb=True
+    ).ravel()
+
+    within = np.flatnonzero(distances <= radius_km)
+    if len(within) > limit:
+        within = within[np.argpartition(distances[within], limit - 1)[:limit]]
+    within = within[np.argsort(distances[within], kind="stable")]
+
+    return [(ids[index], float(distances[index])) for index in within]
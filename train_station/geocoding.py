@@ -0,0 +1,92 @@
+import asyncio
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+
+USER_AGENT = "train_station"
+
+
+def get_geolocator(asynchronous=False):
+    # geopy pulls in aiohttp, so it is only imported once geocoding.
+    from geopy import Nominatim
+    from geopy.adapters import AioHTTPAdapter
+
+    if asynchronous:
+        return Nominatim(user_agent=USER_AGENT, adapter_factory=AioHTTPAdapter)
+
+    return Nominatim(user_agent=USER_AGENT)
+
+
+def parse_address(location_info):
+    address = {"country": None, "city": None}
+
+    if location_info:
+        address_raw = location_info.raw["address"]
+        address["country"] = address_raw.get("country")
+        address["city"] = address_raw.get("city")
+        if not address["city"]:
+            if "town" in address_raw:
+                address["city"] = address_raw["town"]
+            elif "village" in address_raw:
+                address["city"] = address_raw["village"]
+
+    return address
+
+
+def reverse_geocode(latitude, longitude):
+    geolocator = get_geolocator()
+    location_info = geolocator.reverse(f"{latitude},{longitude}")
+
+    return parse_address(location_info)
+
+
+async def areverse_geocode(latitude, longitude):
+    async with get_geolocator(asynchronous=True) as geolocator:
+        location_info = await geolocator.reverse(f"{latitude},{longitude}")
+
+    return parse_address(location_info)
+
+
+async def areverse_geocode_many(points):
+    """
+    Reverse geocodes distinct points over one session, with bounded
+    concurrency and rate. Returns the addresses in point order, and the
+    lookup errors by point index; failed points get an empty address.
+    """
+    # geopy is only imported once geocoding, see get_geolocator.
+    from geopy.extra.rate_limiter import AsyncRateLimiter
+
+    distinct_points = list(dict.fromkeys(points))
+    semaphore = asyncio.Semaphore(settings.GEOCODING_CONCURRENCY)
+    async with get_geolocator(asynchronous=True) as geolocator:
+        reverse = AsyncRateLimiter(
+            geolocator.reverse,
+            min_delay_seconds=settings.GEOCODING_MIN_DELAY_SECONDS,
+            max_retries=0,
+            swallow_exceptions=False,
+        )
+
+        async def lookup(latitude, longitude):
+            async with semaphore:
+                return await reverse(f"{latitude},{longitude}")
+
+        locations = await asyncio.gather(
+            *(lookup(*point) for point in distinct_points),
+            return_exceptions=True,
+        )
+    found = dict(zip(distinct_points, locations))
+
+    addresses = []
+    errors = {}
+    for index, point in enumerate(points):
+        location = found[point]
+        if isinstance(location, Exception):
+            errors[index] = f"Address lookup failed: {location!r}"
+            location = None
+        addresses.append(parse_address(location))
+
+    return addresses, errors
+
+
+def reverse_geocode_many(points):
+    return async_to_sync(areverse_geocode_many)(points)
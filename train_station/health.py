@@ -0,0 +1,43 @@
+from django.db import DatabaseError
+from django.http import JsonResponse
+from rest_framework import status
+
+from train_station.startup import (
+    check_database,
+    migrations_applied,
+    run_warmups,
+)
+
+
+def liveness(request):
+    """The process serves requests; restart it when this fails."""
+    return JsonResponse({"status": "ok"})
+
+
+def readiness(request):
+    """
+    The database answers, its migrations are applied and the worker is
+    warmed up; only send traffic when this succeeds.
+    """
+    try:
+        check_database()
+        applied = migrations_applied()
+    except DatabaseError as error:
+        return JsonResponse(
+            {"status": "unavailable", "database": repr(error)},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    if not applied:
+        return JsonResponse(
+            {"status": "unavailable", "database": "unapplied migrations"},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+    warmups = run_warmups()
+    if any("error" in result for result in warmups.values()):
+        return JsonResponse(
+            {"status": "unavailable", "warmups": warmups},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+    return JsonResponse({"status": "ok", "warmups": warmups})
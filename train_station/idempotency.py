@@ -0,0 +1,95 @@
+import hashlib
+import json
+
+from django.db import IntegrityError, transaction
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+from train_station.models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+KEY_MAX_LENGTH = IdempotencyKey._meta.get_field("key").max_length
+
+
+class IdempotencyKeyMismatch(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = (
+        "Idempotency-Key was already used with a different request body."
+    )
+    default_code = "idempotency_key_mismatch"
+
+
+def request_fingerprint(data):
+    payload = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class IdempotentCreateMixin:
+    """
+    Makes `create` safe to retry with an `Idempotency-Key` header.
+
+    The key is claimed first and the response stored in the same
+    transaction as the created object, so failed requests leave nothing
+    behind. Replays are answered from the stored row; a concurrent
+    duplicate blocks on the unique (user, key) index until the first
+    request commits and is then answered from its result.
+    """
+
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+
+        if not key:
+            return super().create(request, *args, **kwargs)
+
+        if len(key) > KEY_MAX_LENGTH:
+            raise ValidationError(
+                {
+                    IDEMPOTENCY_HEADER: (
+                        f"Key should be at most {KEY_MAX_LENGTH} characters."
+                    )
+                }
+            )
+
+        request_hash = request_fingerprint(request.data)
+        stored = IdempotencyKey.objects.filter(
+            user_id=request.user.id, key=key
+        ).first()
+
+        if stored and stored.is_expired:
+            stored.delete()
+        elif stored:
+            return self._replay(stored, request_hash)
+
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    user_id=request.user.id,
+                    key=key,
+                    request_hash=request_hash,
+                )
+                response = super().create(request, *args, **kwargs)
+                record.status_code = response.status_code
+                record.response_body = response.data
+                record.save(update_fields=("status_code", "response_body"))
+        except IntegrityError:
+            stored = IdempotencyKey.objects.filter(
+                user_id=request.user.id, key=key
+            ).first()
+            if not stored:
+                raise
+            return self._replay(stored, request_hash)
+
+        return response
+
+    @staticmethod
+    def _replay(stored, request_hash):
+        if stored.request_hash != request_hash:
+            raise IdempotencyKeyMismatch()
+
+        return Response(
+            stored.response_body,
+            status=stored.status_code,
+            headers={REPLAYED_HEADER: "true"},
+        )
@@ -0,0 +1,156 @@
+import io
+import logging
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.db.models import Count
+
+from train_station.models import Station, StationImageVariant
+
+logger = logging.getLogger(__name__)
+
+SAVE_OPTIONS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "jpeg": {"format": "JPEG", "quality": 82, "optimize": True},
+}
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.STATION_IMAGE_WORKERS,
+            thread_name_prefix="station-images",
+        )
+
+    return _executor
+
+
+def schedule_station_image_processing(station_id):
+    transaction.on_commit(
+        lambda: get_executor().submit(
+            process_station_image_in_worker, station_id
+        )
+    )
+
+
+def process_station_image_in_worker(station_id):
+    try:
+        process_station_image_task(station_id)
+    finally:
+        # The worker thread opened its own connections.
+        connections.close_all()
+
+
+def process_station_image_task(station_id):
+    # Nothing waits on the future, so failures are only seen in the log.
+    try:
+        process_station_image(station_id)
+    except Exception:
+        logger.exception(
+            "Processing the image of station %s failed", station_id
+        )
+
+
+def render_variant(image, width, image_format):
+    """
+    Encodes `image` at most `width` pixels wide, never upscaled. Returns
+    the encoded bytes and the size they have.
+    """
+    from PIL import Image
+
+    variant = image.copy()
+    variant.thumbnail((width, variant.height), Image.LANCZOS)
+    if image_format == "jpeg" and variant.mode != "RGB":
+        variant = variant.convert("RGB")
+
+    buffer = io.BytesIO()
+    variant.save(buffer, **SAVE_OPTIONS[image_format])
+
+    return buffer.getvalue(), variant.size
+
+
+def delete_station_image_variants(station):
+    # Files are content-addressed and may be shared with other stations,
+    # `collect_media_blobs` removes them once nothing references them.
+    StationImageVariant.objects.filter(station=station).delete()
+
+
+def blob_reference_counts():
+    counts = Counter()
+
+    for model in (Station, StationImageVariant):
+        references = (
+            model.objects.exclude(image="")
+            .exclude(image=None)
+            .values_list("image")
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+        for name, count in references:
+            counts[name] += count
+
+    return counts
+
+
+def process_station_image(station_id):
+    """
+    Replaces the variants of the station image in one transaction, with
+    the station row locked so overlapping uploads are processed in turn.
+    """
+    with transaction.atomic():
+        station = (
+            Station.objects.select_for_update().filter(pk=station_id).first()
+        )
+        if station is None or not station.image:
+            return []
+
+        return create_station_image_variants(station)
+
+
+def create_station_image_variants(station):
+    # Pillow is only loaded by the workers that process uploads.
+    from PIL import Image, ImageOps
+
+    delete_station_image_variants(station)
+    widths = settings.STATION_IMAGE_VARIANT_WIDTHS
+    variants = []
+
+    with station.image.open("rb") as image_file:
+        with Image.open(image_file) as image:
+            # Let JPEG decode at a reduced scale instead of full resolution.
+            scale = max(widths) / image.width
+            if scale < 1:
+                image.draft("RGB", (max(widths), int(image.height * scale)))
+            image = ImageOps.exif_transpose(image)
+
+            # Widths past that of a small image would all give its size.
+            widths = dict.fromkeys(min(width, image.width) for width in widths)
+            for width in widths:
+                for image_format in settings.STATION_IMAGE_VARIANT_FORMATS:
+                    content, (variant_width, height) = render_variant(
+                        image, width, image_format
+                    )
+                    variant = StationImageVariant(
+                        station=station,
+                        width=variant_width,
+                        height=height,
+                        format=image_format,
+                    )
+                    name = os.path.basename(station.image.name)
+                    variant.image.save(
+                        f"{os.path.splitext(name)[0]}.{image_format}",
+                        ContentFile(content),
+                        save=False,
+                    )
+                    variant.save()
+                    variants.append(variant)
+
+    return variants
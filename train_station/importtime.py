@@ -0,0 +1,82 @@
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+
+from django.conf import settings
+
+# What a worker imports before its first request: the apps, their models
+# and every module the URL configuration references.
+BOOT_STATEMENT = (
+    "import django; django.setup(); "
+    "from django.urls import get_resolver; get_resolver().url_patterns"
+)
+# Heavy optional dependencies that only the views using them import.
+LAZY_MODULES = (
+    "numpy",
+    "geopy",
+    "haversine",
+    "aiohttp",
+    "PIL",
+    "drf_spectacular.views",
+    "drf_spectacular.openapi",
+)
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$")
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def measure_imports(statement=BOOT_STATEMENT):
+    """
+    Runs `statement` in a fresh interpreter with `-X importtime` and
+    returns the timing of every module it imported.
+    """
+    env = {**os.environ}
+    env.setdefault("DJANGO_SETTINGS_MODULE", settings.SETTINGS_MODULE)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        cwd=settings.BASE_DIR,
+        env=env,
+    )
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    timings = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            timings.append(
+                ImportTiming(
+                    module=module,
+                    self_us=int(self_us),
+                    cumulative_us=int(cumulative_us),
+                    depth=(len(indent) - 1) // 2,
+                )
+            )
+
+    return timings
+
+
+def total_us(timings):
+    return sum(timing.self_us for timing in timings)
+
+
+def loaded_lazy_modules(timings):
+    return sorted(
+        timing.module
+        for timing in timings
+        if any(
+            timing.module == name or timing.module.startswith(f"{name}.")
+            for name in LAZY_MODULES
+        )
+    )
@@ -0,0 +1,54 @@
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+
+def view_label(request):
+    """
+    Names the view that served `request`, as `JourneyViewSet.list` for
+    viewsets and by URL name for other views.
+    """
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved"
+
+    view_class = getattr(match.func, "cls", None)
+    if view_class is None:
+        return match.view_name or match.func.__name__
+
+    method = request.method.lower()
+    action = (getattr(match.func, "actions", None) or {}).get(method, method)
+
+    return f"{view_class.__name__}.{action}"
+
+
+class QueryTimer:
+    """Database execute wrapper counting and timing the queries it runs."""
+
+    def __init__(self, record_statements=False):
+        self.record_statements = record_statements
+        self.count = 0
+        self.duration = 0.0
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.count += 1
+            self.duration += duration
+            if self.record_statements:
+                self.statements.append(
+                    {"sql": sql, "duration_ms": round(duration * 1000, 3)}
+                )
+
+
+@contextmanager
+def timed_queries(timer):
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timer))
+        yield timer
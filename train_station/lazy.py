@@ -0,0 +1,21 @@
+from django.utils.module_loading import import_string
+from django.views.decorators.csrf import csrf_exempt
+
+
+def lazy_view(view_path, **initkwargs):
+    """
+    URL view that imports the `view_path` class on its first request, so
+    loading the URLs does not import what only that view needs.
+    """
+    view = None
+
+    @csrf_exempt
+    def dispatch(request, *args, **kwargs):
+        nonlocal view
+
+        if view is None:
+            view = import_string(view_path).as_view(**initkwargs)
+
+        return view(request, *args, **kwargs)
+
+    return dispatch
@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from train_station.archive import archive_journeys
+
+
+class Command(BaseCommand):
+    help = (
+        "Move journeys that arrived before the cutoff, with their tickets "
+        "and crew, to the archive tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            help="Archive journeys that arrived more than this many days "
+            "ago, JOURNEY_ARCHIVE_AFTER by default.",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options["days"] is None:
+            archive_after = settings.JOURNEY_ARCHIVE_AFTER
+        else:
+            archive_after = timedelta(days=options["days"])
+
+        archived = archive_journeys(
+            timezone.now() - archive_after, options["batch_size"]
+        )
+
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} journeys."))
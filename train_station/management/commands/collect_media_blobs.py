@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+
+from train_station.images import blob_reference_counts
+from train_station.storage import ContentAddressedStorage
+
+
+class Command(BaseCommand):
+    help = "Delete content-addressed media blobs that no row references."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=24,
+            help="Keep blobs written more recently than this.",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        storage = ContentAddressedStorage()
+        min_age = options["grace_hours"] * 3600
+        # Blobs are listed before references are counted, so a blob saved
+        # in between is either too new to be listed or already referenced.
+        # Saving an existing blob refreshes its mtime, which
+        # `delete_if_stale` checks atomically with the deletion.
+        candidates = list(storage.iter_blobs(min_age=min_age))
+        candidates += storage.iter_stale_temp_files(min_age=min_age)
+        references = blob_reference_counts()
+
+        unreferenced = []
+        freed = 0
+        for name in candidates:
+            if references[name] or not storage.is_stale(name, min_age):
+                continue
+            size = storage.size(name)
+            if options["dry_run"] or storage.delete_if_stale(name, min_age):
+                unreferenced.append(name)
+                freed += size
+
+        action = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{action} {len(unreferenced)} of {len(candidates)} blobs "
+                f"({freed / 1024 / 1024:.1f} MB); "
+                f"{len(references)} blobs are referenced."
+            )
+        )
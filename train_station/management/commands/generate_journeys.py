@@ -0,0 +1,45 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from train_station.schedules import generate_journeys
+
+
+class Command(BaseCommand):
+    help = "Expand journey schedules into journeys for a date range."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start",
+            type=date.fromisoformat,
+            help="First day to generate, today by default.",
+        )
+        parser.add_argument(
+            "--end",
+            type=date.fromisoformat,
+            help="Last day to generate, 90 days after start by default.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        start = options["start"] or date.today()
+        end = options["end"] or start + timedelta(days=90)
+        if end < start:
+            raise CommandError("--end should not be before --start.")
+
+        created, conflicts = generate_journeys(
+            start, end, batch_size=options["batch_size"]
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {created} journeys from {start} to {end}."
+            )
+        )
+        if conflicts:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Skipped {conflicts} departures of trains that already "
+                    "have a journey at that time."
+                )
+            )
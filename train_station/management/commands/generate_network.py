@@ -0,0 +1,97 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from train_station.network import (
+    DEMAND_CURVES,
+    NetworkSpec,
+    generate_network,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic network of stations, routes, trains, "
+        "journeys and tickets for load tests. The same --seed and --start "
+        "give the same data."
+    )
+
+    def add_arguments(self, parser):
+        defaults = NetworkSpec()
+        parser.add_argument("--seed", type=int, default=defaults.seed)
+        parser.add_argument("--stations", type=int, default=defaults.stations)
+        parser.add_argument(
+            "--departures-per-day",
+            type=int,
+            default=defaults.departures_per_day,
+            help="Trains running between each pair of neighbour stations.",
+        )
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=defaults.months,
+            help="30 day months of journeys to generate.",
+        )
+        parser.add_argument(
+            "--start",
+            type=date.fromisoformat,
+            help="First day of journeys, today by default.",
+        )
+        parser.add_argument(
+            "--load-factor",
+            type=float,
+            default=defaults.load_factor,
+            help="Share of seats sold at peak demand.",
+        )
+        parser.add_argument(
+            "--demand-curve",
+            choices=DEMAND_CURVES,
+            default=defaults.demand_curve,
+        )
+        parser.add_argument("--users", type=int, default=defaults.users)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=defaults.batch_size,
+            help="Journeys written per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        if options["stations"] < 2 or options["departures_per_day"] < 1:
+            raise CommandError(
+                "At least 2 stations and 1 departure per day are needed."
+            )
+        if not 0 <= options["load_factor"] <= 1:
+            raise CommandError("--load-factor should be between 0 and 1.")
+
+        spec = NetworkSpec(
+            seed=options["seed"],
+            stations=options["stations"],
+            departures_per_day=options["departures_per_day"],
+            months=options["months"],
+            start=options["start"],
+            load_factor=options["load_factor"],
+            demand_curve=options["demand_curve"],
+            users=options["users"],
+            batch_size=options["batch_size"],
+        )
+        started = time.monotonic()
+
+        def progress(counts):
+            self.stdout.write(
+                f"{counts['journeys']} journeys, {counts['tickets']} "
+                f"tickets ({time.monotonic() - started:.0f} s)"
+            )
+
+        try:
+            counts = generate_network(spec, progress=progress)
+        except ValueError as error:
+            raise CommandError(error)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                ", ".join(f"{count} {name}" for name, count in counts.items())
+                + f" created in {time.monotonic() - started:.0f} s."
+            )
+        )
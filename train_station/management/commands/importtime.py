@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from train_station.importtime import (
+    BOOT_STATEMENT,
+    loaded_lazy_modules,
+    measure_imports,
+    total_us,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Report the import time of a worker boot, or of a module, per "
+        "module as `python -X importtime` measures it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--module",
+            help="Measure importing this module after django.setup().",
+        )
+        parser.add_argument("--limit", type=int, default=25)
+        parser.add_argument(
+            "--budget-ms",
+            type=float,
+            default=settings.IMPORT_TIME_BUDGET_MS,
+            help="Fail when the total import time is over this budget.",
+        )
+
+    def handle(self, *args, **options):
+        statement = BOOT_STATEMENT
+        if options["module"]:
+            statement = (
+                f"import django; django.setup(); import {options['module']}"
+            )
+        try:
+            timings = measure_imports(statement)
+        except RuntimeError as error:
+            raise CommandError(error)
+
+        self.stdout.write(f"{'self ms':>9} {'cumulative ms':>14}  module")
+        for timing in sorted(
+            timings, key=lambda timing: -timing.cumulative_us
+        )[: options["limit"]]:
+            self.stdout.write(
+                f"{timing.self_us / 1000:>9.1f} "
+                f"{timing.cumulative_us / 1000:>14.1f}  "
+                f"{'  ' * timing.depth}{timing.module}"
+            )
+
+        total_ms = total_us(timings) / 1000
+        self.stdout.write(
+            f"\n{len(timings)} modules imported in {total_ms:.1f} ms "
+            f"(budget {options['budget_ms']:g} ms)."
+        )
+        lazy_modules = loaded_lazy_modules(timings)
+        if lazy_modules and not options["module"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Imported at boot: {', '.join(lazy_modules)}"
+                )
+            )
+        if total_ms > options["budget_ms"]:
+            raise CommandError(
+                f"Import time {total_ms:.1f} ms is over the budget of "
+                f"{options['budget_ms']:g} ms."
+            )
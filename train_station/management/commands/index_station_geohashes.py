@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from train_station.models import Station
+
+
+class Command(BaseCommand):
+    help = "Recompute the geohash of every station."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        stations = list(Station.objects.only("latitude", "longitude"))
+        for station in stations:
+            station.update_geohash()
+
+        Station.objects.bulk_update(
+            stations, ["geohash"], batch_size=options["batch_size"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Indexed {len(stations)} stations.")
+        )
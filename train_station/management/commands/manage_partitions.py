@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from train_station import partitioning
+
+
+class Command(BaseCommand):
+    help = (
+        "Create upcoming monthly journey and ticket partitions and detach "
+        "the ones older than JOURNEY_ARCHIVE_AFTER. PostgreSQL only."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--convert",
+            action="store_true",
+            help="Rebuild the journey and ticket tables as partitioned "
+            "tables first. Locks both tables while rows are copied.",
+        )
+        parser.add_argument("--months-ahead", type=int, default=6)
+        parser.add_argument(
+            "--detach",
+            action="store_true",
+            help="Detach partitions of months that ended before the "
+            "archive cutoff.",
+        )
+
+    def handle(self, *args, **options):
+        if not partitioning.is_supported():
+            self.stdout.write(
+                f"Partitioning is not supported on {connection.vendor}, "
+                "nothing to do."
+            )
+            return
+
+        today = timezone.localdate()
+        last_month = partitioning.add_months(
+            partitioning.month_start(today), options["months_ahead"]
+        )
+
+        with connection.cursor() as cursor:
+            partitioned = partitioning.is_partitioned(
+                cursor, partitioning.JOURNEY_TABLE
+            )
+        if not partitioned:
+            if not options["convert"]:
+                self.stdout.write(
+                    "Journey and ticket tables are not partitioned, run "
+                    "with --convert to partition them."
+                )
+                return
+            months = partitioning.convert_tables(last_month)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Partitioned journeys and tickets into {len(months)} "
+                    "months."
+                )
+            )
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            created = partitioning.create_partitions(
+                cursor,
+                list(partitioning.iter_months(today, last_month)),
+            )
+            detached = []
+            if options["detach"]:
+                cutoff = timezone.now() - settings.JOURNEY_ARCHIVE_AFTER
+                detached = partitioning.detach_partitions(
+                    cursor, partitioning.month_start(cutoff.date())
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {len(created)} and detached {len(detached)} "
+                "partitions."
+            )
+        )
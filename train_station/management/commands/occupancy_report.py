@@ -0,0 +1,32 @@
+import json
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from train_station.analytics import (
+    GROUP_BY_CHOICES,
+    MAX_REPORT_DAYS,
+    occupancy_report,
+)
+
+
+class Command(BaseCommand):
+    help = "Print load factors, sell-out curve and car fill rates as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", type=date.fromisoformat, required=True)
+        parser.add_argument("--end", type=date.fromisoformat, required=True)
+        parser.add_argument(
+            "--group-by", choices=GROUP_BY_CHOICES, default="route"
+        )
+
+    def handle(self, *args, **options):
+        start, end = options["start"], options["end"]
+        if not 0 <= (end - start).days < MAX_REPORT_DAYS:
+            raise CommandError(
+                f"--end should be after --start and at most "
+                f"{MAX_REPORT_DAYS} days later."
+            )
+
+        report = occupancy_report(start, end, options["group_by"])
+        self.stdout.write(json.dumps(report, indent=2, default=str))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from train_station.images import process_station_image
+from train_station.models import Station
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate resized image variants for stations whose upload has not "
+        "been processed yet."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Regenerate variants for every station with an image.",
+        )
+
+    def handle(self, *args, **options):
+        stations = Station.objects.exclude(image="").exclude(image=None)
+        if not options["all"]:
+            stations = stations.annotate(
+                variant_count=Count("image_variants")
+            ).filter(variant_count=0)
+
+        processed = 0
+        for station_id in stations.values_list("id", flat=True):
+            if process_station_image(station_id):
+                processed += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Processed images of {processed} stations.")
+        )
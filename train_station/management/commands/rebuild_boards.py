@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from train_station.boards import refresh_journey_boards
+from train_station.models import Journey
+
+
+class Command(BaseCommand):
+    help = "Rebuild departure and arrival board rows of upcoming journeys."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        journey_ids = list(
+            Journey.objects.filter(arrival_time__gte=timezone.now())
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+        for start in range(0, len(journey_ids), batch_size):
+            refresh_journey_boards(journey_ids[start : start + batch_size])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt boards of {len(journey_ids)} journeys."
+            )
+        )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from train_station.models import Order
+from train_station.order_summaries import refresh_order_summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuild the order history summaries of all orders."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        order_ids = list(
+            Order.objects.order_by("id").values_list("id", flat=True)
+        )
+
+        for start in range(0, len(order_ids), batch_size):
+            refresh_order_summaries(order_ids[start : start + batch_size])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt summaries of {len(order_ids)} orders."
+            )
+        )
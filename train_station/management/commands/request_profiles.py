@@ -0,0 +1,91 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Avg, Count, Max
+
+from train_station.models import RequestProfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Summarize stored request profiles by view, list the profiles of "
+        "one view, or print a single profile."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--view", help="List the profiles of this view.")
+        parser.add_argument("--show", type=int, help="Print this profile.")
+        parser.add_argument("--limit", type=int, default=20)
+
+    def handle(self, *args, **options):
+        if options["show"] is not None:
+            self.show(options["show"])
+        elif options["view"]:
+            self.list_view(options["view"], options["limit"])
+        else:
+            self.summarize(options["limit"])
+
+    def summarize(self, limit):
+        rows = (
+            RequestProfile.objects.values("view_name")
+            .annotate(
+                count=Count("id"),
+                avg_ms=Avg("duration_ms"),
+                max_ms=Max("duration_ms"),
+                avg_sql_count=Avg("sql_count"),
+                avg_sql_ms=Avg("sql_time_ms"),
+            )
+            .order_by("-avg_ms")[:limit]
+        )
+
+        self.stdout.write(
+            f"{'view':<40} {'count':>5} {'avg ms':>9} {'max ms':>9} "
+            f"{'queries':>7} {'sql ms':>9}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['view_name']:<40} {row['count']:>5} "
+                f"{row['avg_ms']:>9.1f} {row['max_ms']:>9.1f} "
+                f"{row['avg_sql_count']:>7.1f} {row['avg_sql_ms']:>9.1f}"
+            )
+
+    def list_view(self, view_name, limit):
+        profiles = RequestProfile.objects.filter(view_name=view_name).only(
+            "id",
+            "created_at",
+            "method",
+            "path",
+            "status_code",
+            "duration_ms",
+            "sql_count",
+            "sql_time_ms",
+            "kind",
+        )[:limit]
+
+        for profile in profiles:
+            self.stdout.write(
+                f"#{profile.id} {profile.created_at:%Y-%m-%d %H:%M:%S} "
+                f"{profile.method} {profile.path} {profile.status_code} "
+                f"{profile.duration_ms:.1f} ms, {profile.sql_count} queries "
+                f"in {profile.sql_time_ms:.1f} ms ({profile.kind})"
+            )
+
+    def show(self, profile_id):
+        try:
+            profile = RequestProfile.objects.get(id=profile_id)
+        except RequestProfile.DoesNotExist:
+            raise CommandError(f"There is no profile #{profile_id}.")
+
+        self.stdout.write(
+            f"{profile.method} {profile.path}?{profile.query_string} -> "
+            f"{profile.view_name} {profile.status_code}, "
+            f"{profile.duration_ms:.1f} ms"
+        )
+        self.stdout.write(
+            f"\n{profile.sql_count} queries in {profile.sql_time_ms:.1f} ms:"
+        )
+        for statement in sorted(
+            profile.sql, key=lambda statement: -statement["duration_ms"]
+        ):
+            self.stdout.write(
+                f"{statement['duration_ms']:>9.3f} ms  {statement['sql']}"
+            )
+        self.stdout.write(f"\n{profile.profile}")
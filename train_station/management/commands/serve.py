@@ -0,0 +1,109 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from gunicorn.app.base import BaseApplication
+
+from train_station.metrics import (
+    MULTIPROC_DIR_ENV,
+    child_exit,
+    clear_multiprocess_dir,
+)
+from train_station.startup import post_worker_init
+from train_station_service.caches import cache_is_shared
+
+WSGI_WORKER = "gthread"
+ASGI_WORKER = "uvicorn.workers.UvicornWorker"
+
+
+class Server(BaseApplication):
+    def __init__(self, config, asgi=False):
+        self.config = config
+        self.asgi = asgi
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.config.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        if self.asgi:
+            from train_station_service.asgi import application
+        else:
+            from train_station_service.wsgi import application
+
+        return application
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the API under a pre-forking gunicorn worker pool. "
+        "Send SIGHUP to the master for a graceful reload."
+    )
+
+    def add_arguments(self, parser):
+        server = settings.SERVER
+        parser.add_argument("--bind", default=server["BIND"])
+        parser.add_argument("--workers", type=int, default=server["WORKERS"])
+        parser.add_argument("--threads", type=int, default=server["THREADS"])
+        parser.add_argument(
+            "--keepalive", type=int, default=server["KEEPALIVE"]
+        )
+        parser.add_argument(
+            "--max-requests", type=int, default=server["MAX_REQUESTS"]
+        )
+        parser.add_argument(
+            "--asgi",
+            action="store_true",
+            default=server["ASGI"],
+            help="Serve the ASGI application with uvicorn workers.",
+        )
+
+    def get_config(self, options):
+        server = settings.SERVER
+        config = {
+            "bind": options["bind"],
+            "workers": options["workers"],
+            "keepalive": options["keepalive"],
+            "timeout": server["TIMEOUT"],
+            "graceful_timeout": server["GRACEFUL_TIMEOUT"],
+            "max_requests": options["max_requests"],
+            "max_requests_jitter": server["MAX_REQUESTS_JITTER"],
+            "preload_app": server["PRELOAD"],
+            "accesslog": "-",
+            "child_exit": child_exit,
+            "post_worker_init": post_worker_init,
+        }
+
+        if options["asgi"]:
+            config["worker_class"] = ASGI_WORKER
+        else:
+            config["worker_class"] = WSGI_WORKER
+            config["threads"] = options["threads"]
+
+        return config
+
+    def handle(self, *args, **options):
+        config = self.get_config(options)
+        if not settings.DEBUG and not cache_is_shared():
+            raise CommandError(
+                "Workers would not share throttling buckets and revoked "
+                "tokens with a process-local cache. Set REDIS_URL, or "
+                "DJANGO_DEBUG=true to run without one."
+            )
+        if config["workers"] > 1 and MULTIPROC_DIR_ENV not in os.environ:
+            # prometheus_client reads it at import, so it cannot be set here.
+            self.stderr.write(
+                self.style.WARNING(
+                    f"{MULTIPROC_DIR_ENV} is not set, so /metrics only "
+                    "reports the worker that serves the scrape."
+                )
+            )
+        clear_multiprocess_dir()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Starting {config['workers']} {config['worker_class']} "
+                f"workers on {config['bind']}"
+            )
+        )
+        Server(config, asgi=options["asgi"]).run()
@@ -1,24 +1,37 @@
 import time
 
-from django.core.management.base import BaseCommand
-from django.db import connections
+from django.core.management.base import BaseCommand, CommandError
 from django.db.utils import OperationalError
 
+from train_station.startup import check_database
+
 
 class Command(BaseCommand):
 
+    def add_arguments(self, parser):
+        parser.add_argument("--timeout", type=float, default=60)
+        parser.add_argument("--max-delay", type=float, default=5)
+
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS("Waiting for database..."))
-        db_conn = None
-        while not db_conn:
+        deadline = time.monotonic() + options["timeout"]
+        delay = 0.25
+        while True:
             try:
-                db_conn = connections["default"]
-            except OperationalError:
+                check_database()
+                break
+            except OperationalError as error:
+                if time.monotonic() + delay > deadline:
+                    raise CommandError(
+                        f"Database unavailable after "
+                        f"{options['timeout']:g} seconds: {error}"
+                    )
                 self.stdout.write(
                     self.style.WARNING(
-                        "Database unavailable, waiting 1 second..."
+                        f"Database unavailable, waiting {delay:g} seconds..."
                     )
                 )
-                time.sleep(1)
+                time.sleep(delay)
+                delay = min(delay * 2, options["max_delay"])
 
         self.stdout.write(self.style.SUCCESS("Database is available!"))
@@ -0,0 +1,199 @@
+import hmac
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from train_station.instrumentation import QueryTimer, timed_queries, view_label
+
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+def ensure_multiprocess_dir():
+    """
+    Creates the directory every process records its metrics in when the
+    environment names one, and returns it.
+    """
+    directory = os.environ.get(MULTIPROC_DIR_ENV)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    return directory
+
+
+# Not only the server records metrics: tests, runserver and shells too.
+ensure_multiprocess_dir()
+
+REQUEST_LATENCY = Histogram(
+    "train_station_request_duration_seconds",
+    "Request latency by view.",
+    ["view", "method", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_QUERIES = Histogram(
+    "train_station_request_db_queries",
+    "Database queries run per request.",
+    ["view"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_TIME = Histogram(
+    "train_station_request_db_duration_seconds",
+    "Time spent in database queries per request.",
+    ["view"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_SERIALIZER_TIME = Histogram(
+    "train_station_request_serializer_duration_seconds",
+    "Time spent rendering serializers per request.",
+    ["view"],
+    buckets=LATENCY_BUCKETS,
+)
+CACHE_LOOKUPS = Counter(
+    "train_station_cache_lookups",
+    "Cache lookups by view, cache and result.",
+    ["view", "cache", "result"],
+)
+
+
+@dataclass
+class RequestMetrics:
+    view: str = "unresolved"
+    serializer_time: float = 0.0
+
+
+_request_metrics = ContextVar("request_metrics", default=None)
+
+
+@contextmanager
+def serializer_timer():
+    metrics = _request_metrics.get()
+    if metrics is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_time += time.perf_counter() - start
+
+
+def record_cache_lookups(cache_name, hits, misses):
+    metrics = _request_metrics.get()
+    view = metrics.view if metrics is not None else "none"
+    if hits:
+        CACHE_LOOKUPS.labels(view, cache_name, "hit").inc(hits)
+    if misses:
+        CACHE_LOOKUPS.labels(view, cache_name, "miss").inc(misses)
+
+
+class MetricsMiddleware:
+    """
+    Records latency, database queries and time, and serializer time of
+    every request, labelled with the view that served it.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _request_metrics.set(metrics)
+        timer = QueryTimer()
+        start = time.perf_counter()
+        try:
+            with timed_queries(timer):
+                response = self.get_response(request)
+        finally:
+            _request_metrics.reset(token)
+        duration = time.perf_counter() - start
+
+        REQUEST_LATENCY.labels(
+            metrics.view, request.method, response.status_code
+        ).observe(duration)
+        REQUEST_QUERIES.labels(metrics.view).observe(timer.count)
+        REQUEST_DB_TIME.labels(metrics.view).observe(timer.duration)
+        REQUEST_SERIALIZER_TIME.labels(metrics.view).observe(
+            metrics.serializer_time
+        )
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = _request_metrics.get()
+        if metrics is not None:
+            metrics.view = view_label(request)
+
+
+def get_registry():
+    if MULTIPROC_DIR_ENV not in os.environ:
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+
+    return registry
+
+
+def metrics_view(request):
+    """
+    Prometheus text exposition of the metrics of all workers. Scrapers
+    send `METRICS_TOKEN`, which only DEBUG can do without.
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponseForbidden()
+    elif not hmac.compare_digest(
+        request.headers.get("Authorization", "").encode(),
+        f"Bearer {token}".encode(),
+    ):
+        return HttpResponseForbidden()
+
+    return HttpResponse(
+        generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST
+    )
+
+
+def clear_multiprocess_dir():
+    """Removes the metric files left over by a previous server run."""
+    directory = ensure_multiprocess_dir()
+    if not directory:
+        return
+
+    for name in os.listdir(directory):
+        if name.endswith(".db"):
+            os.remove(os.path.join(directory, name))
+
+
+def child_exit(server, worker):
+    """Gunicorn hook that drops the live gauges of a worker that exited."""
+    if MULTIPROC_DIR_ENV in os.environ:
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,14 +1,20 @@
 import os
 import uuid
+from datetime import timedelta
 
+from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.core.validators import MinValueValidator, MaxValueValidator
+from django.core.validators import (
+    MaxValueValidator,
+    MinValueValidator,
+    RegexValidator,
+)
 from django.db import models
 from django.utils import timezone
 from django.utils.text import slugify
-from geopy.distance import geodesic
 
-from train_station_service import settings
+from train_station.geo import encode_geohash, geodesic_kilometers
+from train_station.storage import station_image_storage
 
 
 class Address(models.Model):
@@ -30,6 +36,16 @@ def station_image_file_path(instance, filename):
     return os.path.join("uploads/stations/", filename)
 
 
+def station_image_variant_file_path(instance, filename):
+    _, extension = os.path.splitext(filename)
+    filename = (
+        f"{slugify(instance.station.name)}-{uuid.uuid4()}"
+        f"-{instance.width}w{extension}"
+    )
+
+    return os.path.join("uploads/stations/variants/", filename)
+
+
 class Station(models.Model):
     name = models.CharField(max_length=31, unique=True)
     latitude = models.DecimalField(
@@ -50,20 +66,72 @@ class Station(models.Model):
             MaxValueValidator(180.0, message="Longitude must be at most 180."),
         ],
     )
+    geohash = models.CharField(max_length=12, db_index=True, editable=False)
     address = models.ForeignKey(
         to=Address,
         on_delete=models.CASCADE,
     )
 
-    image = models.ImageField(upload_to=station_image_file_path, null=True)
+    image = models.ImageField(
+        upload_to=station_image_file_path,
+        storage=station_image_storage,
+        null=True,
+    )
 
     class Meta:
         unique_together = ("name", "latitude", "longitude")
 
+    def update_geohash(self):
+        self.geohash = encode_geohash(self.latitude, self.longitude)
+
+    def save(self, *args, **kwargs):
+        self.update_geohash()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and (
+            "latitude" in update_fields or "longitude" in update_fields
+        ):
+            kwargs["update_fields"] = {*update_fields, "geohash"}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.name
 
 
+class StationImageVariant(models.Model):
+    FORMAT_CHOICES = (("webp", "WebP"), ("jpeg", "JPEG"))
+
+    station = models.ForeignKey(
+        to=Station, on_delete=models.CASCADE, related_name="image_variants"
+    )
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    format = models.CharField(max_length=4, choices=FORMAT_CHOICES)
+    image = models.ImageField(
+        upload_to=station_image_variant_file_path,
+        storage=station_image_storage,
+    )
+
+    class Meta:
+        unique_together = ("station", "width", "format")
+        ordering = ("width", "format")
+
+    def __str__(self):
+        return f"{self.station}: {self.width}w {self.format}"
+
+
+class StationIndexVersion(models.Model):
+    """
+    Single row counting changes to station names and cities, bumped in
+    the transaction making them, so every worker sees when its
+    autocomplete index is outdated.
+    """
+
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return str(self.version)
+
+
 class Crew(models.Model):
     first_name = models.CharField(max_length=31)
     last_name = models.CharField(max_length=31)
@@ -95,9 +163,8 @@ class Route(models.Model):
     def distance_in_kilometers(self):
         source = (self.source.latitude, self.source.longitude)
         destination = (self.destination.latitude, self.destination.longitude)
-        distance = int(geodesic(source, destination).kilometers)
 
-        return distance
+        return geodesic_kilometers(source, destination)
 
     @staticmethod
     def validate_station(source, destination, error_to_raise):
@@ -158,10 +225,62 @@ class Order(models.Model):
         related_name="orders",
     )
 
+    @property
+    def history_tickets(self):
+        """Live and archived tickets, read from prefetched rows if any."""
+        return [*self.tickets.all(), *self.archived_tickets.all()]
+
     def __str__(self):
         return f"{self.user}: {self.created_at}"
 
 
+class JourneySchedule(models.Model):
+    """
+    Timetable template: `train` runs `route` at `departure_time` on every
+    ISO weekday listed in `weekdays` ("12345" is Monday to Friday) from
+    `valid_from` to `valid_until`. `generate_journeys` expands it.
+    """
+
+    route = models.ForeignKey(
+        to=Route, on_delete=models.CASCADE, related_name="schedules"
+    )
+    train = models.ForeignKey(
+        to=Train, on_delete=models.CASCADE, related_name="schedules"
+    )
+    crew = models.ManyToManyField(to=Crew, related_name="schedules")
+    weekdays = models.CharField(
+        max_length=7,
+        default="1234567",
+        validators=[
+            RegexValidator(
+                r"^(?!.*(.).*\1)[1-7]+$",
+                "Weekdays should be distinct digits from 1 (Mon) to 7 (Sun).",
+            )
+        ],
+    )
+    departure_time = models.TimeField()
+    duration = models.DurationField()
+    valid_from = models.DateField()
+    valid_until = models.DateField()
+
+    def runs_on(self, day):
+        return str(day.isoweekday()) in self.weekdays
+
+    def clean(self):
+        if self.valid_from > self.valid_until:
+            raise ValidationError(
+                {"valid_until": "valid_until should not be before valid_from."}
+            )
+        if self.duration <= timedelta(0):
+            raise ValidationError({"duration": "Duration should be positive."})
+
+    def __str__(self):
+        return (
+            f"{self.route}: {self.train} at {self.departure_time} "
+            f"on {self.weekdays}"
+        )
+
+
 class Journey(models.Model):
     route = models.ForeignKey(
         to=Route, on_delete=models.CASCADE, related_name="journeys"
@@ -172,6 +291,21 @@ class Journey(models.Model):
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
     crew = models.ManyToManyField(to=Crew, related_name="journeys")
+    schedule = models.ForeignKey(
+        to=JourneySchedule,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="journeys",
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=("schedule", "departure_time"),
+                name="unique_schedule_departure",
+            )
+        ]
 
     @staticmethod
     def validate_time(departure_time, arrival_time, error_to_raise):
@@ -215,6 +349,9 @@ class Ticket(models.Model):
     order = models.ForeignKey(
         to=Order, on_delete=models.CASCADE, related_name="tickets"
     )
+    # Copy of the journey's departure time, the partition key of the
+    # ticket table when `manage_partitions` is used on PostgreSQL.
+    departure_time = models.DateTimeField(editable=False)
 
     @staticmethod
     def validate_seat(seat, seats_in_cargo, error_to_raise):
@@ -234,6 +371,10 @@ class Ticket(models.Model):
                 }
             )
 
+    def save(self, *args, **kwargs):
+        self.departure_time = self.journey.departure_time
+        super().save(*args, **kwargs)
+
     def clean(self):
         Ticket.validate_seat(
             self.seat, self.journey.train.places_in_cargo, ValidationError
@@ -243,4 +384,179 @@ class Ticket(models.Model):
         )
 
     class Meta:
-        unique_together = ("cargo", "seat", "journey")
+        # With the partition key, like the unique index of the partitioned
+        # table, so taken seat lookups only scan the journey's partition.
+        unique_together = ("cargo", "seat", "journey", "departure_time")
+
+
+class ArchivedJourney(models.Model):
+    """
+    Journey that arrived before the archive cutoff, keeping its original id.
+    Moved here by `archive_journeys` so `Journey` only holds live trips.
+    """
+
+    route = models.ForeignKey(
+        to=Route, on_delete=models.CASCADE, related_name="archived_journeys"
+    )
+    train = models.ForeignKey(
+        to=Train, on_delete=models.CASCADE, related_name="archived_journeys"
+    )
+    departure_time = models.DateTimeField(db_index=True)
+    arrival_time = models.DateTimeField()
+    crew = models.ManyToManyField(to=Crew, related_name="archived_journeys")
+
+    def __str__(self):
+        return f"{self.route}: {self.train}"
+
+
+class ArchivedTicket(models.Model):
+    cargo = models.PositiveIntegerField()
+    seat = models.PositiveIntegerField()
+    journey = models.ForeignKey(
+        to=ArchivedJourney, on_delete=models.CASCADE, related_name="tickets"
+    )
+    order = models.ForeignKey(
+        to=Order, on_delete=models.CASCADE, related_name="archived_tickets"
+    )
+
+
+class OrderSummary(models.Model):
+    """
+    One row per order, written with the order, so the order history is
+    listed and filtered without touching tickets and journeys.
+    """
+
+    order = models.OneToOneField(
+        to=Order,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="summary",
+    )
+    user = models.ForeignKey(
+        to=settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="order_summaries",
+    )
+    created_at = models.DateTimeField()
+    ticket_count = models.PositiveIntegerField()
+    first_departure = models.DateTimeField()
+    route_label = models.CharField(max_length=255)
+    total_distance = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=["user", "first_departure"])]
+
+    def __str__(self):
+        return f"{self.order}: {self.route_label}"
+
+
+class IdempotencyKey(models.Model):
+    key = models.CharField(max_length=255)
+    user = models.ForeignKey(
+        to=settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="idempotency_keys",
+    )
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response_body = models.JSONField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        unique_together = ("user", "key")
+
+    @property
+    def is_expired(self):
+        return self.created_at < timezone.now() - settings.IDEMPOTENCY_KEY_TTL
+
+    def __str__(self):
+        return f"{self.user}: {self.key}"
+
+
+class BoardEntry(models.Model):
+    DEPARTURE = "departure"
+    ARRIVAL = "arrival"
+    KIND_CHOICES = ((DEPARTURE, "Departure"), (ARRIVAL, "Arrival"))
+
+    station = models.ForeignKey(
+        to=Station, on_delete=models.CASCADE, related_name="board_entries"
+    )
+    journey = models.ForeignKey(
+        to=Journey, on_delete=models.CASCADE, related_name="board_entries"
+    )
+    kind = models.CharField(max_length=9, choices=KIND_CHOICES)
+    time = models.DateTimeField()
+    source_name = models.CharField(max_length=31)
+    destination_name = models.CharField(max_length=31)
+    train_name = models.CharField(max_length=31)
+    train_type_name = models.CharField(max_length=31)
+    departure_time = models.DateTimeField()
+    arrival_time = models.DateTimeField()
+    seats_left = models.IntegerField()
+
+    class Meta:
+        unique_together = ("journey", "kind")
+        indexes = [models.Index(fields=["station", "kind", "time"])]
+
+    def __str__(self):
+        return f"{self.station} {self.kind}: {self.journey}"
+
+
+class CappedLog(models.Model):
+    """Diagnostics table of which only the most recent rows are kept."""
+
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        abstract = True
+        ordering = ("-created_at",)
+
+    @classmethod
+    def trim(cls, keep):
+        """Deletes all but the `keep` most recent rows."""
+        kept_ids = cls.objects.order_by("-id").values_list("id", flat=True)
+        oldest_kept = list(kept_ids[keep - 1 : keep])
+        if oldest_kept:
+            cls.objects.filter(id__lt=oldest_kept[0]).delete()
+
+
+class RequestProfile(CappedLog):
+    CPROFILE = "cprofile"
+    SAMPLE = "sample"
+    KIND_CHOICES = ((CPROFILE, "cProfile"), (SAMPLE, "Sampled stacks"))
+
+    user = models.ForeignKey(
+        to=settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="request_profiles",
+    )
+    method = models.CharField(max_length=7)
+    path = models.CharField(max_length=255)
+    query_string = models.TextField(blank=True)
+    view_name = models.CharField(max_length=127, db_index=True)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    sql_count = models.PositiveIntegerField()
+    sql_time_ms = models.FloatField()
+    sql = models.JSONField(default=list)
+    kind = models.CharField(max_length=8, choices=KIND_CHOICES)
+    profile = models.TextField()
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
+
+
+class SlowQuery(CappedLog):
+    view_name = models.CharField(max_length=127, db_index=True)
+    duration_ms = models.FloatField()
+    sql = models.TextField()
+    params = models.TextField(blank=True)
+    location = models.CharField(max_length=255, blank=True)
+    plan = models.TextField(blank=True)
+
+    class Meta(CappedLog.Meta):
+        verbose_name_plural = "slow queries"
+
+    def __str__(self):
+        return f"{self.view_name} ({self.duration_ms:.0f} ms)"
@@ -0,0 +1,561 @@
+import math
+import random
+import string
+from collections import namedtuple
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.db import connection, transaction
+from django.utils import timezone
+
+from train_station.autocomplete import bump_index_version
+from train_station.boards import build_board_entries
+from train_station.geo import encode_geohash, geodesic_kilometers
+from train_station.models import (
+    Address,
+    BoardEntry,
+    Crew,
+    Journey,
+    JourneySchedule,
+    Order,
+    OrderSummary,
+    Route,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+)
+from train_station.schedules import plan_journeys
+
+TrainTypeSpec = namedtuple(
+    "TrainTypeSpec", ("speed_kmh", "cargo_number", "places_in_cargo", "weight")
+)
+
+# Latitude and longitude ranges of the generated map, about the size of
+# a country like Ukraine.
+MAP_BOUNDS = ((45.0, 52.0), (22.0, 40.0))
+TRAIN_TYPES = {
+    "Intercity": TrainTypeSpec(140, 9, 56, 4),
+    "Regional": TrainTypeSpec(80, 6, 80, 5),
+    "Night": TrainTypeSpec(90, 14, 36, 1),
+}
+# fmt: off
+NAME_SYLLABLES = (
+    "bo", "dor", "hra", "ka", "ko", "lo", "lyk", "mi", "no", "pol",
+    "ra", "sta", "tor", "ve", "vy", "ze", "zhy", "bur", "myr", "lan",
+)
+# fmt: on
+FIRST_NAMES = ("Anna", "Bohdan", "Daria", "Ivan", "Olena", "Petro", "Yuliia")
+LAST_NAMES = ("Bondar", "Koval", "Melnyk", "Shevchuk", "Tkachenko", "Zhuk")
+ORDER_SIZES = (1, 1, 1, 1, 2, 2, 3, 4)
+MEAN_LEAD_DAYS = 12
+MAX_LEAD_DAYS = 60
+DIAGONAL_ROUTE_SHARE = 0.3
+FIRST_DEPARTURE_HOUR = 5
+LAST_DEPARTURE_HOUR = 22
+TURNAROUND = timedelta(hours=1)
+MAX_TRAINS = 10**5
+TICKET_COLUMNS = ("journey", "order", "cargo", "seat", "departure_time")
+SUMMARY_COLUMNS = (
+    "order",
+    "user",
+    "created_at",
+    "ticket_count",
+    "first_departure",
+    "route_label",
+    "total_distance",
+)
+
+# fmt: off
+# Demand by departure hour and by weekday (Monday first), as a share of
+# the peak load factor.
+DEMAND_CURVES = {
+    "flat": ((1.0,) * 24, (1.0,) * 7),
+    "commuter": (
+        (
+            0.1, 0.1, 0.1, 0.1, 0.2, 0.5, 0.8, 1.0, 1.0, 0.7, 0.5, 0.5,
+            0.5, 0.5, 0.5, 0.6, 0.8, 1.0, 1.0, 0.7, 0.5, 0.3, 0.2, 0.1,
+        ),
+        (1.0, 1.0, 1.0, 1.0, 1.0, 0.6, 0.5),
+    ),
+    "leisure": (
+        (
+            0.1, 0.1, 0.1, 0.1, 0.1, 0.2, 0.4, 0.6, 0.8, 1.0, 1.0, 1.0,
+            1.0, 1.0, 0.9, 0.9, 0.8, 0.8, 0.7, 0.6, 0.5, 0.4, 0.2, 0.1,
+        ),
+        (0.6, 0.5, 0.5, 0.6, 0.9, 1.0, 1.0),
+    ),
+}
+# fmt: on
+
+
+@dataclass
+class NetworkSpec:
+    seed: int = 1
+    stations: int = 50
+    departures_per_day: int = 2
+    months: int = 1
+    start: date = None
+    load_factor: float = 0.6
+    demand_curve: str = "commuter"
+    users: int = 1000
+    batch_size: int = 500
+
+    @property
+    def first_day(self):
+        return self.start or timezone.localdate()
+
+    @property
+    def last_day(self):
+        return self.first_day + timedelta(days=30 * self.months - 1)
+
+    @property
+    def start_time(self):
+        """
+        Midnight starting the first day, the present of the generated
+        data whatever the time it is generated at.
+        """
+        return timezone.make_aware(datetime.combine(self.first_day, time()))
+
+
+@contextmanager
+def explicit_order_dates():
+    """Lets `bulk_create` keep the `created_at` set on generated orders."""
+    field = Order._meta.get_field("created_at")
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def insert_rows(model, field_names, rows, batch_size=1000):
+    """
+    Inserts tuples of database values of `field_names` with multi-row
+    INSERTs, without model instances or per-value field preparation.
+    """
+    fields = [model._meta.get_field(name) for name in field_names]
+    ops = connection.ops
+    batch_size = min(batch_size, ops.bulk_batch_size(fields, rows) or 1)
+    columns = ", ".join(ops.quote_name(field.column) for field in fields)
+    placeholder = f"({', '.join(['%s'] * len(fields))})"
+    sql = f"INSERT INTO {ops.quote_name(model._meta.db_table)} ({columns})"
+
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start : start + batch_size]
+            cursor.execute(
+                f"{sql} VALUES {', '.join([placeholder] * len(batch))}",
+                [value for row in batch for value in row],
+            )
+
+
+def station_names(rng, count):
+    names = []
+    taken = set()
+    while len(names) < count:
+        name = "".join(
+            rng.choice(NAME_SYLLABLES) for _ in range(rng.randint(2, 3))
+        ).capitalize()
+        if name in taken:
+            name = f"{name} {len(names)}"
+        taken.add(name)
+        names.append(name)
+
+    return names
+
+
+def grid_positions(rng, count):
+    """
+    Places `count` points on a square grid over `MAP_BOUNDS`, each jittered
+    inside its cell, and returns their `(row, column)` and coordinates.
+    """
+    side = math.ceil(math.sqrt(count))
+    (min_latitude, max_latitude), (min_longitude, max_longitude) = MAP_BOUNDS
+    cell_latitude = (max_latitude - min_latitude) / side
+    cell_longitude = (max_longitude - min_longitude) / side
+
+    positions = []
+    for index in range(count):
+        row, column = divmod(index, side)
+        latitude = min_latitude + cell_latitude * (
+            row + 0.5 + rng.uniform(-0.35, 0.35)
+        )
+        longitude = min_longitude + cell_longitude * (
+            column + 0.5 + rng.uniform(-0.35, 0.35)
+        )
+        positions.append(
+            (
+                (row, column),
+                Decimal(f"{latitude:.6f}"),
+                Decimal(f"{longitude:.6f}"),
+            )
+        )
+
+    return positions
+
+
+def neighbour_pairs(rng, positions):
+    """
+    Connects every grid cell to its right and lower neighbours, and
+    sometimes to the lower right one.
+    """
+    index_by_cell = {
+        cell: index for index, (cell, _, _) in enumerate(positions)
+    }
+    pairs = []
+    for index, ((row, column), _, _) in enumerate(positions):
+        neighbours = [(row, column + 1), (row + 1, column)]
+        if rng.random() < DIAGONAL_ROUTE_SHARE:
+            neighbours.append((row + 1, column + 1))
+        for cell in neighbours:
+            if cell in index_by_cell:
+                pairs.append((index, index_by_cell[cell]))
+
+    return pairs
+
+
+def round_up_minutes(duration, step=5):
+    minutes = math.ceil(duration.total_seconds() / 60 / step) * step
+    return timedelta(minutes=minutes)
+
+
+class NetworkGenerator:
+    """
+    Writes a synthetic network described by a `NetworkSpec`: stations on
+    a map grid, routes between neighbours in both directions, one train
+    per daily departure of each pair of stations running there and back,
+    their schedules expanded into journeys, and tickets sold following a
+    demand curve. The same seed and start date give the same network.
+    """
+
+    def __init__(self, spec, progress=None):
+        self.spec = spec
+        self.rng = random.Random(spec.seed)
+        self.progress = progress
+        self.counts = dict.fromkeys(
+            (
+                "stations",
+                "routes",
+                "trains",
+                "journeys",
+                "orders",
+                "tickets",
+            ),
+            0,
+        )
+
+    def generate(self):
+        with transaction.atomic():
+            schedules, crew_by_train = self.create_catalog()
+        self.create_journeys(schedules, crew_by_train)
+
+        return self.counts
+
+    def create_catalog(self):
+        spec = self.spec
+        rng = self.rng
+        names = station_names(rng, spec.stations)
+        positions = grid_positions(rng, spec.stations)
+        pairs = neighbour_pairs(rng, positions)
+        train_prefix = "".join(rng.choices(string.ascii_uppercase, k=3))
+        if len(pairs) * spec.departures_per_day >= MAX_TRAINS:
+            raise ValueError("The network needs more trains than names.")
+        if Station.objects.filter(name__in=names).exists():
+            raise ValueError(
+                f"Station names of seed {spec.seed} are taken, was it "
+                "already generated?"
+            )
+
+        addresses = Address.objects.bulk_create(
+            [Address(country="Synthetic", city=name[:31]) for name in names]
+        )
+        stations = Station.objects.bulk_create(
+            [
+                Station(
+                    name=name,
+                    latitude=latitude,
+                    longitude=longitude,
+                    geohash=encode_geohash(latitude, longitude),
+                    address=address,
+                )
+                for name, (_, latitude, longitude), address in zip(
+                    names, positions, addresses
+                )
+            ]
+        )
+        bump_index_version()
+        routes = Route.objects.bulk_create(
+            [
+                Route(source=stations[first], destination=stations[second])
+                for pair in pairs
+                for first, second in (pair, pair[::-1])
+            ]
+        )
+        train_types = {
+            name: TrainType.objects.get_or_create(name=name)[0]
+            for name in TRAIN_TYPES
+        }
+
+        trains = []
+        plans = []
+        for index in range(len(pairs)):
+            outbound, inbound = routes[2 * index], routes[2 * index + 1]
+            distance = geodesic_kilometers(
+                (outbound.source.latitude, outbound.source.longitude),
+                (
+                    outbound.destination.latitude,
+                    outbound.destination.longitude,
+                ),
+            )
+            slot_hours = (
+                LAST_DEPARTURE_HOUR - FIRST_DEPARTURE_HOUR
+            ) / spec.departures_per_day
+            for slot in range(spec.departures_per_day):
+                type_name = rng.choices(
+                    list(TRAIN_TYPES),
+                    weights=[
+                        train_type.weight
+                        for train_type in TRAIN_TYPES.values()
+                    ],
+                )[0]
+                train_type = TRAIN_TYPES[type_name]
+                train = Train(
+                    name=f"{train_prefix}{len(trains):05d}",
+                    cargo_number=train_type.cargo_number,
+                    places_in_cargo=train_type.places_in_cargo,
+                    train_type=train_types[type_name],
+                )
+                trains.append(train)
+                minutes = (
+                    round(
+                        (
+                            FIRST_DEPARTURE_HOUR
+                            + slot_hours * (slot + rng.random())
+                        )
+                        * 12
+                    )
+                    * 5
+                )
+                departure = datetime.combine(date.min, time()) + timedelta(
+                    minutes=minutes
+                )
+                duration = round_up_minutes(
+                    timedelta(hours=distance / train_type.speed_kmh)
+                    + timedelta(minutes=10)
+                )
+                plans.append((outbound, train, departure.time(), duration))
+                plans.append(
+                    (
+                        inbound,
+                        train,
+                        (departure + duration + TURNAROUND).time(),
+                        duration,
+                    )
+                )
+
+        if Train.objects.filter(
+            name__in=[train.name for train in trains]
+        ).exists():
+            raise ValueError(
+                f"Train names of seed {spec.seed} are taken, was it already "
+                "generated?"
+            )
+        Train.objects.bulk_create(trains)
+        crews = Crew.objects.bulk_create(
+            [
+                Crew(
+                    first_name=rng.choice(FIRST_NAMES),
+                    last_name=rng.choice(LAST_NAMES),
+                )
+                for _ in range(2 * len(trains))
+            ]
+        )
+        crew_by_train = {
+            train.id: crews[2 * index : 2 * index + 2]
+            for index, train in enumerate(trains)
+        }
+        schedules = JourneySchedule.objects.bulk_create(
+            [
+                JourneySchedule(
+                    route=route,
+                    train=train,
+                    departure_time=departure_time,
+                    duration=duration,
+                    valid_from=spec.first_day,
+                    valid_until=spec.last_day,
+                )
+                for route, train, departure_time, duration in plans
+            ]
+        )
+        ScheduleCrew = JourneySchedule.crew.through
+        ScheduleCrew.objects.bulk_create(
+            [
+                ScheduleCrew(journeyschedule_id=schedule.id, crew_id=crew.id)
+                for schedule in schedules
+                for crew in crew_by_train[schedule.train_id]
+            ]
+        )
+
+        self.counts["stations"] = len(stations)
+        self.counts["routes"] = len(routes)
+        self.counts["trains"] = len(trains)
+
+        return schedules, crew_by_train
+
+    def create_users(self):
+        User = get_user_model()
+        emails = [
+            f"network-{self.spec.seed}-{index}@example.com"
+            for index in range(self.spec.users)
+        ]
+        User.objects.bulk_create(
+            [
+                User(email=email, password=UNUSABLE_PASSWORD_PREFIX)
+                for email in emails
+            ],
+            ignore_conflicts=True,
+        )
+
+        return sorted(
+            User.objects.filter(email__in=emails).values_list("id", flat=True)
+        )
+
+    def create_journeys(self, schedules, crew_by_train):
+        spec = self.spec
+        user_ids = self.create_users()
+        journeys, _ = plan_journeys(
+            schedules, spec.first_day, spec.last_day, spec.start_time
+        )
+        journeys.sort(key=lambda journey: journey.departure_time)
+        CrewLink = Journey.crew.through
+
+        with explicit_order_dates():
+            for start in range(0, len(journeys), spec.batch_size):
+                batch = journeys[start : start + spec.batch_size]
+                for journey in batch:
+                    journey.route = journey.schedule.route
+                    journey.train = journey.schedule.train
+
+                with transaction.atomic():
+                    Journey.objects.bulk_create(batch)
+                    CrewLink.objects.bulk_create(
+                        [
+                            CrewLink(journey_id=journey.id, crew_id=crew.id)
+                            for journey in batch
+                            for crew in crew_by_train[journey.train_id]
+                        ]
+                    )
+                    self.create_tickets(batch, user_ids)
+
+                self.counts["journeys"] += len(batch)
+                if self.progress is not None:
+                    self.progress(self.counts)
+
+    def sell_tickets(self, journey, user_ids):
+        """
+        Returns the orders of `journey` with the `(cargo, seat)` of their
+        tickets. Orders are placed a random lead time before departure,
+        and not after the start of the data, so they only depend on the
+        seed and the journey.
+        """
+        rng = self.rng
+        hour_demand, weekday_demand = DEMAND_CURVES[self.spec.demand_curve]
+        departure = timezone.localtime(journey.departure_time)
+        load = (
+            self.spec.load_factor
+            * hour_demand[departure.hour]
+            * weekday_demand[departure.weekday()]
+            * rng.lognormvariate(0, 0.2)
+        )
+        train = journey.train
+        capacity = train.capacity
+        seats = rng.sample(range(capacity), round(capacity * min(load, 1)))
+
+        sold = []
+        index = 0
+        while index < len(seats):
+            size = rng.choice(ORDER_SIZES)
+            lead_days = min(rng.expovariate(1 / MEAN_LEAD_DAYS), MAX_LEAD_DAYS)
+            order = Order(
+                user_id=rng.choice(user_ids),
+                created_at=min(
+                    journey.departure_time - timedelta(days=lead_days),
+                    self.spec.start_time,
+                ),
+            )
+            places = [
+                divmod(seat, train.places_in_cargo)
+                for seat in seats[index : index + size]
+            ]
+            sold.append(
+                (order, [(cargo + 1, seat + 1) for cargo, seat in places])
+            )
+            index += size
+
+        journey.tickets_sold = len(seats)
+
+        return sold
+
+    def create_tickets(self, journeys, user_ids):
+        """
+        Writes the tickets and order summaries of `journeys` as plain
+        rows: building and saving millions of model instances is what
+        `bulk_create` spends its time on.
+        """
+        adapt = connection.ops.adapt_datetimefield_value
+        sold = []
+        for journey in journeys:
+            # Generated orders are for one journey each.
+            summary = (
+                adapt(journey.departure_time),
+                str(journey.route),
+                journey.route.distance_in_kilometers,
+            )
+            sold += [
+                (journey.id, summary, order, places)
+                for order, places in self.sell_tickets(journey, user_ids)
+            ]
+        Order.objects.bulk_create(
+            [order for _, _, order, _ in sold], batch_size=5000
+        )
+
+        ticket_rows = []
+        summary_rows = []
+        for journey_id, summary, order, places in sold:
+            departure_time, route_label, distance = summary
+            ticket_rows += [
+                (journey_id, order.id, cargo, seat, departure_time)
+                for cargo, seat in places
+            ]
+            summary_rows.append(
+                (
+                    order.id,
+                    order.user_id,
+                    adapt(order.created_at),
+                    len(places),
+                    departure_time,
+                    route_label,
+                    distance,
+                )
+            )
+        insert_rows(Ticket, TICKET_COLUMNS, ticket_rows)
+        insert_rows(OrderSummary, SUMMARY_COLUMNS, summary_rows)
+        BoardEntry.objects.bulk_create(
+            [
+                entry
+                for journey in journeys
+                for entry in build_board_entries(journey)
+            ]
+        )
+
+        self.counts["orders"] += len(sold)
+        self.counts["tickets"] += len(ticket_rows)
+
+
+def generate_network(spec, progress=None):
+    return NetworkGenerator(spec, progress).generate()
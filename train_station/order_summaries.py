@@ -0,0 +1,75 @@
+from train_station.models import Order, OrderSummary
+
+ROUTE_LABEL_MAX_LENGTH = OrderSummary._meta.get_field("route_label").max_length
+SUMMARY_FIELDS = (
+    "user",
+    "created_at",
+    "ticket_count",
+    "first_departure",
+    "route_label",
+    "total_distance",
+)
+
+
+def build_order_summary(order, tickets):
+    """
+    Summarizes `tickets`, whose journeys come with their route stations,
+    as the `OrderSummary` of `order`.
+    """
+    journeys = sorted(
+        {ticket.journey for ticket in tickets},
+        key=lambda journey: (journey.departure_time, journey.id),
+    )
+    route_labels = list(
+        dict.fromkeys(str(journey.route) for journey in journeys)
+    )
+    route_label = ", ".join(route_labels)
+    if len(route_label) > ROUTE_LABEL_MAX_LENGTH:
+        route_label = route_label[: ROUTE_LABEL_MAX_LENGTH - 1] + "…"
+
+    return OrderSummary(
+        order=order,
+        user_id=order.user_id,
+        created_at=order.created_at,
+        ticket_count=len(tickets),
+        first_departure=journeys[0].departure_time,
+        route_label=route_label,
+        total_distance=sum(
+            journey.route.distance_in_kilometers for journey in journeys
+        ),
+    )
+
+
+def summary_orders():
+    related = ("route__source", "route__destination")
+    return Order.objects.prefetch_related(
+        *(
+            f"{tickets}__journey__{relation}"
+            for tickets in ("tickets", "archived_tickets")
+            for relation in related
+        )
+    )
+
+
+def refresh_order_summaries(order_ids, batch_size=1000):
+    """
+    Rewrites the summaries of the given orders in one upsert, and drops
+    those of orders left without tickets.
+    """
+    order_ids = set(order_ids)
+    summaries = [
+        build_order_summary(order, order.history_tickets)
+        for order in summary_orders().filter(id__in=order_ids)
+        if order.history_tickets
+    ]
+    OrderSummary.objects.filter(
+        order_id__in=order_ids - {summary.order_id for summary in summaries}
+    ).delete()
+
+    OrderSummary.objects.bulk_create(
+        summaries,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=("order",),
+        update_fields=SUMMARY_FIELDS,
+    )
@@ -0,0 +1,206 @@
+from datetime import date
+
+from django.db import connection, transaction
+
+from train_station.models import Journey, Order, Ticket
+
+PARTITION_KEY = "departure_time"
+JOURNEY_TABLE = Journey._meta.db_table
+TICKET_TABLE = Ticket._meta.db_table
+
+# Index columns recreated on the partitioned tables; every unique index
+# has to include the partition key.
+TABLE_INDEXES = {
+    JOURNEY_TABLE: {
+        "indexes": (("route_id",), ("train_id",), ("schedule_id",)),
+        "unique": (("schedule_id", PARTITION_KEY),),
+    },
+    TICKET_TABLE: {
+        "indexes": (("journey_id",), ("order_id",)),
+        "unique": (("cargo", "seat", "journey_id", PARTITION_KEY),),
+    },
+}
+
+
+def is_supported():
+    return connection.vendor == "postgresql"
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def add_months(month, months):
+    month_index = month.year * 12 + month.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def iter_months(first, last):
+    month = month_start(first)
+    while month <= last:
+        yield month
+        month = add_months(month, 1)
+
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y%m}"
+
+
+def is_partitioned(cursor, table):
+    cursor.execute(
+        "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [table]
+    )
+    row = cursor.fetchone()
+
+    return row is not None and row[0] == "p"
+
+
+def attached_partitions(cursor, table):
+    cursor.execute(
+        """
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = %s
+        """,
+        [table],
+    )
+
+    return {name for (name,) in cursor.fetchall()}
+
+
+def create_partitions(cursor, months, tables=(JOURNEY_TABLE, TICKET_TABLE)):
+    """Creates the monthly partitions that are missing."""
+    created = []
+    for table in tables:
+        existing = attached_partitions(cursor, table)
+        for month in months:
+            name = partition_name(table, month)
+            if name in existing:
+                continue
+            cursor.execute(
+                f"CREATE TABLE {name} PARTITION OF {table} "
+                "FOR VALUES FROM (%s) TO (%s)",
+                [month, add_months(month, 1)],
+            )
+            created.append(name)
+
+    return created
+
+
+def detach_partitions(cursor, before):
+    """
+    Detaches the partitions of months that ended before `before`, tickets
+    first. Detached tables that are empty, as they are once the journeys
+    were archived, are dropped.
+    """
+    detached = []
+    for table in (TICKET_TABLE, JOURNEY_TABLE):
+        for name in sorted(attached_partitions(cursor, table)):
+            suffix = name.rsplit("_p", 1)[-1]
+            if not suffix.isdigit():
+                continue
+            month = date(int(suffix[:4]), int(suffix[4:]), 1)
+            if add_months(month, 1) > before:
+                continue
+
+            cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+            cursor.execute(
+                "SELECT conname FROM pg_constraint "
+                "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+                [name],
+            )
+            for (constraint,) in cursor.fetchall():
+                cursor.execute(
+                    f'ALTER TABLE {name} DROP CONSTRAINT "{constraint}"'
+                )
+            cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {name})")
+            if not cursor.fetchone()[0]:
+                cursor.execute(f"DROP TABLE {name}")
+            detached.append(name)
+
+    return detached
+
+
+def _convert_table(cursor, table, months):
+    old_table = f"{table}_unpartitioned"
+    sequence = f"{table}_partitioned_id_seq"
+    indexes = TABLE_INDEXES[table]
+
+    cursor.execute(f"ALTER TABLE {table} RENAME TO {old_table}")
+    # Identity columns are not allowed on partitioned tables before
+    # PostgreSQL 17, so ids come from a plain sequence.
+    cursor.execute(
+        f"CREATE TABLE {table} (LIKE {old_table} INCLUDING DEFAULTS) "
+        f"PARTITION BY RANGE ({PARTITION_KEY})"
+    )
+    cursor.execute(f"CREATE SEQUENCE {sequence} OWNED BY {table}.id")
+    cursor.execute(
+        f"ALTER TABLE {table} ALTER COLUMN id "
+        f"SET DEFAULT nextval('{sequence}')"
+    )
+    cursor.execute(
+        f"SELECT setval('{sequence}', "
+        f"COALESCE((SELECT max(id) FROM {old_table}), 0) + 1, false)"
+    )
+    cursor.execute(
+        f"ALTER TABLE {table} ADD CONSTRAINT {table}_partitioned_pkey "
+        f"PRIMARY KEY (id, {PARTITION_KEY})"
+    )
+    for columns in indexes["indexes"]:
+        cursor.execute(
+            f"CREATE INDEX {table}_{'_'.join(columns)}_idx "
+            f"ON {table} ({', '.join(columns)})"
+        )
+    for columns in indexes["unique"]:
+        cursor.execute(
+            f"CREATE UNIQUE INDEX {table}_{'_'.join(columns)}_uniq "
+            f"ON {table} ({', '.join(columns)})"
+        )
+    cursor.execute(
+        f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT"
+    )
+    create_partitions(cursor, months, tables=(table,))
+    cursor.execute(f"INSERT INTO {table} SELECT * FROM {old_table}")
+    # Drops the foreign keys that pointed at the old table as well.
+    cursor.execute(f"DROP TABLE {old_table} CASCADE")
+
+
+def convert_tables(last_month):
+    """
+    Rebuilds the journey and ticket tables as monthly range partitions on
+    `departure_time`, from the first month with data, or the current one,
+    to `last_month`. Rows outside those months go to a default partition.
+
+    Tickets reference journeys through `(journey_id, departure_time)`, so
+    both tables are pruned by the same month and a journey's tickets
+    move with it when it is rescheduled. Board rows and crew links keep
+    their `journey_id` column without a database level foreign key;
+    Django still cascades their deletion.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"SELECT min({PARTITION_KEY}) FROM {JOURNEY_TABLE}")
+        first = cursor.fetchone()[0]
+        today = date.today()
+        months = list(
+            iter_months(
+                min(first.date(), today) if first else today, last_month
+            )
+        )
+
+        _convert_table(cursor, JOURNEY_TABLE, months)
+        _convert_table(cursor, TICKET_TABLE, months)
+        cursor.execute(
+            f"ALTER TABLE {TICKET_TABLE} "
+            f"ADD FOREIGN KEY (journey_id, {PARTITION_KEY}) "
+            f"REFERENCES {JOURNEY_TABLE} (id, {PARTITION_KEY}) "
+            "ON UPDATE CASCADE DEFERRABLE INITIALLY DEFERRED"
+        )
+        cursor.execute(
+            f"ALTER TABLE {TICKET_TABLE} ADD FOREIGN KEY (order_id) "
+            f"REFERENCES {Order._meta.db_table} (id) "
+            "DEFERRABLE INITIALLY DEFERRED"
+        )
+
+    return months
@@ -0,0 +1,150 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+
+from train_station.instrumentation import QueryTimer, timed_queries, view_label
+from train_station.models import RequestProfile
+from user.authentication import ClaimsJWTAuthentication
+
+PROFILE_HEADER = "HTTP_X_PROFILE"
+PROFILE_PARAM = "_profile"
+PROFILE_STATS_LIMIT = 60
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of the thread that started it every `interval`
+    seconds and counts the stacks in collapsed (flame graph) format.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = Counter()
+        self._stopped = threading.Event()
+
+    def _run(self, thread_id):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_name} "
+                    f"({os.path.basename(code.co_filename)}:"
+                    f"{code.co_firstlineno})"
+                )
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def enable(self):
+        self._thread = threading.Thread(
+            target=self._run, args=(threading.get_ident(),), daemon=True
+        )
+        self._thread.start()
+
+    def disable(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def report(self):
+        return "\n".join(
+            f"{stack} {count}" for stack, count in self.samples.most_common()
+        )
+
+
+class CProfiler(cProfile.Profile):
+    def report(self):
+        stream = io.StringIO()
+        pstats.Stats(self, stream=stream).sort_stats("cumulative").print_stats(
+            PROFILE_STATS_LIMIT
+        )
+
+        return stream.getvalue()
+
+
+PROFILERS = {
+    RequestProfile.CPROFILE: CProfiler,
+    RequestProfile.SAMPLE: SamplingProfiler,
+}
+
+
+def requested_profiler(request):
+    value = request.META.get(PROFILE_HEADER) or request.GET.get(PROFILE_PARAM)
+    if not value:
+        return None
+
+    return value if value in PROFILERS else RequestProfile.CPROFILE
+
+
+def get_staff_user(request):
+    """Returns the staff user of a session or JWT request, if any."""
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        try:
+            user, _ = ClaimsJWTAuthentication().authenticate(
+                Request(request)
+            ) or (None, None)
+        except APIException:
+            return None
+
+    if user is not None and user.is_staff:
+        return user
+
+    return None
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests of staff users that send `X-Profile: cprofile` (or
+    `sample`), or the `?_profile=` query flag, and stores the report
+    with SQL timings as a `RequestProfile`. Its id is returned in the
+    `X-Profile-Id` header; see the `request_profiles` command.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        kind = requested_profiler(request)
+        staff_user = get_staff_user(request) if kind else None
+        if staff_user is None:
+            return self.get_response(request)
+
+        profiler = PROFILERS[kind]()
+        timer = QueryTimer(record_statements=True)
+        start = time.perf_counter()
+        with timed_queries(timer):
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        duration = time.perf_counter() - start
+
+        profile = RequestProfile.objects.create(
+            user_id=staff_user.id,
+            method=request.method,
+            path=request.path[:255],
+            query_string=request.META.get("QUERY_STRING", ""),
+            view_name=view_label(request),
+            status_code=response.status_code,
+            duration_ms=duration * 1000,
+            sql_count=timer.count,
+            sql_time_ms=timer.duration * 1000,
+            sql=timer.statements,
+            kind=kind,
+            profile=profiler.report(),
+        )
+        RequestProfile.trim(settings.REQUEST_PROFILE_LIMIT)
+        response["X-Profile-Id"] = str(profile.id)
+
+        return response
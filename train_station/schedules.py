@@ -0,0 +1,164 @@
+from bisect import bisect_right, insort
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from train_station.boards import refresh_journey_boards
+from train_station.models import Journey, JourneySchedule
+
+
+def iter_departures(schedule, start, end):
+    """
+    Yields the aware departure datetimes of `schedule` between the `start`
+    and `end` dates, both included.
+    """
+    day = max(start, schedule.valid_from)
+    last_day = min(end, schedule.valid_until)
+
+    while day <= last_day:
+        if schedule.runs_on(day):
+            yield timezone.make_aware(
+                datetime.combine(day, schedule.departure_time)
+            )
+        day += timedelta(days=1)
+
+
+class TrainTimeline:
+    """
+    Journeys of each train as departure-sorted intervals.
+
+    Journeys of one train never overlap, so arrivals are sorted as well and
+    only the latest journey departing before a candidate arrives can
+    conflict with it.
+    """
+
+    def __init__(self, train_ids, start, end):
+        self.intervals = defaultdict(list)
+        journeys = (
+            Journey.objects.filter(
+                train_id__in=train_ids,
+                departure_time__lte=end,
+                arrival_time__gte=start,
+            )
+            .order_by("departure_time")
+            .values_list("train_id", "departure_time", "arrival_time")
+        )
+        for train_id, departure_time, arrival_time in journeys:
+            self.intervals[train_id].append((departure_time, arrival_time))
+
+    def conflicts(self, train_id, departure_time, arrival_time):
+        intervals = self.intervals[train_id]
+        index = bisect_right(
+            intervals, arrival_time, key=lambda interval: interval[0]
+        )
+
+        return index > 0 and intervals[index - 1][1] >= departure_time
+
+    def add(self, train_id, departure_time, arrival_time):
+        insort(self.intervals[train_id], (departure_time, arrival_time))
+
+
+def plan_journeys(schedules, start, end, now=None):
+    """
+    Returns the unsaved journeys that `schedules` add between the `start`
+    and `end` dates, and the number of departures skipped because their
+    train is already busy. Departures a previous run created, and those
+    not after `now` (the current time by default), are left out, so
+    planning is idempotent.
+    """
+    window_start = timezone.make_aware(
+        datetime.combine(start, datetime.min.time())
+    )
+    window_end = timezone.make_aware(
+        datetime.combine(end + timedelta(days=1), datetime.min.time())
+    )
+    longest = max((schedule.duration for schedule in schedules), default=None)
+    if longest is None:
+        return [], 0
+
+    timeline = TrainTimeline(
+        {schedule.train_id for schedule in schedules},
+        window_start,
+        window_end + longest,
+    )
+    existing = set(
+        Journey.objects.filter(
+            schedule__in=schedules,
+            departure_time__gte=window_start,
+            departure_time__lt=window_end,
+        ).values_list("schedule_id", "departure_time")
+    )
+    now = now or timezone.now()
+    journeys = []
+    conflicts = 0
+
+    for schedule in schedules:
+        for departure_time in iter_departures(schedule, start, end):
+            if (
+                departure_time <= now
+                or (schedule.id, departure_time) in existing
+            ):
+                continue
+
+            arrival_time = departure_time + schedule.duration
+            if timeline.conflicts(
+                schedule.train_id, departure_time, arrival_time
+            ):
+                conflicts += 1
+                continue
+
+            timeline.add(schedule.train_id, departure_time, arrival_time)
+            journeys.append(
+                Journey(
+                    route_id=schedule.route_id,
+                    train_id=schedule.train_id,
+                    schedule=schedule,
+                    departure_time=departure_time,
+                    arrival_time=arrival_time,
+                )
+            )
+
+    return journeys, conflicts
+
+
+def create_journeys(journeys, crew_ids_by_schedule, batch_size=1000):
+    """
+    Inserts planned journeys with their crew and board rows, one
+    transaction per batch.
+    """
+    CrewLink = Journey.crew.through
+
+    for start in range(0, len(journeys), batch_size):
+        batch = journeys[start : start + batch_size]
+        with transaction.atomic():
+            Journey.objects.bulk_create(batch)
+            CrewLink.objects.bulk_create(
+                [
+                    CrewLink(journey_id=journey.id, crew_id=crew_id)
+                    for journey in batch
+                    for crew_id in crew_ids_by_schedule[journey.schedule_id]
+                ]
+            )
+            refresh_journey_boards([journey.id for journey in batch])
+
+
+def generate_journeys(start, end, schedules=None, batch_size=1000):
+    if schedules is None:
+        schedules = JourneySchedule.objects.filter(
+            valid_from__lte=end, valid_until__gte=start
+        )
+    schedules = list(schedules)
+
+    crew_ids_by_schedule = defaultdict(list)
+    crew_links = JourneySchedule.crew.through.objects.filter(
+        journeyschedule__in=schedules
+    ).values_list("journeyschedule_id", "crew_id")
+    for schedule_id, crew_id in crew_links:
+        crew_ids_by_schedule[schedule_id].append(crew_id)
+
+    journeys, conflicts = plan_journeys(schedules, start, end)
+    create_journeys(journeys, crew_ids_by_schedule, batch_size)
+
+    return len(journeys), conflicts
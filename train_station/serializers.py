@@ -1,9 +1,14 @@
 from django.db import transaction
-from geopy import Nominatim
+from django.db.models import Count, F, Q, prefetch_related_objects
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 from rest_framework.fields import CharField
+from rest_framework.settings import api_settings
 
+from train_station.autocomplete import bump_index_version
+from train_station.bulk import BulkCreateSerializerMixin, BulkListSerializer
+from train_station.fieldsets import SparseFieldsetSerializerMixin
+from train_station.geocoding import reverse_geocode, reverse_geocode_many
 from train_station.models import (
     Crew,
     Station,
@@ -13,34 +18,94 @@ from train_station.models import (
     Journey,
     Ticket,
     Order,
+    OrderSummary,
     Address,
+    StationImageVariant,
+    BoardEntry,
+    SlowQuery,
 )
+from train_station.order_summaries import build_order_summary
 
+MAX_QUOTE_ITEMS = 1000
 
-class StationSerializer(serializers.ModelSerializer):
+
+class StationImageVariantSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = StationImageVariant
+        fields = ("width", "height", "format", "image")
+
+
+class StationSerializer(
+    SparseFieldsetSerializerMixin,
+    BulkCreateSerializerMixin,
+    serializers.ModelSerializer,
+):
     address = CharField(source="address.__str__", read_only=True)
+    image_variants = StationImageVariantSerializer(many=True, read_only=True)
+
+    field_querysets = {
+        "address": {"select_related": ("address",)},
+        "image_variants": {"prefetch_related": ("image_variants",)},
+    }
 
     def get_address(self, validated_data):
-        geolocator = Nominatim(user_agent="train_station")
-        latitude = self.validated_data["latitude"]
-        longitude = self.validated_data["longitude"]
-        location_info = geolocator.reverse(f"{latitude},{longitude}")
-        address = dict()
-
-        if location_info:
-            address_raw = location_info.raw["address"]
-            address["country"] = address_raw.get("country")
-            address["city"] = address_raw.get("city")
-            if not address["city"]:
-                if "town" in address_raw:
-                    address["city"] = address_raw["town"]
-                elif "village" in address_raw:
-                    address["city"] = address_raw["village"]
-
-            return address
+        return reverse_geocode(
+            validated_data["latitude"], validated_data["longitude"]
+        )
+
+    def get_addresses(self, validated_data):
+        return reverse_geocode_many(
+            [
+                (attrs["latitude"], attrs["longitude"])
+                for attrs in validated_data
+            ]
+        )
+
+    def bulk_create(self, validated_data):
+        addresses, errors = self.get_addresses(validated_data)
+        if errors:
+            raise ValidationError(
+                [
+                    {api_settings.NON_FIELD_ERRORS_KEY: [errors[index]]}
+                    if index in errors
+                    else {}
+                    for index in range(len(validated_data))
+                ]
+            )
+        keys = {(address["country"], address["city"]) for address in addresses}
+        query = Q()
+        for country, city in keys:
+            query |= Q(country=country, city=city)
+
+        existing = {}
+        for address in Address.objects.filter(query).order_by("-id"):
+            existing[(address.country, address.city)] = address
+        missing = [
+            Address(country=country, city=city)
+            for country, city in keys
+            if (country, city) not in existing
+        ]
+        for address in Address.objects.bulk_create(missing):
+            existing[(address.country, address.city)] = address
+
+        stations = []
+        for attrs, address in zip(validated_data, addresses):
+            station = Station(
+                **attrs,
+                address=existing[(address["country"], address["city"])],
+            )
+            station.update_geohash()
+            stations.append(station)
+        Station.objects.bulk_create(stations)
+        bump_index_version()
+        prefetch_related_objects(stations, "image_variants")
+
+        return stations
 
     def create(self, validated_data):
-        address = self.get_address(validated_data)
+        address = validated_data.pop("address", None)
+        if address is None:
+            address = self.get_address(validated_data)
         r_address = Address.objects.filter(**address).first()
 
         if not r_address:
@@ -51,28 +116,70 @@ class StationSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Station
-        fields = ("id", "name", "latitude", "longitude", "address")
+        fields = (
+            "id",
+            "name",
+            "latitude",
+            "longitude",
+            "address",
+            "image_variants",
+        )
+        list_serializer_class = BulkListSerializer
+
+
+class StationNearbySerializer(StationSerializer):
+    distance_km = serializers.FloatField(read_only=True)
+
+    class Meta(StationSerializer.Meta):
+        fields = StationSerializer.Meta.fields + ("distance_km",)
+
+
+class StationSuggestionSerializer(serializers.Serializer):
+    id = serializers.IntegerField(read_only=True)
+    name = serializers.CharField(read_only=True)
+    city = serializers.CharField(read_only=True, allow_null=True)
 
 
 class StationImageSerializer(serializers.ModelSerializer):
+    image_variants = StationImageVariantSerializer(many=True, read_only=True)
+
     class Meta:
         model = Station
-        fields = ("image",)
+        fields = ("image", "image_variants")
 
 
-class CrewSerializer(serializers.ModelSerializer):
+class CrewSerializer(
+    SparseFieldsetSerializerMixin,
+    BulkCreateSerializerMixin,
+    serializers.ModelSerializer,
+):
     class Meta:
         model = Crew
         fields = "__all__"
+        list_serializer_class = BulkListSerializer
 
 
-class TrainTypeSerializer(serializers.ModelSerializer):
+class TrainTypeSerializer(
+    SparseFieldsetSerializerMixin, serializers.ModelSerializer
+):
     class Meta:
         model = TrainType
         fields = "__all__"
 
 
-class RouteSerializer(serializers.ModelSerializer):
+class RouteSerializer(
+    SparseFieldsetSerializerMixin,
+    BulkCreateSerializerMixin,
+    serializers.ModelSerializer,
+):
+    field_querysets = {
+        "source": {"select_related": ("source",)},
+        "destination": {"select_related": ("destination",)},
+        "distance_in_kilometers": {
+            "select_related": ("source", "destination")
+        },
+    }
+
     def validate(self, attrs):
         data = super(RouteSerializer, self).validate(attrs)
         Route.validate_station(
@@ -83,6 +190,7 @@ class RouteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Route
         fields = ("id", "source", "destination", "distance_in_kilometers")
+        list_serializer_class = BulkListSerializer
 
 
 class RouteListSerializer(RouteSerializer):
@@ -98,8 +206,24 @@ class RouteDetailSerializer(RouteSerializer):
     source = StationSerializer(read_only=True)
     destination = StationSerializer(read_only=True)
 
-
-class TrainSerializer(serializers.ModelSerializer):
+    field_querysets = {
+        **RouteSerializer.field_querysets,
+        "source": {
+            "select_related": ("source__address",),
+            "prefetch_related": ("source__image_variants",),
+        },
+        "destination": {
+            "select_related": ("destination__address",),
+            "prefetch_related": ("destination__image_variants",),
+        },
+    }
+
+
+class TrainSerializer(
+    SparseFieldsetSerializerMixin,
+    BulkCreateSerializerMixin,
+    serializers.ModelSerializer,
+):
     class Meta:
         model = Train
         fields = (
@@ -110,6 +234,7 @@ class TrainSerializer(serializers.ModelSerializer):
             "train_type",
             "capacity",
         )
+        list_serializer_class = BulkListSerializer
 
     def validate(self, attrs):
         data = super(TrainSerializer, self).validate(attrs)
@@ -123,10 +248,25 @@ class TrainListRetrieveSerializer(TrainSerializer):
         slug_field="name", queryset=TrainType.objects.all()
     )
 
+    field_querysets = {"train_type": {"select_related": ("train_type",)}}
 
-class JourneySerializer(serializers.ModelSerializer):
+
+class JourneySerializer(
+    SparseFieldsetSerializerMixin, serializers.ModelSerializer
+):
     tickets_available = serializers.IntegerField(read_only=True)
 
+    field_querysets = {
+        "tickets_available": {
+            "annotate": {
+                "tickets_available": (
+                    F("train__cargo_number") * F("train__places_in_cargo")
+                    - Count("tickets")
+                )
+            }
+        },
+    }
+
     class Meta:
         model = Journey
         fields = (
@@ -154,6 +294,51 @@ class JourneySerializer(serializers.ModelSerializer):
         return data
 
 
+def load_journey_prices(journeys):
+    # numpy is only loaded by the workers that price journeys.
+    from train_station.fares import quote_journeys
+
+    prices = quote_journeys([journey.id for journey in journeys])
+    for journey in journeys:
+        journey.price = prices.get(journey.id)
+
+
+def load_cargo_availability(journeys):
+    """Counts the seats left in every car of `journeys` in one query."""
+    rows = (
+        Journey.objects.filter(id__in=[journey.id for journey in journeys])
+        .values_list(
+            "id",
+            "train__cargo_number",
+            "train__places_in_cargo",
+            "tickets__cargo",
+        )
+        .annotate(sold=Count("tickets"))
+        .order_by()
+    )
+    trains = {}
+    sold = {}
+    for journey_id, cargo_number, places_in_cargo, cargo, count in rows:
+        trains[journey_id] = (cargo_number, places_in_cargo)
+        sold[journey_id, cargo] = count
+
+    for journey in journeys:
+        cargo_number, places_in_cargo = trains[journey.id]
+        journey.cargo_availability = [
+            {
+                "cargo": cargo,
+                "seats_available": places_in_cargo
+                - sold.get((journey.id, cargo), 0),
+            }
+            for cargo in range(1, cargo_number + 1)
+        ]
+
+
+class CargoAvailabilitySerializer(serializers.Serializer):
+    cargo = serializers.IntegerField(read_only=True)
+    seats_available = serializers.IntegerField(read_only=True)
+
+
 class JourneyListSerializer(JourneySerializer):
     route = serializers.CharField(source="route.__str__", read_only=True)
     train = serializers.SlugRelatedField(
@@ -162,6 +347,34 @@ class JourneyListSerializer(JourneySerializer):
     crew = serializers.SlugRelatedField(
         slug_field="full_name", queryset=Crew.objects.all(), many=True
     )
+    price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, read_only=True
+    )
+    cargo_availability = CargoAvailabilitySerializer(many=True, read_only=True)
+
+    field_querysets = {
+        **JourneySerializer.field_querysets,
+        "route": {"select_related": ("route__source", "route__destination")},
+        "train": {"select_related": ("train",)},
+        "crew": {"prefetch_related": ("crew",)},
+    }
+    expanded_field_querysets = {
+        "train": {"select_related": ("train__train_type",)},
+    }
+    expandable_fields = {
+        "route": RouteListSerializer,
+        "train": TrainListRetrieveSerializer,
+    }
+    optional_fields = {
+        "price": load_journey_prices,
+        "cargo_availability": load_cargo_availability,
+    }
+
+    class Meta(JourneySerializer.Meta):
+        fields = JourneySerializer.Meta.fields + (
+            "price",
+            "cargo_availability",
+        )
 
 
 class TicketSeatsSerializer(serializers.ModelSerializer):
@@ -177,6 +390,12 @@ class JourneyDetailSerializer(JourneyListSerializer):
         source="tickets", many=True, read_only=True
     )
 
+    field_querysets = {
+        **JourneyListSerializer.field_querysets,
+        **JourneyListSerializer.expanded_field_querysets,
+        "taken_seats": {"prefetch_related": ("tickets",)},
+    }
+
     class Meta:
         model = Journey
         fields = (
@@ -187,22 +406,34 @@ class JourneyDetailSerializer(JourneyListSerializer):
             "arrival_time",
             "crew",
             "taken_seats",
+            "price",
+            "cargo_availability",
         )
 
 
 class TicketSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs)
+        journey = attrs["journey"]
         Ticket.validate_seat(
             attrs["seat"],
-            attrs["journey"].train.places_in_cargo,
+            journey.train.places_in_cargo,
             ValidationError,
         )
         Ticket.validate_cargo(
             attrs["cargo"],
-            attrs["journey"].train.cargo_number,
+            journey.train.cargo_number,
             ValidationError,
         )
+        if Ticket.objects.filter(
+            cargo=attrs["cargo"],
+            seat=attrs["seat"],
+            journey=journey,
+            departure_time=journey.departure_time,
+        ).exists():
+            raise ValidationError(
+                "The fields cargo, seat, journey must make a unique set."
+            )
 
         return data
 
@@ -211,17 +442,17 @@ class TicketSerializer(serializers.ModelSerializer):
         fields = ("id", "cargo", "seat", "journey")
 
 
-class TicketListSerializer(TicketSerializer):
-    journey = serializers.CharField(source="journey.__str__", read_only=True)
-
-
 class TicketDetailSerializer(TicketSerializer):
     journey = JourneyDetailSerializer()
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(
+    SparseFieldsetSerializerMixin, serializers.ModelSerializer
+):
     tickets = TicketSerializer(many=True, allow_empty=False)
 
+    field_querysets = {"tickets": {"prefetch_related": ("tickets",)}}
+
     class Meta:
         model = Order
         fields = ("id", "tickets", "created_at")
@@ -230,14 +461,102 @@ class OrderSerializer(serializers.ModelSerializer):
         with transaction.atomic():
             tickets_data = validated_data.pop("tickets")
             order = Order.objects.create(**validated_data)
-            for ticket_data in tickets_data:
+            tickets = [
                 Ticket.objects.create(order=order, **ticket_data)
+                for ticket_data in tickets_data
+            ]
+            journeys = Journey.objects.select_related(
+                "route__source", "route__destination"
+            ).in_bulk({ticket.journey_id for ticket in tickets})
+            for ticket in tickets:
+                ticket.journey = journeys[ticket.journey_id]
+            build_order_summary(order, tickets).save(force_insert=True)
             return order
 
 
-class OrderListSerializer(OrderSerializer):
-    tickets = TicketListSerializer(many=True, read_only=True)
+class OrderDetailSerializer(OrderSerializer):
+    tickets = TicketDetailSerializer(
+        source="history_tickets", many=True, read_only=True
+    )
 
+    field_querysets = {
+        "tickets": {
+            "prefetch_related": tuple(
+                f"{tickets}__journey__{relation}"
+                for tickets in ("tickets", "archived_tickets")
+                for relation in (
+                    "route__source",
+                    "route__destination",
+                    "train__train_type",
+                    "crew",
+                    "tickets",
+                )
+            )
+        }
+    }
+
+
+class OrderSummarySerializer(
+    SparseFieldsetSerializerMixin, serializers.ModelSerializer
+):
+    id = serializers.IntegerField(source="order_id", read_only=True)
 
-class OrderDetailSerializer(OrderSerializer):
-    tickets = TicketDetailSerializer(many=True, read_only=True)
+    class Meta:
+        model = OrderSummary
+        fields = (
+            "id",
+            "created_at",
+            "ticket_count",
+            "first_departure",
+            "route_label",
+            "total_distance",
+        )
+
+
+class BoardEntrySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BoardEntry
+        fields = (
+            "journey",
+            "time",
+            "source_name",
+            "destination_name",
+            "train_name",
+            "train_type_name",
+            "departure_time",
+            "arrival_time",
+            "seats_left",
+        )
+
+
+class SlowQuerySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SlowQuery
+        fields = (
+            "id",
+            "created_at",
+            "view_name",
+            "duration_ms",
+            "sql",
+            "params",
+            "location",
+            "plan",
+        )
+
+
+class FareQuoteItemSerializer(serializers.Serializer):
+    journey = serializers.IntegerField(min_value=1)
+    cargo = serializers.IntegerField(min_value=1)
+    seat = serializers.IntegerField(min_value=1)
+    price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, read_only=True
+    )
+    available = serializers.BooleanField(read_only=True)
+
+
+class FareQuoteSerializer(serializers.Serializer):
+    items = serializers.ListField(
+        child=FareQuoteItemSerializer(),
+        min_length=1,
+        max_length=MAX_QUOTE_ITEMS,
+    )
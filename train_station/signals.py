@@ -0,0 +1,124 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from train_station.autocomplete import bump_index_version
+from train_station.boards import adjust_seats_left, refresh_journey_boards
+from train_station.models import (
+    Address,
+    BoardEntry,
+    Journey,
+    Station,
+    Ticket,
+    Train,
+)
+from train_station.order_summaries import refresh_order_summaries
+
+
+@receiver(post_save, sender=Journey)
+def refresh_journey_board(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_journey_boards([instance.id])
+
+
+@receiver(pre_save, sender=Journey)
+def check_journey_summarized_fields(sender, instance, raw=False, **kwargs):
+    instance.summaries_outdated = (
+        not raw
+        and instance.pk is not None
+        and not Journey.objects.filter(
+            pk=instance.pk,
+            departure_time=instance.departure_time,
+            route=instance.route_id,
+        ).exists()
+    )
+
+
+@receiver(post_save, sender=Journey)
+def move_journey_tickets(sender, instance, created, raw=False, **kwargs):
+    if created or raw or not instance.summaries_outdated:
+        return
+
+    instance.tickets.exclude(departure_time=instance.departure_time).update(
+        departure_time=instance.departure_time
+    )
+    refresh_order_summaries(
+        instance.tickets.values_list("order_id", flat=True).distinct()
+    )
+
+
+@receiver(post_save, sender=Ticket)
+def take_board_seat(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        adjust_seats_left(instance.journey_id, -1)
+
+
+@receiver(post_delete, sender=Ticket)
+def release_board_seat(sender, instance, **kwargs):
+    adjust_seats_left(instance.journey_id, 1)
+
+
+@receiver(post_save, sender=Ticket)
+def summarize_ticket_order(sender, instance, raw=False, **kwargs):
+    # Orders and tickets written outside the order API, e.g. by the admin.
+    if not raw:
+        transaction.on_commit(
+            lambda: refresh_order_summaries([instance.order_id])
+        )
+
+
+@receiver(post_delete, sender=Ticket)
+def refresh_ticket_order_summary(sender, instance, **kwargs):
+    # After commit, as a deleted order would get its summary back.
+    transaction.on_commit(lambda: refresh_order_summaries([instance.order_id]))
+
+
+@receiver(post_save, sender=Train)
+def refresh_train_boards(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        upcoming = instance.journeys.filter(arrival_time__gte=timezone.now())
+        refresh_journey_boards(upcoming.values_list("id", flat=True))
+
+
+@receiver(post_save, sender=Station)
+def rename_board_station(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+
+    BoardEntry.objects.filter(journey__route__source=instance).exclude(
+        source_name=instance.name
+    ).update(source_name=instance.name)
+    BoardEntry.objects.filter(journey__route__destination=instance).exclude(
+        destination_name=instance.name
+    ).update(destination_name=instance.name)
+
+
+@receiver(pre_save, sender=Station)
+def check_station_indexed_fields(sender, instance, raw=False, **kwargs):
+    instance.index_outdated = (
+        raw
+        or instance.pk is None
+        or not Station.objects.filter(
+            pk=instance.pk, name=instance.name, address=instance.address_id
+        ).exists()
+    )
+
+
+@receiver(post_save, sender=Station)
+def refresh_station_index(sender, instance, raw=False, **kwargs):
+    if not raw and instance.index_outdated:
+        bump_index_version()
+
+
+@receiver(post_delete, sender=Station)
+def drop_from_station_index(sender, instance, **kwargs):
+    bump_index_version()
+
+
+@receiver(post_save, sender=Address)
+def refresh_station_index_cities(
+    sender, instance, created, raw=False, **kwargs
+):
+    if not created and not raw:
+        bump_index_version()
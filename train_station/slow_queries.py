@@ -0,0 +1,137 @@
+import os
+import random
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import DatabaseError, connection, connections, transaction
+
+from train_station import instrumentation
+from train_station.instrumentation import timed_queries, view_label
+from train_station.models import SlowQuery
+
+MAX_PARAMS_LENGTH = 2000
+EXPLAIN_TIMEOUT_MS = 10000
+# Frames of the execute wrappers themselves are skipped for the location.
+WRAPPER_FILES = {__file__, instrumentation.__file__}
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="slow-query-explain"
+        )
+
+    return _executor
+
+
+def call_site():
+    """Returns the innermost project frame as `path:line in function`."""
+    base_dir = str(settings.BASE_DIR)
+    for frame in reversed(traceback.extract_stack()):
+        filename = frame.filename
+        if (
+            filename.startswith(base_dir)
+            and "site-packages" not in filename
+            and filename not in WRAPPER_FILES
+        ):
+            return (
+                f"{os.path.relpath(filename, base_dir)}:{frame.lineno} "
+                f"in {frame.name}"
+            )[:255]
+
+    return ""
+
+
+def is_explainable(sql):
+    # EXPLAIN ANALYZE runs the statement, so only reads are explained.
+    return sql.lstrip().upper().startswith("SELECT")
+
+
+class SlowQueryRecorder:
+    """Execute wrapper that keeps the queries slower than `threshold`."""
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            if duration >= self.threshold:
+                query = SlowQuery(
+                    duration_ms=duration * 1000,
+                    sql=sql,
+                    params=repr(params)[:MAX_PARAMS_LENGTH],
+                    location=call_site(),
+                )
+                query.explain_params = None if many else params
+                self.queries.append(query)
+
+
+def explain_slow_query(slow_query_id, sql, params):
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"SET LOCAL statement_timeout = {EXPLAIN_TIMEOUT_MS}"
+            )
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", params)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+            transaction.set_rollback(True)
+    except DatabaseError as error:
+        plan = f"EXPLAIN failed: {error}"
+
+    try:
+        SlowQuery.objects.filter(id=slow_query_id).update(plan=plan)
+    finally:
+        connections.close_all()
+
+
+def save_slow_queries(queries, view_name):
+    for query in queries:
+        query.view_name = view_name
+    SlowQuery.objects.bulk_create(queries)
+    SlowQuery.trim(settings.SLOW_QUERY_LIMIT)
+
+    if connection.vendor != "postgresql":
+        return
+    for query in queries:
+        if (
+            query.id is not None
+            and is_explainable(query.sql)
+            and random.random() < settings.SLOW_QUERY_EXPLAIN_RATE
+        ):
+            get_executor().submit(
+                explain_slow_query, query.id, query.sql, query.explain_params
+            )
+
+
+class SlowQueryMiddleware:
+    """
+    Logs the queries of a request that took at least
+    `SLOW_QUERY_THRESHOLD` with their parameters, view and call site.
+    On PostgreSQL a sample of them is explained in the background.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = SlowQueryRecorder(
+            settings.SLOW_QUERY_THRESHOLD.total_seconds()
+        )
+        with timed_queries(recorder):
+            response = self.get_response(request)
+
+        if recorder.queries:
+            save_slow_queries(recorder.queries, view_label(request))
+
+        return response
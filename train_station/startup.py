@@ -0,0 +1,115 @@
+import threading
+import time
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.urls import get_resolver
+
+from train_station.autocomplete import get_station_index
+from train_station.geo import geodesic_kilometers
+from train_station.models import Route
+
+_warmups = {}
+_warmup_lock = threading.Lock()
+_warmup_results = {}
+_migrations_applied = False
+
+
+def warmup(name):
+    """
+    Registers a function that fills an in-process structure, run once per
+    worker before it reports ready.
+    """
+
+    def register(function):
+        _warmups[name] = function
+        return function
+
+    return register
+
+
+def run_warmups():
+    """
+    Runs the registered warm-ups that have not succeeded yet and returns
+    their duration in milliseconds, or the error they raised, by name.
+    Only successes are kept, so failed warm-ups are retried next time.
+    """
+    with _warmup_lock:
+        results = {}
+        for name, function in _warmups.items():
+            if name in _warmup_results:
+                results[name] = _warmup_results[name]
+                continue
+            start = time.perf_counter()
+            try:
+                function()
+            except Exception as error:
+                results[name] = {"error": repr(error)}
+            else:
+                results[name] = _warmup_results[name] = {
+                    "ms": round((time.perf_counter() - start) * 1000, 1)
+                }
+
+        return results
+
+
+def reset_warmups():
+    with _warmup_lock:
+        _warmup_results.clear()
+
+
+def check_database(alias=DEFAULT_DB_ALIAS):
+    """Runs a query, so it raises `OperationalError` while it is down."""
+    with connections[alias].cursor() as cursor:
+        cursor.execute("SELECT 1")
+
+
+def pending_migrations(alias=DEFAULT_DB_ALIAS):
+    executor = MigrationExecutor(connections[alias])
+    targets = executor.loader.graph.leaf_nodes()
+
+    return [
+        f"{migration.app_label}.{migration.name}"
+        for migration, _ in executor.migration_plan(targets)
+    ]
+
+
+def migrations_applied():
+    """Loading the migration graph is slow, so only "no" is rechecked."""
+    global _migrations_applied
+
+    if not _migrations_applied:
+        _migrations_applied = not pending_migrations()
+
+    return _migrations_applied
+
+
+def post_worker_init(worker):
+    """Gunicorn hook warming a worker before it accepts requests."""
+    run_warmups()
+    # Request threads open their own connections.
+    connections.close_all()
+
+
+@warmup("url_resolver")
+def warm_url_resolver():
+    get_resolver().reverse_dict
+
+
+@warmup("route_distances")
+def warm_route_distances():
+    routes = Route.objects.values_list(
+        "source__latitude",
+        "source__longitude",
+        "destination__latitude",
+        "destination__longitude",
+    )
+    for source_lat, source_lon, destination_lat, destination_lon in routes:
+        geodesic_kilometers(
+            (source_lat, source_lon), (destination_lat, destination_lon)
+        )
+
+
+@warmup("station_index")
+def warm_station_index():
+    get_station_index()
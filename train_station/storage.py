@@ -0,0 +1,117 @@
+import hashlib
+import os
+import tempfile
+import time
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+
+BLOB_DIRECTORY = "blobs"
+TEMP_DIRECTORY = os.path.join(BLOB_DIRECTORY, "tmp")
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores every file as `blobs/<d0d1>/<d2d3>/<sha256><ext>`.
+
+    The digest is computed while the content is streamed to a temporary
+    file, which is then moved into place unless a blob with the same
+    content already exists. Saving the same picture twice therefore
+    returns the same name and keeps a single file on disk. Blobs may be
+    shared by several rows, so they are not deleted along with a row;
+    `collect_media_blobs` removes the ones nothing references.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def blob_name(self, digest, extension):
+        return "/".join(
+            (BLOB_DIRECTORY, digest[:2], digest[2:4], digest + extension)
+        )
+
+    def _save(self, name, content):
+        temp_directory = self.path(TEMP_DIRECTORY)
+        os.makedirs(temp_directory, exist_ok=True)
+        digest = hashlib.sha256()
+
+        with tempfile.NamedTemporaryFile(
+            dir=temp_directory, delete=False
+        ) as temp_file:
+            for chunk in content.chunks():
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                digest.update(chunk)
+                temp_file.write(chunk)
+
+        extension = os.path.splitext(name)[1].lower()
+        name = self.blob_name(digest.hexdigest(), extension)
+        full_path = self.path(name)
+
+        try:
+            # Refresh the mtime so a pending collection keeps the blob.
+            os.utime(full_path)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            os.replace(temp_file.name, full_path)
+            if self.file_permissions_mode is not None:
+                os.chmod(full_path, self.file_permissions_mode)
+        else:
+            os.remove(temp_file.name)
+
+        return name
+
+    def is_stale(self, name, min_age):
+        try:
+            return os.path.getmtime(self.path(name)) <= time.time() - min_age
+        except FileNotFoundError:
+            return False
+
+    def delete_if_stale(self, name, min_age):
+        """
+        Deletes `name` unless it was written or reused within `min_age`
+        seconds. The file is moved aside first, so a concurrent `_save`
+        of the same content either refreshed its mtime before, and it is
+        moved back, or finds it gone and writes it again.
+        """
+        full_path = self.path(name)
+        temp_directory = self.path(TEMP_DIRECTORY)
+        os.makedirs(temp_directory, exist_ok=True)
+        claimed = os.path.join(temp_directory, f"{uuid.uuid4().hex}.delete")
+        try:
+            os.replace(full_path, claimed)
+        except FileNotFoundError:
+            return False
+
+        if os.path.getmtime(claimed) > time.time() - min_age:
+            os.replace(claimed, full_path)
+            return False
+
+        os.remove(claimed)
+        return True
+
+    def iter_blobs(self, min_age=0):
+        root = self.path(BLOB_DIRECTORY)
+
+        for directory, _, filenames in os.walk(root):
+            if os.path.relpath(directory, root).startswith("tmp"):
+                continue
+            for filename in filenames:
+                full_path = os.path.join(directory, filename)
+                name = os.path.relpath(full_path, self.location)
+                if self.is_stale(name, min_age):
+                    yield name.replace("\\", "/")
+
+    def iter_stale_temp_files(self, min_age):
+        temp_directory = self.path(TEMP_DIRECTORY)
+        if not os.path.isdir(temp_directory):
+            return
+
+        for filename in os.listdir(temp_directory):
+            name = os.path.join(TEMP_DIRECTORY, filename)
+            if self.is_stale(name, min_age):
+                yield name
+
+
+def station_image_storage():
+    return ContentAddressedStorage()
@@ -1,4 +1,11 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
 from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
 
 from train_station.models import (
     TrainType,
@@ -6,6 +13,8 @@ from train_station.models import (
     Station,
     Address,
     Route,
+    Train,
+    Journey,
 )
 
 CREW_URL = reverse("train_station:crew-list")
@@ -45,6 +54,42 @@ def detail_order_url(order_id):
     return reverse("train_station:order-detail", args=[order_id])
 
 
+def sample_user(**params):
+    defaults = {
+        "email": "user@test.com",
+        "password": "Password123",
+    }
+    defaults.update(params)
+
+    return get_user_model().objects.create_user(**defaults)
+
+
+def sample_staff(**params):
+    defaults = {
+        "email": "admin@test.com",
+        "is_staff": True,
+    }
+    defaults.update(params)
+
+    return sample_user(**defaults)
+
+
+class AuthenticatedTestCase(TestCase):
+    """
+    Starts every test with an empty cache, which holds the throttling
+    buckets, and a client authenticated as `self.user`, a staff member
+    when `staff` is set.
+    """
+
+    staff = False
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = sample_staff() if self.staff else sample_user()
+        self.client.force_authenticate(self.user)
+
+
 def sample_crew(**params):
     defaults = {
         "first_name": "Fred",
@@ -98,3 +143,39 @@ def sample_route(**params):
     defaults.update(params)
 
     return Route.objects.create(**params)
+
+
+def sample_train(**params):
+    defaults = {
+        "name": "ABC12345",
+        "cargo_number": 3,
+        "places_in_cargo": 20,
+    }
+    defaults.update(params)
+    if "train_type" not in defaults:
+        defaults["train_type"] = TrainType.objects.create(name="Express")
+
+    return Train.objects.create(**defaults)
+
+
+def sample_journey(**params):
+    departure_time = timezone.now() + timedelta(days=1)
+    defaults = {
+        "departure_time": departure_time,
+        "arrival_time": departure_time + timedelta(hours=5),
+    }
+    defaults.update(params)
+    if "route" not in defaults:
+        address = Address.objects.create(country="Ukraine", city="Kyiv")
+        defaults["route"] = Route.objects.create(
+            source=Station.objects.create(
+                name="Kyiv", latitude=50.45, longitude=30.52, address=address
+            ),
+            destination=Station.objects.create(
+                name="Lviv", latitude=49.84, longitude=24.03, address=address
+            ),
+        )
+    if "train" not in defaults:
+        defaults["train"] = sample_train()
+
+    return Journey.objects.create(**defaults)
@@ -0,0 +1,131 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from train_station.analytics import (
+    DAY_CACHE_KEY,
+    OPEN_DAY_CACHE_TIMEOUT,
+    PAST_DAY_CACHE_TIMEOUT,
+    load_days,
+)
+from train_station.models import Order, Ticket, TrainType
+from train_station.tests.samples import (
+    AuthenticatedTestCase,
+    sample_journey,
+    sample_train,
+)
+
+OCCUPANCY_URL = reverse("train_station:analytics-occupancy")
+
+
+class OccupancyAnalyticsTests(AuthenticatedTestCase):
+    staff = True
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        departure_time = timezone.localtime().replace(
+            hour=12, minute=0
+        ) + timedelta(days=10)
+        self.day = departure_time.date()
+        self.journey = sample_journey(departure_time=departure_time)
+        sample_journey(
+            departure_time=departure_time,
+            route=self.journey.route,
+            train=sample_train(
+                name="DEF67890",
+                train_type=TrainType.objects.create(name="Regional"),
+            ),
+        )
+        order = Order.objects.create(user=self.user)
+        for cargo, seat in ((1, 1), (1, 2), (2, 1)):
+            Ticket.objects.create(
+                cargo=cargo, seat=seat, journey=self.journey, order=order
+            )
+
+    def get_report(self, **params):
+        params = {"start": self.day, "end": self.day, **params}
+        return self.client.get(OCCUPANCY_URL, params)
+
+    def test_load_factor_by_train_type(self):
+        res = self.get_report(group_by="train_type")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                (row["group"], row["tickets_sold"], row["capacity"])
+                for row in res.data["load_factor"]
+            ],
+            [("Express", 3, 60), ("Regional", 0, 60)],
+        )
+        self.assertEqual(res.data["load_factor"][0]["load_factor"], 0.05)
+
+    def test_load_factor_by_route(self):
+        res = self.get_report()
+
+        self.assertEqual(len(res.data["load_factor"]), 1)
+        self.assertEqual(res.data["load_factor"][0]["journeys"], 2)
+        self.assertEqual(res.data["load_factor"][0]["tickets_sold"], 3)
+
+    def test_sell_out_curve_and_car_fill_rate(self):
+        res = self.get_report()
+        curve = [point["share_sold"] for point in res.data["sell_out_curve"]]
+
+        self.assertEqual(curve[0], 0.025)
+        self.assertEqual(curve[-1], 0)
+        self.assertEqual(
+            [row["fill_rate"] for row in res.data["car_fill_rate"]],
+            [0.05, 0.025, 0],
+        )
+
+    def test_day_buckets_are_cached(self):
+        self.get_report()
+        # Only the train type labels are read, the day bucket is cached.
+        with self.assertNumQueries(1):
+            self.get_report(group_by="train_type")
+
+    def test_days_before_local_today_cached_longer(self):
+        with mock.patch("train_station.analytics.cache") as day_cache:
+            day_cache.get_many.return_value = {}
+            with mock.patch(
+                "django.utils.timezone.localdate", return_value=self.day
+            ):
+                load_days(self.day - timedelta(days=1), self.day)
+
+        timeouts = {
+            key: timeout
+            for call in day_cache.set_many.call_args_list
+            for key, timeout in dict.fromkeys(*call.args).items()
+        }
+        self.assertEqual(
+            timeouts,
+            {
+                DAY_CACHE_KEY
+                % (self.day - timedelta(days=1)): (PAST_DAY_CACHE_TIMEOUT),
+                DAY_CACHE_KEY % self.day: OPEN_DAY_CACHE_TIMEOUT,
+            },
+        )
+
+    def test_invalid_params(self):
+        self.assertEqual(
+            self.get_report(group_by="station").status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        self.assertEqual(
+            self.get_report(end=self.day - timedelta(days=1)).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+    def test_staff_only(self):
+        user = get_user_model().objects.create_user(
+            email="user@test.com", password="Password123"
+        )
+        self.client.force_authenticate(user)
+
+        self.assertEqual(
+            self.get_report().status_code, status.HTTP_403_FORBIDDEN
+        )
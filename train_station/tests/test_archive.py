@@ -0,0 +1,100 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from train_station.archive import archive_journeys
+from train_station.models import (
+    ArchivedJourney,
+    ArchivedTicket,
+    BoardEntry,
+    Crew,
+    Journey,
+    Order,
+    Ticket,
+)
+from train_station.order_summaries import refresh_order_summaries
+from train_station.tests.samples import (
+    AuthenticatedTestCase,
+    ORDER_URL,
+    detail_order_url,
+    sample_journey,
+    sample_train,
+)
+
+
+class ArchiveJourneysTests(AuthenticatedTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        departure_time = timezone.now() - timedelta(days=200)
+        self.departed = sample_journey(
+            departure_time=departure_time,
+            arrival_time=departure_time + timedelta(hours=5),
+        )
+        self.crew = Crew.objects.create(first_name="Fred", last_name="Stone")
+        self.departed.crew.add(self.crew)
+        self.upcoming = sample_journey(
+            route=self.departed.route,
+            train=sample_train(
+                name="DEF67890", train_type=self.departed.train.train_type
+            ),
+        )
+        self.order = Order.objects.create(user=self.user)
+        for journey in (self.departed, self.upcoming):
+            Ticket.objects.create(
+                cargo=1, seat=1, journey=journey, order=self.order
+            )
+        refresh_order_summaries([self.order.id])
+
+    def archive(self):
+        return archive_journeys(timezone.now() - timedelta(days=90))
+
+    def test_moves_departed_journeys(self):
+        self.assertEqual(self.archive(), 1)
+
+        archived = ArchivedJourney.objects.get()
+        self.assertEqual(archived.id, self.departed.id)
+        self.assertEqual(list(archived.crew.all()), [self.crew])
+        self.assertEqual(
+            list(ArchivedTicket.objects.values_list("journey_id", "order")),
+            [(self.departed.id, self.order.id)],
+        )
+        self.assertEqual(list(Journey.objects.all()), [self.upcoming])
+        self.assertEqual(Ticket.objects.count(), 1)
+        self.assertFalse(
+            BoardEntry.objects.filter(journey_id=self.departed.id).exists()
+        )
+        self.assertEqual(self.archive(), 0)
+
+    def test_order_history_includes_archived_tickets(self):
+        self.archive()
+
+        res = self.client.get(ORDER_URL)
+        detail = self.client.get(detail_order_url(self.order.id))
+
+        self.assertEqual(res.data["results"][0]["ticket_count"], 2)
+        self.assertEqual(
+            [ticket["journey"]["id"] for ticket in detail.data["tickets"]],
+            [self.upcoming.id, self.departed.id],
+        )
+
+    def test_order_date_filter_after_archival(self):
+        self.archive()
+        departed_date = self.departed.departure_time.date()
+
+        res = self.client.get(ORDER_URL, {"date": departed_date})
+        empty = self.client.get(
+            ORDER_URL, {"date": departed_date - timedelta(days=1)}
+        )
+
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertEqual(empty.data["results"], [])
+
+    def test_command_uses_days(self):
+        call_command("archive_journeys", days=300, stdout=StringIO())
+        self.assertFalse(ArchivedJourney.objects.exists())
+
+        call_command("archive_journeys", stdout=StringIO())
+        self.assertTrue(ArchivedJourney.objects.exists())
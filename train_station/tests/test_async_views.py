@@ -0,0 +1,102 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from train_station.models import Order, Ticket
+from train_station.tests.samples import (
+    JOURNEY_URL,
+    sample_journey,
+    sample_user,
+)
+from train_station.throttling import ScopedTokenBucketThrottle
+
+ASYNC_JOURNEY_URL = reverse("train_station:async-journey-list")
+
+
+def async_journey_detail_url(journey_id):
+    return reverse("train_station:async-journey-detail", args=[journey_id])
+
+
+def async_journey_seats_url(journey_id):
+    return reverse("train_station:async-journey-seats", args=[journey_id])
+
+
+class AsyncJourneyTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = sample_user()
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+        self.journey = sample_journey()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(
+            cargo=2, seat=7, journey=self.journey, order=order
+        )
+
+    def test_auth_required(self):
+        response = APIClient().get(ASYNC_JOURNEY_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_list_matches_sync_endpoint(self):
+        response = self.client.get(ASYNC_JOURNEY_URL, {"source": "kyi"})
+        sync_response = self.client.get(
+            reverse("train_station:journey-list"), {"source": "kyi"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), sync_response.json())
+        self.assertEqual(
+            response.json()["results"][0]["tickets_available"], 59
+        )
+
+    def test_invalid_date_rejected(self):
+        response = self.client.get(ASYNC_JOURNEY_URL, {"date": "tomorrow"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_detail(self):
+        response = self.client.get(async_journey_detail_url(self.journey.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json()["taken_seats"], [{"cargo": 2, "seat": 7}]
+        )
+
+    def test_detail_not_found(self):
+        response = self.client.get(async_journey_detail_url(0))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_seat_map(self):
+        response = self.client.get(async_journey_seats_url(self.journey.id))
+        cargos = response.json()["cargos"]
+
+        self.assertEqual(len(cargos), 3)
+        self.assertEqual(cargos[1]["taken_seats"], [7])
+        self.assertEqual(cargos[1]["seats_available"], 19)
+
+    @mock.patch.object(
+        ScopedTokenBucketThrottle,
+        "THROTTLE_RATES",
+        {"user": "5/minute", "journey_search": "2/minute"},
+    )
+    def test_search_shares_throttle_with_sync_endpoint(self):
+        self.client.get(JOURNEY_URL)
+        self.client.get(ASYNC_JOURNEY_URL)
+
+        throttled = self.client.get(ASYNC_JOURNEY_URL)
+        detail = self.client.get(async_journey_detail_url(self.journey.id))
+
+        self.assertEqual(
+            throttled.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        self.assertIn("Retry-After", throttled)
+        self.assertEqual(detail.status_code, status.HTTP_200_OK)
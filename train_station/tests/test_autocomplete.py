@@ -0,0 +1,119 @@
+from django.core.cache import cache
+from django.db.models import F
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+
+from train_station.autocomplete import StationIndex, get_station_index
+from train_station.models import Address, Station, StationIndexVersion
+from train_station.tests.samples import (
+    AuthenticatedTestCase,
+    JOURNEY_URL,
+    sample_journey,
+)
+
+AUTOCOMPLETE_URL = reverse("train_station:station-autocomplete")
+
+
+class StationIndexTests(TestCase):
+    def setUp(self) -> None:
+        self.index = StationIndex(
+            [
+                (1, "Kyiv-Pasazhyrskyi", "Kyiv"),
+                (2, "Kyiv Darnytsia", "Kyiv"),
+                (3, "Lviv", "Lviv"),
+                (4, "Zaporizhzhia I", "Zaporizhzhia"),
+                (5, "Ivano-Frankivsk", None),
+                (6, "Košice", "Košice"),
+            ]
+        )
+
+    def test_prefix_of_any_word(self):
+        self.assertEqual(self.index.resolve("kyiv"), {1, 2})
+        self.assertEqual(self.index.resolve("darn"), {2})
+        self.assertEqual(self.index.resolve("frank"), {5})
+
+    def test_accents_and_punctuation_ignored(self):
+        self.assertEqual(self.index.resolve("kosi"), {6})
+        self.assertEqual(self.index.resolve("ivano frankivsk"), {5})
+
+    def test_typos_allowed_in_longer_queries(self):
+        self.assertEqual(self.index.resolve("zaporizhia"), {4})
+        self.assertEqual(self.index.resolve("darnitsa"), {2})
+        self.assertEqual(self.index.resolve("lvvi"), {3})
+        self.assertEqual(self.index.resolve("lvi"), {3})
+        self.assertEqual(self.index.resolve("kiv"), set())
+
+    def test_suggestions_ranked_by_typos(self):
+        index = StationIndex([(1, "Dnipro", "Dnipro"), (2, "Dnister", None)])
+
+        suggestions = index.suggest("dnis")
+
+        self.assertEqual(
+            suggestions,
+            [
+                {"id": 2, "name": "Dnister", "city": None},
+                {"id": 1, "name": "Dnipro", "city": "Dnipro"},
+            ],
+        )
+
+
+class StationAutocompleteTests(AuthenticatedTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.journey = sample_journey()
+
+    def test_suggests_without_querying_stations(self):
+        get_station_index()
+
+        # Only the index version is read.
+        with self.assertNumQueries(1):
+            response = self.client.get(AUTOCOMPLETE_URL, {"q": "lviw"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["name"] for item in response.data], ["Lviv"])
+
+    def test_query_required(self):
+        response = self.client.get(AUTOCOMPLETE_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_index_refreshed_when_stations_change(self):
+        get_station_index()
+        station = Station.objects.get(name="Lviv")
+        station.name = "Lemberg"
+        station.save()
+        Station.objects.create(
+            name="Odesa",
+            latitude=46.48,
+            longitude=30.72,
+            address=Address.objects.create(country="Ukraine", city="Odesa"),
+        )
+
+        self.assertEqual(
+            get_station_index().suggest("lemb")[0]["id"], station.id
+        )
+        self.assertEqual(
+            get_station_index().suggest("odesa")[0]["city"], "Odesa"
+        )
+
+    def test_index_version_shared_through_database(self):
+        index = get_station_index()
+        cache.clear()
+
+        self.assertIs(get_station_index(), index)
+        # As bumped by another worker.
+        StationIndexVersion.objects.update(version=F("version") + 1)
+        self.assertIsNot(get_station_index(), index)
+
+    def test_journey_search_resolves_names_with_typos(self):
+        response = self.client.get(
+            JOURNEY_URL, {"source": "kiyv", "destination": "lvi"}
+        )
+        no_match = self.client.get(JOURNEY_URL, {"source": "Odesa"})
+
+        self.assertEqual(
+            [journey["id"] for journey in response.data["results"]],
+            [self.journey.id],
+        )
+        self.assertEqual(no_match.data["results"], [])
@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from train_station.models import Order, Ticket
+from train_station.tests.samples import AuthenticatedTestCase, sample_journey
+
+
+def board_url(station_id):
+    return reverse("train_station:station-board", args=[station_id])
+
+
+class StationBoardTests(AuthenticatedTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.journey = sample_journey()
+        self.route = self.journey.route
+
+    def test_departures_and_arrivals(self):
+        departures = self.client.get(board_url(self.route.source_id))
+        arrivals = self.client.get(
+            board_url(self.route.destination_id), {"kind": "arrivals"}
+        )
+
+        self.assertEqual(departures.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            departures.data["results"][0]["journey"], self.journey.id
+        )
+        self.assertEqual(
+            departures.data["results"][0]["destination_name"], "Lviv"
+        )
+        self.assertEqual(departures.data["results"][0]["seats_left"], 60)
+        self.assertEqual(len(arrivals.data["results"]), 1)
+        self.assertEqual(
+            self.client.get(board_url(self.route.destination_id)).data[
+                "results"
+            ],
+            [],
+        )
+
+    def test_seats_left_follow_tickets(self):
+        order = Order.objects.create(user=self.user)
+        ticket = Ticket.objects.create(
+            cargo=1, seat=1, journey=self.journey, order=order
+        )
+        Ticket.objects.create(
+            cargo=1, seat=2, journey=self.journey, order=order
+        )
+        ticket.delete()
+
+        response = self.client.get(board_url(self.route.source_id))
+
+        self.assertEqual(response.data["results"][0]["seats_left"], 59)
+
+    def test_board_follows_journey_changes(self):
+        self.journey.departure_time += timedelta(hours=1)
+        self.journey.save()
+
+        response = self.client.get(board_url(self.route.source_id))
+
+        self.assertEqual(
+            response.data["results"][0]["departure_time"],
+            self.journey.departure_time.isoformat().replace("+00:00", "Z"),
+        )
+
+    def test_departed_journeys_hidden(self):
+        departure_time = timezone.now() - timedelta(hours=2)
+        sample_journey(
+            route=self.route,
+            train=self.journey.train,
+            departure_time=departure_time,
+            arrival_time=departure_time + timedelta(hours=1),
+        )
+
+        response = self.client.get(board_url(self.route.source_id))
+
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_paged_by_time_cursor(self):
+        journey_ids = [self.journey.id]
+        for hours in (12, 18):
+            departure_time = self.journey.departure_time + timedelta(
+                hours=hours
+            )
+            journey = sample_journey(
+                route=self.route,
+                train=self.journey.train,
+                departure_time=departure_time,
+                arrival_time=departure_time + timedelta(hours=1),
+            )
+            journey_ids.append(journey.id)
+
+        first = self.client.get(
+            board_url(self.route.source_id), {"page_size": 2}
+        )
+        second = self.client.get(first.data["next"])
+
+        self.assertEqual(
+            [entry["journey"] for entry in first.data["results"]],
+            journey_ids[:2],
+        )
+        self.assertEqual(
+            [entry["journey"] for entry in second.data["results"]],
+            journey_ids[2:],
+        )
@@ -0,0 +1,207 @@
+import asyncio
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from geopy.exc import GeocoderServiceError
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from train_station.geocoding import reverse_geocode_many
+from train_station.models import Crew, Route, Station, Train, TrainType
+from train_station.serializers import StationSerializer
+from train_station.tests.samples import (
+    AuthenticatedTestCase,
+    CREW_URL,
+    ROUTE_URL,
+    STATION_URL,
+    TRAIN_URL,
+    sample_address,
+)
+
+
+class BulkCreateTests(AuthenticatedTestCase):
+    staff = True
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.train_type = TrainType.objects.create(name="Express")
+
+    def test_create_crew_list(self):
+        payload = [
+            {"first_name": "Fred", "last_name": "Stone"},
+            {"first_name": "Wilma", "last_name": "Stone"},
+        ]
+
+        res = self.client.post(CREW_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 2)
+        self.assertEqual(Crew.objects.count(), 2)
+
+    def test_create_trains_in_constant_queries(self):
+        payload = [
+            {
+                "name": f"ABC{number:05}",
+                "cargo_number": 3,
+                "places_in_cargo": 20,
+                "train_type": self.train_type.id,
+            }
+            for number in range(20)
+        ]
+
+        # Train types, existing names, insert, and the savepoint pair.
+        with self.assertNumQueries(5):
+            res = self.client.post(TRAIN_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Train.objects.count(), 20)
+        self.assertEqual(res.data[0]["capacity"], 60)
+
+    def test_per_item_errors(self):
+        Train.objects.create(
+            name="ABC00001",
+            cargo_number=3,
+            places_in_cargo=20,
+            train_type=self.train_type,
+        )
+        train = {
+            "cargo_number": 3,
+            "places_in_cargo": 20,
+            "train_type": self.train_type.id,
+        }
+        payload = [
+            {**train, "name": "ABC00002"},
+            {**train, "name": "ABC00001"},
+            {**train, "name": "too long name"},
+            {**train, "name": "ABC00003", "train_type": 999},
+            {**train, "name": "ABC00002"},
+        ]
+
+        res = self.client.post(TRAIN_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn("name", res.data[1])
+        self.assertIn("name", res.data[2])
+        self.assertIn("train_type", res.data[3])
+        self.assertIn("name", res.data[4])
+        self.assertEqual(Train.objects.count(), 1)
+
+    def test_create_routes(self):
+        address = sample_address(country="Ukraine", city="Kyiv")
+        kyiv, lviv, odesa = (
+            Station.objects.create(
+                name=name, latitude=latitude, longitude=30, address=address
+            )
+            for name, latitude in (("Kyiv", 50), ("Lviv", 49), ("Odesa", 46))
+        )
+        Route.objects.create(source=kyiv, destination=lviv)
+        payload = [
+            {"source": kyiv.id, "destination": odesa.id},
+            {"source": kyiv.id, "destination": lviv.id},
+            {"source": lviv.id, "destination": lviv.id},
+        ]
+
+        res = self.client.post(ROUTE_URL, payload, format="json")
+        payload.pop(1)
+        payload.pop(1)
+        created = self.client.post(ROUTE_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn("non_field_errors", res.data[1])
+        self.assertIn("source", res.data[2])
+        self.assertEqual(created.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(created.data[0]["distance_in_kilometers"], 444)
+
+    @mock.patch.object(StationSerializer, "get_addresses")
+    def test_create_stations(self, get_addresses):
+        existing = sample_address(country="Ukraine", city="Kyiv")
+        get_addresses.return_value = (
+            [
+                {"country": "Ukraine", "city": "Kyiv"},
+                {"country": "Ukraine", "city": "Lviv"},
+            ],
+            {},
+        )
+        payload = [
+            {"name": "Kyiv", "latitude": 50.45, "longitude": 30.52},
+            {"name": "Lviv", "latitude": 49.84, "longitude": 24.03},
+        ]
+
+        res = self.client.post(STATION_URL, payload, format="json")
+        kyiv = Station.objects.get(name="Kyiv")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data[1]["address"], "Ukraine, Lviv")
+        self.assertEqual(kyiv.address, existing)
+        self.assertEqual(kyiv.geohash[:4], "u8vx")
+
+
+class FakeGeolocator:
+    """Async Nominatim stand-in failing for points in the Atlantic."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def reverse(self, query):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if float(query.split(",")[1]) < 0:
+            raise GeocoderServiceError("Service unavailable")
+
+        return mock.Mock(
+            raw={"address": {"country": "Ukraine", "city": query}}
+        )
+
+
+@override_settings(GEOCODING_CONCURRENCY=2, GEOCODING_MIN_DELAY_SECONDS=0)
+class ReverseGeocodeManyTests(TestCase):
+    def setUp(self) -> None:
+        self.geolocator = FakeGeolocator()
+        patcher = mock.patch(
+            "train_station.geocoding.get_geolocator",
+            return_value=self.geolocator,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_bounded_concurrency_and_per_point_errors(self):
+        points = [(50, 30), (49, 24), (40, -30), (46, 30), (50, 30)]
+
+        addresses, errors = reverse_geocode_many(points)
+
+        self.assertEqual(self.geolocator.max_in_flight, 2)
+        self.assertEqual(addresses[0], addresses[4])
+        self.assertEqual(addresses[1]["city"], "49,24")
+        self.assertEqual(addresses[2], {"country": None, "city": None})
+        self.assertEqual(set(errors), {2})
+
+    def test_failed_lookups_reported_per_station(self):
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="admin@test.com", password="Password123", is_staff=True
+            )
+        )
+        payload = [
+            {"name": "Kyiv", "latitude": 50.45, "longitude": 30.52},
+            {"name": "Atlantic", "latitude": 40, "longitude": -30},
+        ]
+
+        res = client.post(STATION_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn("non_field_errors", res.data[1])
+        self.assertFalse(Station.objects.exists())
@@ -0,0 +1,113 @@
+from decimal import Decimal
+
+import numpy as np
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+
+from train_station.fares import compute_fares
+from train_station.models import Order, Ticket
+from train_station.tests.samples import (
+    AuthenticatedTestCase,
+    JOURNEY_URL,
+    detail_journey_url,
+    sample_journey,
+)
+
+FARE_QUOTE_URL = reverse("train_station:fares-quote")
+TARIFF = {
+    "currency": "UAH",
+    "minimum": 10.0,
+    "bands": ((100, 1.0), (None, 0.5)),
+    "train_type_multipliers": {"Night": 2.0},
+    "surge": ((0.5, 1.5),),
+}
+
+
+class ComputeFaresTests(TestCase):
+    def test_bands_multipliers_and_surge(self):
+        fares = compute_fares(
+            np.array([5.0, 300.0, 300.0]),
+            ["Regional", "Regional", "Night"],
+            np.array([0.0, 0.49, 0.5]),
+            TARIFF,
+        )
+
+        self.assertEqual(fares.tolist(), [10.0, 200.0, 600.0])
+
+
+class FareQuoteTests(AuthenticatedTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.journey = sample_journey()
+        Ticket.objects.create(
+            cargo=2,
+            seat=7,
+            journey=self.journey,
+            order=Order.objects.create(user=self.user),
+        )
+
+    def test_quotes_batch_with_two_queries(self):
+        items = [
+            {"journey": self.journey.id, "cargo": cargo, "seat": seat}
+            for cargo in (1, 2, 3)
+            for seat in range(1, 21)
+        ]
+
+        with self.assertNumQueries(2):
+            response = self.client.post(
+                FARE_QUOTE_URL, {"items": items}, format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 60)
+        self.assertEqual(len({quote["price"] for quote in response.data}), 1)
+        self.assertEqual(
+            [
+                (quote["cargo"], quote["seat"])
+                for quote in response.data
+                if not quote["available"]
+            ],
+            [(2, 7)],
+        )
+
+    def test_unknown_journeys_and_seats_rejected(self):
+        response = self.client.post(
+            FARE_QUOTE_URL,
+            {
+                "items": [
+                    {"journey": self.journey.id, "cargo": 1, "seat": 1},
+                    {"journey": self.journey.id + 1, "cargo": 1, "seat": 1},
+                    {"journey": self.journey.id, "cargo": 1, "seat": 21},
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.data["items"]), {1, 2})
+
+    def test_journey_price_is_opt_in(self):
+        quote = self.client.post(
+            FARE_QUOTE_URL,
+            {"items": [{"journey": self.journey.id, "cargo": 1, "seat": 1}]},
+            format="json",
+        )
+        with self.assertNumQueries(2):
+            plain = self.client.get(JOURNEY_URL, {"fields": "id"})
+        # Count, page and one query to price the whole page.
+        with self.assertNumQueries(3):
+            priced = self.client.get(
+                JOURNEY_URL, {"fields": "id", "include": "price"}
+            )
+        detail = self.client.get(
+            detail_journey_url(self.journey.id), {"include": "price"}
+        )
+
+        self.assertNotIn("price", plain.data["results"][0])
+        self.assertEqual(
+            priced.data["results"][0],
+            {"id": self.journey.id, "price": quote.data[0]["price"]},
+        )
+        self.assertEqual(detail.data["price"], quote.data[0]["price"])
+        self.assertGreater(Decimal(detail.data["price"]), 0)
@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+from rest_framework import status
+
+from train_station.models import Crew, Journey, Order, Ticket
+from train_station.tests.samples import (
+    AuthenticatedTestCase,
+    JOURNEY_URL,
+    detail_journey_url,
+    sample_journey,
+)
+
+
+class SparseFieldsetTests(AuthenticatedTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.journey = sample_journey()
+        self.journey.crew.add(
+            Crew.objects.create(first_name="Fred", last_name="Stone")
+        )
+
+    def test_fields_prune_response_and_queries(self):
+        # Count and page, without the crew prefetch.
+        with self.assertNumQueries(2):
+            res = self.client.get(JOURNEY_URL, {"fields": "id,departure_time"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(res.data["results"][0]), {"id", "departure_time"})
+
+    def test_full_list_loads_relations_up_front(self):
+        with self.assertNumQueries(3):
+            res = self.client.get(JOURNEY_URL)
+
+        journey = res.data["results"][0]
+        self.assertEqual(journey["route"], "Kyiv -> Lviv")
+        self.assertEqual(journey["crew"], ["Fred Stone"])
+        self.assertEqual(journey["tickets_available"], 60)
+
+    def test_expand_nests_related_objects(self):
+        res = self.client.get(
+            JOURNEY_URL, {"fields": "id,route,train", "expand": "route,train"}
+        )
+        journey = res.data["results"][0]
+
+        self.assertEqual(journey["route"]["source"], "Kyiv")
+        self.assertEqual(journey["train"]["train_type"], "Express")
+
+    def test_detail_fields(self):
+        with self.assertNumQueries(2):
+            res = self.client.get(
+                detail_journey_url(self.journey.id),
+                {"fields": "id,taken_seats"},
+            )
+
+        self.assertEqual(res.data, {"id": self.journey.id, "taken_seats": []})
+
+    def test_unknown_fields_are_rejected(self):
+        self.assertEqual(
+            self.client.get(
+                JOURNEY_URL, {"fields": "id,platform"}
+            ).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        self.assertEqual(
+            self.client.get(JOURNEY_URL, {"expand": "crew"}).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+    def test_cargo_availability_costs_one_query_per_page(self):
+        for days in (2, 3):
+            Journey.objects.create(
+                route=self.journey.route,
+                train=self.journey.train,
+                departure_time=self.journey.departure_time
+                + timedelta(days=days),
+                arrival_time=self.journey.arrival_time + timedelta(days=days),
+            )
+        Ticket.objects.create(
+            cargo=2,
+            seat=7,
+            journey=self.journey,
+            order=Order.objects.create(user=self.user),
+        )
+
+        with self.assertNumQueries(3):
+            res = self.client.get(
+                JOURNEY_URL, {"fields": "id", "include": "cargo_availability"}
+            )
+        detail = self.client.get(
+            detail_journey_url(self.journey.id),
+            {"include": "cargo_availability"},
+        )
+
+        availability = {
+            journey["id"]: [
+                car["seats_available"] for car in journey["cargo_availability"]
+            ]
+            for journey in res.data["results"]
+        }
+        self.assertEqual(len(availability), 3)
+        self.assertEqual(availability.pop(self.journey.id), [20, 19, 20])
+        self.assertEqual(list(availability.values()), [[20, 20, 20]] * 2)
+        self.assertEqual(
+            detail.data["cargo_availability"][1],
+            {"cargo": 2, "seats_available": 19},
+        )
+        self.assertNotIn(
+            "cargo_availability",
+            self.client.get(detail_journey_url(self.journey.id)).data,
+        )
@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import status
+
+from train_station.idempotency import KEY_MAX_LENGTH
+from train_station.models import IdempotencyKey, Order, Ticket
+from train_station.tests.samples import (
+    AuthenticatedTestCase,
+    ORDER_URL,
+    sample_journey,
+)
+
+
+class IdempotentOrderCreateTests(AuthenticatedTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.journey = sample_journey()
+        self.payload = {
+            "tickets": [{"cargo": 1, "seat": 5, "journey": self.journey.id}]
+        }
+
+    def post_order(self, key, payload=None):
+        return self.client.post(
+            ORDER_URL,
+            payload or self.payload,
+            format="json",
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retry_replays_original_response(self):
+        first = self.post_order("retry-1")
+        second = self.post_order("retry-1")
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_reused_key_with_different_body_rejected(self):
+        self.post_order("retry-2")
+        payload = {
+            "tickets": [{"cargo": 1, "seat": 6, "journey": self.journey.id}]
+        }
+
+        response = self.post_order("retry-2", payload)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_too_long_key_rejected(self):
+        response = self.post_order("k" * (KEY_MAX_LENGTH + 1))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(
+            str(KEY_MAX_LENGTH), str(response.data["Idempotency-Key"])
+        )
+        self.assertEqual(Order.objects.count(), 0)
+
+    def test_failed_request_does_not_store_key(self):
+        payload = {
+            "tickets": [{"cargo": 9, "seat": 5, "journey": self.journey.id}]
+        }
+
+        response = self.post_order("retry-3", payload)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_expired_key_is_not_replayed(self):
+        self.post_order("retry-4")
+        IdempotencyKey.objects.update(
+            created_at=timezone.now() - timedelta(days=2)
+        )
+
+        response = self.post_order("retry-4")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(response.has_header("Idempotent-Replayed"))
@@ -0,0 +1,200 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files import File
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+
+from train_station.images import (
+    blob_reference_counts,
+    process_station_image,
+    process_station_image_in_worker,
+    process_station_image_task,
+)
+from train_station.models import Address, Station, StationImageVariant
+from train_station.tests.samples import AuthenticatedTestCase
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def tearDownModule():
+    shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+
+def image_upload_url(station_id):
+    return reverse("train_station:station-upload-image", args=[station_id])
+
+
+def sample_image_file(size=(1600, 1200), image_format="JPEG"):
+    image_file = io.BytesIO()
+    Image.new("RGB", size, color=(120, 40, 200)).save(image_file, image_format)
+    image_file.name = f"photo.{image_format.lower()}"
+    image_file.seek(0)
+
+    return image_file
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    STATION_IMAGE_VARIANT_WIDTHS=(160, 480),
+    STATION_IMAGE_VARIANT_FORMATS=("webp", "jpeg"),
+)
+class StationImageTests(AuthenticatedTestCase):
+    staff = True
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.station = Station.objects.create(
+            name="Kyiv",
+            latitude=50.45,
+            longitude=30.52,
+            address=Address.objects.create(country="Ukraine", city="Kyiv"),
+        )
+
+    def test_upload_schedules_processing(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(
+                image_upload_url(self.station.id),
+                {"image": sample_image_file()},
+                format="multipart",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["image_variants"], [])
+        self.assertEqual(len(callbacks), 1)
+
+    def test_process_generates_resized_variants(self):
+        self.client.post(
+            image_upload_url(self.station.id),
+            {"image": sample_image_file()},
+            format="multipart",
+        )
+
+        variants = process_station_image(self.station.id)
+
+        self.assertEqual(len(variants), 4)
+        for variant in StationImageVariant.objects.all():
+            with Image.open(variant.image.path) as image:
+                self.assertEqual(image.size, (variant.width, variant.height))
+                self.assertEqual(image.format.lower(), variant.format)
+
+    def test_small_image_not_upscaled(self):
+        self.client.post(
+            image_upload_url(self.station.id),
+            {"image": sample_image_file(size=(300, 200))},
+            format="multipart",
+        )
+
+        process_station_image(self.station.id)
+
+        variants = StationImageVariant.objects.all()
+        self.assertEqual(
+            {(variant.width, variant.height) for variant in variants},
+            {(160, 107), (300, 200)},
+        )
+        for variant in variants:
+            with Image.open(variant.image.path) as image:
+                self.assertEqual(image.size, (variant.width, variant.height))
+
+    def test_reprocessing_replaces_variants(self):
+        self.client.post(
+            image_upload_url(self.station.id),
+            {"image": sample_image_file()},
+            format="multipart",
+        )
+        process_station_image(self.station.id)
+
+        process_station_image(self.station.id)
+
+        self.assertEqual(StationImageVariant.objects.count(), 4)
+
+    def test_failed_reprocessing_keeps_variants(self):
+        self.client.post(
+            image_upload_url(self.station.id),
+            {"image": sample_image_file()},
+            format="multipart",
+        )
+        process_station_image(self.station.id)
+
+        with mock.patch(
+            "train_station.images.render_variant", side_effect=OSError
+        ):
+            with self.assertLogs("train_station.images", "ERROR"):
+                process_station_image_task(self.station.id)
+
+        self.assertEqual(StationImageVariant.objects.count(), 4)
+
+    def test_worker_closes_its_connections(self):
+        with mock.patch("train_station.images.connections") as connections:
+            with mock.patch(
+                "train_station.images.process_station_image_task"
+            ) as task:
+                process_station_image_in_worker(self.station.id)
+
+        task.assert_called_once_with(self.station.id)
+        connections.close_all.assert_called_once_with()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self) -> None:
+        address = Address.objects.create(country="Ukraine", city="Kyiv")
+        self.stations = [
+            Station.objects.create(
+                name=name, latitude=50.0, longitude=lon, address=address
+            )
+            for name, lon in (("Kyiv", 30.5), ("Lviv", 24.0))
+        ]
+
+    def save_image(self, station, image_file):
+        station.image.save(image_file.name, File(image_file))
+        return station.image.name
+
+    def test_same_content_is_stored_once(self):
+        first = self.save_image(self.stations[0], sample_image_file())
+        second = self.save_image(self.stations[1], sample_image_file())
+
+        self.assertEqual(first, second)
+        self.assertTrue(first.startswith("blobs/"))
+        self.assertEqual(blob_reference_counts()[first], 2)
+
+    def test_collect_deletes_only_unreferenced_blobs(self):
+        old = self.save_image(self.stations[0], sample_image_file())
+        kept = self.save_image(self.stations[1], sample_image_file((64, 64)))
+        self.save_image(self.stations[0], sample_image_file((32, 32)))
+
+        call_command(
+            "collect_media_blobs", grace_hours=0, stdout=io.StringIO()
+        )
+
+        storage = self.stations[0].image.storage
+        self.assertFalse(storage.exists(old))
+        self.assertTrue(storage.exists(kept))
+        self.assertTrue(storage.exists(self.stations[0].image.name))
+
+    def test_reused_blob_survives_collection(self):
+        name = self.save_image(self.stations[0], sample_image_file())
+        storage = self.stations[0].image.storage
+        os.utime(storage.path(name), (0, 0))
+
+        self.save_image(self.stations[1], sample_image_file())
+
+        self.assertFalse(storage.delete_if_stale(name, 3600))
+        self.assertTrue(storage.exists(name))
+
+    def test_blob_deleted_during_save_is_written_again(self):
+        name = self.save_image(self.stations[0], sample_image_file())
+        storage = self.stations[0].image.storage
+        os.utime(storage.path(name), (0, 0))
+
+        self.assertTrue(storage.delete_if_stale(name, 3600))
+        self.assertEqual(
+            self.save_image(self.stations[1], sample_image_file()), name
+        )
+        self.assertTrue(storage.exists(name))
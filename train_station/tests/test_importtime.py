@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from train_station.importtime import (
+    loaded_lazy_modules,
+    measure_imports,
+    total_us,
+)
+
+
+class ImportTimeBudgetTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.timings = measure_imports()
+
+    def test_boot_does_not_import_heavy_optional_dependencies(self):
+        self.assertEqual(loaded_lazy_modules(self.timings), [])
+
+    def test_boot_is_within_budget(self):
+        self.assertLess(
+            total_us(self.timings) / 1000, settings.IMPORT_TIME_BUDGET_MS
+        )
+
+    def test_lazy_dependency_is_imported_by_its_module(self):
+        timings = measure_imports(
+            "import django; django.setup(); import train_station.analytics"
+        )
+
+        self.assertIn("numpy", loaded_lazy_modules(timings))
@@ -0,0 +1,158 @@
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import date
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework import status
+
+from train_station.metrics import MULTIPROC_DIR_ENV
+from train_station.tests.samples import (
+    AuthenticatedTestCase,
+    JOURNEY_URL,
+    sample_journey,
+)
+
+METRICS_URL = reverse("metrics")
+OCCUPANCY_URL = reverse("train_station:analytics-occupancy")
+
+
+def sample_value(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTests(AuthenticatedTestCase):
+    staff = True
+
+    def setUp(self) -> None:
+        super().setUp()
+        sample_journey()
+
+    def test_request_is_recorded_by_view_action(self):
+        labels = {"view": "JourneyViewSet.list"}
+        requests_before = sample_value(
+            "train_station_request_duration_seconds_count",
+            method="GET",
+            status="200",
+            **labels,
+        )
+        queries_before = sample_value(
+            "train_station_request_db_queries_sum", **labels
+        )
+        serializer_before = sample_value(
+            "train_station_request_serializer_duration_seconds_sum", **labels
+        )
+
+        response = self.client.get(JOURNEY_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sample_value(
+                "train_station_request_duration_seconds_count",
+                method="GET",
+                status="200",
+                **labels,
+            ),
+            requests_before + 1,
+        )
+        self.assertGreater(
+            sample_value("train_station_request_db_queries_sum", **labels),
+            queries_before,
+        )
+        self.assertGreater(
+            sample_value(
+                "train_station_request_serializer_duration_seconds_sum",
+                **labels,
+            ),
+            serializer_before,
+        )
+
+    def test_cache_lookups_are_counted(self):
+        labels = {
+            "view": "AnalyticsViewSet.occupancy",
+            "cache": "analytics_day",
+        }
+        params = {"start": date.today(), "end": date.today()}
+        misses_before = sample_value(
+            "train_station_cache_lookups_total", result="miss", **labels
+        )
+        hits_before = sample_value(
+            "train_station_cache_lookups_total", result="hit", **labels
+        )
+
+        self.client.get(OCCUPANCY_URL, params)
+        self.client.get(OCCUPANCY_URL, params)
+
+        self.assertEqual(
+            sample_value(
+                "train_station_cache_lookups_total", result="miss", **labels
+            ),
+            misses_before + 1,
+        )
+        self.assertEqual(
+            sample_value(
+                "train_station_cache_lookups_total", result="hit", **labels
+            ),
+            hits_before + 1,
+        )
+
+    @override_settings(DEBUG=True)
+    def test_metrics_endpoint_exposes_text_format(self):
+        self.client.get(JOURNEY_URL)
+
+        response = self.client.get(METRICS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(
+            b'view="JourneyViewSet.list"',
+            response.content,
+        )
+
+    @override_settings(METRICS_TOKEN="scrape-secret")
+    def test_metrics_endpoint_checks_token(self):
+        forbidden = self.client.get(METRICS_URL)
+        wrong = self.client.get(
+            METRICS_URL, HTTP_AUTHORIZATION="Bearer scrape-secreT"
+        )
+        allowed = self.client.get(
+            METRICS_URL, HTTP_AUTHORIZATION="Bearer scrape-secret"
+        )
+
+        self.assertEqual(forbidden.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(wrong.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(allowed.status_code, status.HTTP_200_OK)
+
+    @override_settings(METRICS_TOKEN=None, DEBUG=False)
+    def test_metrics_endpoint_requires_token_in_production(self):
+        response = self.client.get(METRICS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class MultiprocessDirTests(SimpleTestCase):
+    def test_metrics_recorded_before_directory_exists(self):
+        with tempfile.TemporaryDirectory() as parent:
+            directory = os.path.join(parent, "prometheus")
+            env = {**os.environ, MULTIPROC_DIR_ENV: directory}
+            env.setdefault("DJANGO_SETTINGS_MODULE", settings.SETTINGS_MODULE)
+            # Outside `serve`, which is not the only process recording.
+            result = subprocess.run(
+                [
+                    sys.executable,
+                    "-c",
+                    "import django; django.setup(); "
+                    "from train_station.metrics import REQUEST_QUERIES; "
+                    "REQUEST_QUERIES.labels('test').observe(1)",
+                ],
+                capture_output=True,
+                text=True,
+                cwd=settings.BASE_DIR,
+                env=env,
+            )
+
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertTrue(os.listdir(directory))
@@ -0,0 +1,68 @@
+from django.urls import reverse
+from rest_framework import status
+
+from train_station.geo import encode_geohash
+from train_station.models import Address, Station
+
+NEARBY_URL = reverse("train_station:station-nearby")
+
+STATIONS = (
+    ("Kyiv", 50.4403, 30.4892),
+    ("Darnytsia", 50.4560, 30.6257),
+    ("Fastiv", 50.0749, 29.9160),
+    ("Lviv", 49.8397, 23.9944),
+    ("Suva", -18.1416, 178.4419),
+    ("Apia", -13.8333, -171.7667),
+)
+from train_station.tests.samples import AuthenticatedTestCase
+
+
+class NearbyStationsTests(AuthenticatedTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        address = Address.objects.create(country="Ukraine", city="Kyiv")
+        for name, latitude, longitude in STATIONS:
+            Station.objects.create(
+                name=name,
+                latitude=latitude,
+                longitude=longitude,
+                address=address,
+            )
+
+    def test_geohash_is_stored(self):
+        station = Station.objects.get(name="Kyiv")
+
+        self.assertEqual(station.geohash, encode_geohash(50.4403, 30.4892))
+        self.assertTrue(station.geohash.startswith("u8vw"))
+
+    def test_nearest_stations_ranked_by_distance(self):
+        response = self.client.get(
+            NEARBY_URL, {"lat": 50.45, "lon": 30.52, "radius_km": 100}
+        )
+        names = [station["name"] for station in response.data]
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(names, ["Kyiv", "Darnytsia", "Fastiv"])
+        self.assertLess(response.data[0]["distance_km"], 3)
+
+    def test_limit(self):
+        response = self.client.get(
+            NEARBY_URL,
+            {"lat": 50.45, "lon": 30.52, "radius_km": 1000, "limit": 2},
+        )
+
+        self.assertEqual(len(response.data), 2)
+
+    def test_search_across_antimeridian(self):
+        response = self.client.get(
+            NEARBY_URL, {"lat": -16.0, "lon": 179.9, "radius_km": 1000}
+        )
+
+        self.assertEqual(
+            [station["name"] for station in response.data], ["Suva", "Apia"]
+        )
+
+    def test_invalid_coordinates(self):
+        response = self.client.get(NEARBY_URL, {"lat": 95, "lon": 30})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
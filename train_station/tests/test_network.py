@@ -0,0 +1,154 @@
+import random
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.db.models import Count, F
+from django.test import TestCase
+from django.utils import timezone
+
+from train_station.models import (
+    BoardEntry,
+    Journey,
+    Order,
+    OrderSummary,
+    Station,
+    Ticket,
+)
+from train_station.network import (
+    NetworkSpec,
+    generate_network,
+    grid_positions,
+    station_names,
+)
+
+
+class GenerateNetworkTests(TestCase):
+    def setUp(self) -> None:
+        self.spec = NetworkSpec(
+            seed=7,
+            stations=4,
+            start=timezone.localdate() + timedelta(days=1),
+            load_factor=0.05,
+            users=20,
+            batch_size=50,
+        )
+
+    def test_writes_consistent_network(self):
+        counts = generate_network(self.spec)
+
+        self.assertEqual(Station.objects.count(), 4)
+        self.assertEqual(Journey.objects.count(), counts["journeys"])
+        self.assertEqual(Ticket.objects.count(), counts["tickets"])
+        self.assertGreater(counts["tickets"], 0)
+        self.assertFalse(
+            Ticket.objects.exclude(
+                departure_time=F("journey__departure_time")
+            ).exists()
+        )
+        self.assertFalse(
+            Ticket.objects.filter(
+                cargo__gt=F("journey__train__cargo_number")
+            ).exists()
+        )
+        self.assertFalse(
+            Ticket.objects.filter(
+                seat__gt=F("journey__train__places_in_cargo")
+            ).exists()
+        )
+        self.assertEqual(OrderSummary.objects.count(), Order.objects.count())
+
+        journey = (
+            Journey.objects.annotate(sold=Count("tickets"))
+            .select_related("train")
+            .order_by("-sold")
+            .first()
+        )
+        self.assertEqual(
+            BoardEntry.objects.get(
+                journey=journey, kind=BoardEntry.DEPARTURE
+            ).seats_left,
+            journey.train.capacity - journey.sold,
+        )
+        self.assertFalse(
+            Order.objects.filter(
+                created_at__gt=F("tickets__departure_time")
+            ).exists()
+        )
+        self.assertFalse(
+            Order.objects.filter(created_at__gt=self.spec.start_time).exists()
+        )
+
+    def test_same_seed_and_start_give_same_network(self):
+        self.spec.start = timezone.localdate()
+
+        def fingerprint():
+            stations = Station.objects.values_list(
+                "name", "latitude", "longitude", "address__city"
+            )
+            journeys = Journey.objects.values_list(
+                "route__source__name",
+                "route__destination__name",
+                "train__name",
+                "train__train_type__name",
+                "departure_time",
+                "arrival_time",
+            )
+            tickets = Ticket.objects.values_list(
+                "journey__train__name",
+                "departure_time",
+                "cargo",
+                "seat",
+                "order__user__email",
+                "order__created_at",
+            )
+            summaries = OrderSummary.objects.values_list(
+                "user__email",
+                "created_at",
+                "ticket_count",
+                "first_departure",
+                "route_label",
+                "total_distance",
+            )
+            return [
+                sorted(queryset)
+                for queryset in (stations, journeys, tickets, summaries)
+            ]
+
+        runs = []
+        # In the morning and in the evening of the first day.
+        for hour in (6, 21):
+            now = self.spec.start_time + timedelta(hours=hour)
+            with transaction.atomic(), mock.patch(
+                "django.utils.timezone.now", return_value=now
+            ):
+                generate_network(self.spec)
+                runs.append(fingerprint())
+                transaction.set_rollback(True)
+
+        self.assertEqual(runs[0], runs[1])
+        self.assertGreater(len(runs[0][2]), 0)
+        self.assertFalse(Station.objects.exists())
+
+    def test_same_seed_gives_same_layout(self):
+        def layout(seed):
+            rng = random.Random(seed)
+            return station_names(rng, 9), grid_positions(rng, 9)
+
+        self.assertEqual(layout(1), layout(1))
+        self.assertNotEqual(layout(1), layout(2))
+
+    def test_refuses_to_generate_seed_twice(self):
+        options = {
+            "seed": 7,
+            "stations": 4,
+            "months": 0,
+            "users": 1,
+            "stdout": StringIO(),
+        }
+        call_command("generate_network", **options)
+
+        with self.assertRaises(CommandError):
+            call_command("generate_network", **options)
@@ -0,0 +1,145 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from rest_framework import status
+
+from train_station.models import Order, OrderSummary, Ticket
+from train_station.tests.samples import (
+    AuthenticatedTestCase,
+    ORDER_URL,
+    sample_journey,
+    sample_train,
+)
+
+
+class OrderSummaryTests(AuthenticatedTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.journey = sample_journey()
+        departure_time = self.journey.departure_time + timedelta(days=2)
+        self.later_journey = sample_journey(
+            route=self.journey.route,
+            train=sample_train(
+                name="DEF67890", train_type=self.journey.train.train_type
+            ),
+            departure_time=departure_time,
+            arrival_time=departure_time + timedelta(hours=5),
+        )
+
+    def post_order(self, *journeys):
+        tickets = [
+            {"cargo": 1, "seat": seat, "journey": journey.id}
+            for seat, journey in enumerate(journeys, 1)
+        ]
+        return self.client.post(ORDER_URL, {"tickets": tickets}, format="json")
+
+    def test_summary_written_with_order(self):
+        res = self.post_order(self.later_journey, self.journey, self.journey)
+        summary = OrderSummary.objects.get(order_id=res.data["id"])
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(summary.user, self.user)
+        self.assertEqual(summary.ticket_count, 3)
+        self.assertEqual(summary.first_departure, self.journey.departure_time)
+        self.assertEqual(summary.route_label, "Kyiv -> Lviv")
+        self.assertEqual(
+            summary.total_distance,
+            2 * self.journey.route.distance_in_kilometers,
+        )
+
+    def test_list_and_date_filter_read_summaries(self):
+        first = self.post_order(self.journey).data["id"]
+        later = self.post_order(self.later_journey).data["id"]
+
+        with self.assertNumQueries(2):
+            res = self.client.get(ORDER_URL)
+        filtered = self.client.get(
+            ORDER_URL, {"date": self.journey.departure_time.date()}
+        )
+
+        self.assertEqual(
+            [order["id"] for order in res.data["results"]], [later, first]
+        )
+        self.assertEqual(res.data["results"][0]["route_label"], "Kyiv -> Lviv")
+        self.assertEqual(
+            [order["id"] for order in filtered.data["results"]], [first]
+        )
+
+    def test_rescheduled_journey_updates_summary(self):
+        order_id = self.post_order(self.journey).data["id"]
+        self.journey.departure_time += timedelta(hours=1)
+        self.journey.arrival_time += timedelta(hours=1)
+        self.journey.save()
+
+        self.assertEqual(
+            OrderSummary.objects.get(order_id=order_id).first_departure,
+            self.journey.departure_time,
+        )
+
+    def test_unrelated_journey_change_keeps_summaries(self):
+        self.post_order(self.journey)
+
+        with mock.patch(
+            "train_station.signals.refresh_order_summaries"
+        ) as refresh:
+            self.journey.save()
+
+        refresh.assert_not_called()
+
+    def test_orders_written_outside_api_listed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            order = Order.objects.create(user=self.user)
+            Ticket.objects.create(
+                cargo=1, seat=1, journey=self.later_journey, order=order
+            )
+
+        res = self.client.get(ORDER_URL)
+
+        self.assertEqual(
+            [order["id"] for order in res.data["results"]], [order.id]
+        )
+
+    def test_added_ticket_updates_summary(self):
+        order_id = self.post_order(self.later_journey).data["id"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.create(
+                cargo=1, seat=2, journey=self.journey, order_id=order_id
+            )
+        summary = OrderSummary.objects.get(order_id=order_id)
+
+        self.assertEqual(summary.ticket_count, 2)
+        self.assertEqual(summary.first_departure, self.journey.departure_time)
+
+    def test_deleted_tickets_update_summary(self):
+        order_id = self.post_order(self.journey, self.later_journey).data["id"]
+        first, last = Ticket.objects.filter(order_id=order_id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        count = OrderSummary.objects.get(order_id=order_id).ticket_count
+        with self.captureOnCommitCallbacks(execute=True):
+            last.delete()
+
+        self.assertEqual(count, 1)
+        self.assertFalse(OrderSummary.objects.filter(order_id=order_id))
+
+    def test_deleted_order_leaves_no_summary(self):
+        order_id = self.post_order(self.journey).data["id"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.objects.get(id=order_id).delete()
+
+        self.assertFalse(OrderSummary.objects.exists())
+
+    def test_rebuild_command(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(
+            cargo=1, seat=1, journey=self.journey, order=order
+        )
+
+        call_command("rebuild_order_summaries", stdout=StringIO())
+
+        self.assertEqual(OrderSummary.objects.get().order, order)
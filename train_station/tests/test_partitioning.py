@@ -0,0 +1,120 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from train_station.models import Journey, Order, Ticket
+from train_station.partitioning import (
+    add_months,
+    iter_months,
+    partition_name,
+)
+from train_station.tests.samples import ORDER_URL, sample_journey
+from train_station.views import filter_journeys
+
+
+class PartitionHelpersTests(TestCase):
+    def test_months(self):
+        self.assertEqual(add_months(date(2024, 11, 1), 3), date(2025, 2, 1))
+        self.assertEqual(add_months(date(2024, 1, 1), -1), date(2023, 12, 1))
+        self.assertEqual(
+            list(iter_months(date(2024, 11, 20), date(2025, 1, 1))),
+            [date(2024, 11, 1), date(2024, 12, 1), date(2025, 1, 1)],
+        )
+        self.assertEqual(
+            partition_name("train_station_ticket", date(2025, 2, 1)),
+            "train_station_ticket_p202502",
+        )
+
+    def test_command_is_noop_without_postgresql(self):
+        out = StringIO()
+        call_command("manage_partitions", convert=True, stdout=out)
+
+        self.assertIn("not supported on sqlite", out.getvalue())
+
+
+class TicketPartitionKeyTests(TestCase):
+    def test_ticket_follows_journey_departure_time(self):
+        journey = sample_journey()
+        user = get_user_model().objects.create_user(
+            email="user@test.com", password="Password123"
+        )
+        ticket = Ticket.objects.create(
+            cargo=1,
+            seat=1,
+            journey=journey,
+            order=Order.objects.create(user=user),
+        )
+        self.assertEqual(ticket.departure_time, journey.departure_time)
+
+        journey.departure_time += timedelta(hours=1)
+        journey.arrival_time += timedelta(hours=1)
+        journey.save()
+        ticket.refresh_from_db()
+
+        self.assertEqual(ticket.departure_time, journey.departure_time)
+
+
+class PartitionPruningTests(TestCase):
+    """
+    PostgreSQL only prunes partitions on comparisons of the bare
+    partition key, not on expressions like casts to date or time.
+    """
+
+    def assert_ranges_departure_time(self, sql):
+        self.assertIn('"departure_time" >=', sql)
+        self.assertIn('"departure_time" <', sql)
+        self.assertNotIn("cast_date", sql)
+        self.assertNotIn("cast_time", sql)
+
+    def test_date_search_filters_on_departure_time_range(self):
+        for params in (
+            {"date": "2025-03-01"},
+            {"date": "2025-03-01", "time": "07:15"},
+        ):
+            sql = str(filter_journeys(Journey.objects.all(), params).query)
+
+            self.assert_ranges_departure_time(sql)
+
+    def test_time_search_matches_the_minute(self):
+        journey = sample_journey()
+        departure = timezone.localtime(journey.departure_time)
+        params = {
+            "date": departure.strftime("%Y-%m-%d"),
+            "time": departure.strftime("%H:%M"),
+        }
+
+        self.assertEqual(
+            list(filter_journeys(Journey.objects.all(), params)), [journey]
+        )
+
+    def test_taken_seat_check_filters_on_departure_time(self):
+        journey = sample_journey()
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="user@test.com", password="Password123"
+            )
+        )
+        payload = {"tickets": [{"cargo": 1, "seat": 1, "journey": journey.id}]}
+        client.post(ORDER_URL, payload, format="json")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(ORDER_URL, payload, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        seat_checks = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith("SELECT")
+            and 'FROM "train_station_ticket"' in query["sql"]
+        ]
+        self.assertTrue(seat_checks)
+        for sql in seat_checks:
+            self.assertIn('"train_station_ticket"."departure_time" =', sql)
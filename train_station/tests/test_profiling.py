@@ -0,0 +1,81 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from train_station.models import RequestProfile
+from train_station.tests.samples import (
+    JOURNEY_URL,
+    sample_journey,
+    sample_staff,
+    sample_user,
+)
+
+
+class RequestProfilingTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.staff = sample_staff()
+        self.user = sample_user()
+        sample_journey()
+
+    def get_journeys(self, user, **extra):
+        return self.client.get(
+            JOURNEY_URL,
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}",
+            **extra,
+        )
+
+    def test_staff_request_is_profiled(self):
+        response = self.get_journeys(self.staff, HTTP_X_PROFILE="cprofile")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        profile = RequestProfile.objects.get(id=response["X-Profile-Id"])
+        self.assertEqual(profile.view_name, "JourneyViewSet.list")
+        self.assertEqual(profile.user, self.staff)
+        self.assertEqual(profile.sql_count, len(profile.sql))
+        self.assertGreater(profile.sql_count, 0)
+        self.assertIn("cumulative", profile.profile)
+
+    def test_sampling_profiler_from_query_flag(self):
+        response = self.client.get(
+            JOURNEY_URL,
+            {"_profile": "sample"},
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.staff)}",
+        )
+
+        profile = RequestProfile.objects.get(id=response["X-Profile-Id"])
+        self.assertEqual(profile.kind, RequestProfile.SAMPLE)
+
+    def test_non_staff_and_unflagged_requests_are_not_profiled(self):
+        user_response = self.get_journeys(self.user, HTTP_X_PROFILE="1")
+        plain_response = self.get_journeys(self.staff)
+
+        self.assertNotIn("X-Profile-Id", user_response)
+        self.assertNotIn("X-Profile-Id", plain_response)
+        self.assertFalse(RequestProfile.objects.exists())
+
+    @override_settings(REQUEST_PROFILE_LIMIT=2)
+    def test_only_recent_profiles_are_kept(self):
+        ids = [
+            self.get_journeys(self.staff, HTTP_X_PROFILE="1")["X-Profile-Id"]
+            for _ in range(3)
+        ]
+
+        self.assertEqual(
+            sorted(RequestProfile.objects.values_list("id", flat=True)),
+            [int(profile_id) for profile_id in ids[1:]],
+        )
+
+    def test_command_summarizes_by_view(self):
+        self.get_journeys(self.staff, HTTP_X_PROFILE="1")
+        out = StringIO()
+
+        call_command("request_profiles", stdout=out)
+
+        self.assertIn("JourneyViewSet.list", out.getvalue())
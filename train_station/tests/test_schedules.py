@@ -0,0 +1,93 @@
+from datetime import date, datetime, time, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from train_station.models import BoardEntry, Crew, Journey, JourneySchedule
+from train_station.schedules import generate_journeys
+from train_station.tests.samples import sample_journey
+
+
+class GenerateJourneysTests(TestCase):
+    def setUp(self) -> None:
+        journey = sample_journey()
+        self.route = journey.route
+        self.train = journey.train
+        journey.delete()
+        # Next Monday, so the generated week is fully in the future.
+        today = date.today()
+        self.monday = today + timedelta(days=7 - today.weekday())
+        self.schedule = JourneySchedule.objects.create(
+            route=self.route,
+            train=self.train,
+            weekdays="12345",
+            departure_time=time(7, 15),
+            duration=timedelta(hours=5),
+            valid_from=self.monday,
+            valid_until=self.monday + timedelta(days=13),
+        )
+        self.crew = Crew.objects.create(first_name="Fred", last_name="Stone")
+        self.schedule.crew.add(self.crew)
+
+    def test_expands_weekdays_with_crew_and_boards(self):
+        created, conflicts = generate_journeys(
+            self.monday, self.monday + timedelta(days=6)
+        )
+        journeys = Journey.objects.filter(schedule=self.schedule)
+
+        self.assertEqual((created, conflicts), (5, 0))
+        self.assertEqual(
+            sorted(
+                journey.departure_time.isoweekday() for journey in journeys
+            ),
+            [1, 2, 3, 4, 5],
+        )
+        self.assertEqual(
+            Journey.crew.through.objects.filter(crew=self.crew).count(), 5
+        )
+        self.assertEqual(BoardEntry.objects.count(), 10)
+
+    def test_rerun_is_idempotent(self):
+        end = self.monday + timedelta(days=6)
+        generate_journeys(self.monday, end)
+
+        self.assertEqual(generate_journeys(self.monday, end), (0, 0))
+        self.assertEqual(
+            generate_journeys(self.monday, end + timedelta(days=7)), (5, 0)
+        )
+        self.assertEqual(Journey.objects.count(), 10)
+
+    def test_skips_departures_of_busy_train(self):
+        departure_time = timezone.make_aware(
+            datetime.combine(self.monday, time(11, 0))
+        )
+        busy = sample_journey(
+            route=self.route,
+            train=self.train,
+            departure_time=departure_time,
+            arrival_time=departure_time + timedelta(hours=5),
+        )
+
+        created, conflicts = generate_journeys(
+            self.monday, self.monday + timedelta(days=6)
+        )
+
+        self.assertEqual((created, conflicts), (4, 1))
+        self.assertFalse(
+            Journey.objects.filter(
+                schedule=self.schedule,
+                departure_time__date=busy.departure_time.date(),
+            ).exists()
+        )
+
+    def test_command(self):
+        call_command(
+            "generate_journeys",
+            start=self.monday,
+            end=self.monday,
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(Journey.objects.count(), 1)
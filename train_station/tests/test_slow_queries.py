@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from train_station.models import SlowQuery
+from train_station.slow_queries import is_explainable
+from train_station.tests.samples import (
+    AuthenticatedTestCase,
+    JOURNEY_URL,
+    sample_journey,
+)
+
+SLOW_QUERY_URL = reverse("train_station:slowquery-list")
+
+
+@override_settings(SLOW_QUERY_THRESHOLD=timedelta(0))
+class SlowQueryLogTests(AuthenticatedTestCase):
+    staff = True
+
+    def setUp(self) -> None:
+        super().setUp()
+        sample_journey()
+
+    def test_queries_over_threshold_are_logged_with_call_site(self):
+        self.client.get(JOURNEY_URL)
+
+        queries = SlowQuery.objects.filter(view_name="JourneyViewSet.list")
+        self.assertTrue(queries.exists())
+        self.assertTrue(
+            all(
+                query.location.startswith("train_station") for query in queries
+            )
+        )
+        self.assertTrue(
+            any("train_station_journey" in query.sql for query in queries)
+        )
+
+    @override_settings(SLOW_QUERY_THRESHOLD=timedelta(minutes=1))
+    def test_fast_queries_are_not_logged(self):
+        self.client.get(JOURNEY_URL)
+
+        self.assertFalse(SlowQuery.objects.exists())
+
+    @override_settings(SLOW_QUERY_LIMIT=3)
+    def test_table_is_bounded(self):
+        self.client.get(JOURNEY_URL)
+        self.client.get(JOURNEY_URL)
+
+        self.assertEqual(SlowQuery.objects.count(), 3)
+
+    def test_staff_can_filter_by_view(self):
+        self.client.get(JOURNEY_URL)
+
+        response = self.client.get(
+            SLOW_QUERY_URL, {"view": "JourneyViewSet.list"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreater(response.data["count"], 0)
+        self.assertEqual(
+            {query["view_name"] for query in response.data["results"]},
+            {"JourneyViewSet.list"},
+        )
+
+    def test_only_staff_can_browse(self):
+        user = get_user_model().objects.create_user(
+            email="user@test.com", password="Password123"
+        )
+        self.client.force_authenticate(user)
+
+        response = self.client.get(SLOW_QUERY_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_only_reads_are_explained(self):
+        self.assertTrue(is_explainable("  SELECT 1"))
+        self.assertFalse(is_explainable("UPDATE train_station_journey SET"))
@@ -0,0 +1,102 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db.utils import OperationalError
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+
+from train_station import startup
+from train_station.geo import geodesic_kilometers
+from train_station.tests.samples import sample_journey
+
+LIVENESS_URL = reverse("health-live")
+READINESS_URL = reverse("health-ready")
+
+
+class WaitForDbTests(TestCase):
+    @mock.patch("time.sleep")
+    def test_retries_with_backoff_until_database_answers(self, sleep):
+        with mock.patch(
+            "train_station.management.commands.wait_for_db.check_database",
+            side_effect=[OperationalError, OperationalError, None],
+        ) as check_database:
+            call_command("wait_for_db", stdout=StringIO())
+
+        self.assertEqual(check_database.call_count, 3)
+        self.assertEqual(
+            [call.args[0] for call in sleep.call_args_list], [0.25, 0.5]
+        )
+
+    @mock.patch("time.sleep")
+    def test_gives_up_after_timeout(self, sleep):
+        with mock.patch(
+            "train_station.management.commands.wait_for_db.check_database",
+            side_effect=OperationalError,
+        ):
+            with self.assertRaises(CommandError):
+                call_command("wait_for_db", timeout=0, stdout=StringIO())
+
+
+class HealthTests(TestCase):
+    def setUp(self) -> None:
+        startup.reset_warmups()
+        self.addCleanup(startup.reset_warmups)
+
+    def test_liveness(self):
+        response = self.client.get(LIVENESS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_readiness_warms_route_distances(self):
+        sample_journey()
+        geodesic_kilometers.cache_clear()
+
+        response = self.client.get(READINESS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(response.json()["warmups"]), set(startup._warmups)
+        )
+        self.assertEqual(geodesic_kilometers.cache_info().currsize, 1)
+
+    def test_readiness_fails_without_database(self):
+        with mock.patch(
+            "train_station.health.check_database",
+            side_effect=OperationalError("connection refused"),
+        ):
+            response = self.client.get(READINESS_URL)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+
+    def test_readiness_fails_when_warm_up_fails(self):
+        with mock.patch.dict(
+            startup._warmups, {"broken": mock.Mock(side_effect=ValueError)}
+        ):
+            response = self.client.get(READINESS_URL)
+
+        self.assertEqual(
+            response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        self.assertIn("error", response.json()["warmups"]["broken"])
+
+    def test_failed_warm_up_retried_on_next_check(self):
+        warm = mock.Mock()
+        broken = mock.Mock(side_effect=[ValueError, None])
+        with mock.patch.dict(
+            startup._warmups, {"warm": warm, "broken": broken}, clear=True
+        ):
+            failed = self.client.get(READINESS_URL)
+            ready = self.client.get(READINESS_URL)
+            again = self.client.get(READINESS_URL)
+
+        self.assertEqual(
+            failed.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        self.assertEqual(ready.status_code, status.HTTP_200_OK)
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+        self.assertEqual(warm.call_count, 1)
+        self.assertEqual(broken.call_count, 2)
@@ -0,0 +1,128 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from rest_framework import status
+
+from train_station.tests.samples import (
+    AuthenticatedTestCase,
+    CREW_URL,
+    JOURNEY_URL,
+)
+from train_station.throttling import ScopedTokenBucketThrottle
+
+RATES = {
+    "anon": "2/minute",
+    "user": "3/minute",
+    "journey_search": "5/minute",
+}
+
+
+@mock.patch.object(ScopedTokenBucketThrottle, "THROTTLE_RATES", RATES)
+class TokenBucketThrottleTests(AuthenticatedTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.now = 1000.0
+        timer = mock.patch.object(
+            ScopedTokenBucketThrottle, "timer", lambda _: self.now
+        )
+        timer.start()
+        self.addCleanup(timer.stop)
+
+    def get_statuses(self, url, count):
+        return [self.client.get(url).status_code for _ in range(count)]
+
+    def test_burst_up_to_capacity(self):
+        statuses = self.get_statuses(CREW_URL, 4)
+
+        self.assertEqual(statuses[:3], [status.HTTP_200_OK] * 3)
+        self.assertEqual(statuses[3], status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_tokens_refill_over_time(self):
+        self.get_statuses(CREW_URL, 3)
+
+        self.now += 20
+        response = self.client.get(CREW_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.client.get(CREW_URL).status_code,
+            status.HTTP_429_TOO_MANY_REQUESTS,
+        )
+
+    def test_idle_client_cannot_bank_tokens(self):
+        self.get_statuses(CREW_URL, 1)
+
+        self.now += 3600
+        statuses = self.get_statuses(CREW_URL, 4)
+
+        self.assertEqual(statuses[3], status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_refill_keeps_tokens_taken_concurrently(self):
+        self.get_statuses(CREW_URL, 3)
+        key = f"throttle_bucket_user_{self.user.pk}"
+        refill = ScopedTokenBucketThrottle.refill
+
+        def refill_after_concurrent_request(throttle, *args):
+            cache.incr(throttle.key)
+            refill(throttle, *args)
+
+        self.now += 61
+        with mock.patch.object(
+            ScopedTokenBucketThrottle,
+            "refill",
+            refill_after_concurrent_request,
+        ):
+            self.client.get(CREW_URL)
+
+        # 4 taken by this client, 1 concurrently and 3 refilled.
+        self.assertEqual(cache.get(key), 2)
+        self.assertEqual(cache.get(f"{key}_epoch"), self.now)
+
+    def test_stale_refill_is_skipped(self):
+        throttle = ScopedTokenBucketThrottle()
+        for _ in range(3):
+            throttle.allow_request(
+                mock.Mock(user=self.user), mock.Mock(throttle_scopes={})
+            )
+        key = throttle.key
+
+        # Read before another request moved the epoch to `self.now`.
+        throttle.refill(f"{key}_epoch", self.now - 60, 3, 0)
+
+        self.assertEqual(cache.get(key), 3)
+
+    def test_retry_after_header(self):
+        self.get_statuses(CREW_URL, 3)
+
+        response = self.client.get(CREW_URL)
+
+        self.assertEqual(response["Retry-After"], "20")
+
+    def test_view_scope_overrides_user_scope(self):
+        statuses = self.get_statuses(JOURNEY_URL, 6)
+
+        self.assertEqual(statuses[:5], [status.HTTP_200_OK] * 5)
+        self.assertEqual(statuses[5], status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.client.get(CREW_URL).status_code, 200)
+
+
+class SharedCacheTests(TestCase):
+    @override_settings(
+        DEBUG=False,
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+            }
+        },
+    )
+    def test_serve_refuses_process_local_cache(self):
+        with mock.patch(
+            "train_station.management.commands.serve.Server"
+        ) as server:
+            with self.assertRaises(CommandError):
+                call_command("serve", stdout=StringIO())
+
+        server.assert_not_called()
@@ -0,0 +1,135 @@
+import math
+
+from rest_framework.throttling import SimpleRateThrottle
+
+REFILL_LOCK_TIMEOUT = 5
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket with two integers of state per client: the number of
+    tokens taken since `epoch` and the epoch itself.
+
+    Tokens are taken with an atomic `incr` on the shared cache and the
+    refill is derived from the elapsed time, so every worker enforces the
+    same limit without rewriting a timestamp history on each request.
+    A rate of "30/minute" allows bursts of 30 requests, refilled at one
+    token every two seconds.
+    """
+
+    cache_format = "throttle_bucket_%(scope)s_%(ident)s"
+
+    def __init__(self):
+        super().__init__()
+        self.wait_seconds = None
+
+    @property
+    def refill_rate(self):
+        return self.num_requests / self.duration
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        epoch_key = f"{self.key}_epoch"
+        epoch = self.cache.get_or_set(epoch_key, self.now, self.ttl)
+
+        try:
+            taken = self.cache.incr(self.key)
+        except ValueError:
+            self.cache.add(self.key, 0, self.ttl)
+            taken = self.cache.incr(self.key)
+
+        level = taken - (self.now - epoch) * self.refill_rate
+
+        if level > self.num_requests:
+            self.cache.decr(self.key)
+            self.wait_seconds = (level - self.num_requests) / self.refill_rate
+            return self.throttle_failure()
+
+        if level < 1 or self.now - epoch > self.duration:
+            self.refill(epoch_key, epoch, taken, level)
+
+        return True
+
+    def refill(self, epoch_key, epoch, taken, level):
+        """
+        Moves the epoch forward and gives back the tokens refilled since,
+        so the counter stays small and an idle client cannot bank more
+        than a full bucket.
+
+        One request at a time refills a bucket, and only if nobody moved
+        the epoch since it was read. The counter is decremented rather
+        than set, which keeps the tokens that concurrent requests took.
+        """
+        lock_key = f"{self.key}_refill"
+        if not self.cache.add(lock_key, True, REFILL_LOCK_TIMEOUT):
+            return
+
+        try:
+            if self.cache.get(epoch_key) != epoch:
+                return
+            # The new epoch is written first, so a concurrent request sees
+            # an emptier bucket for a moment rather than a fuller one.
+            self.cache.set(epoch_key, self.now, self.ttl)
+            refilled = taken - max(math.ceil(level), 1)
+            if refilled > 0:
+                self.cache.decr(self.key, refilled)
+            self.cache.touch(self.key, self.ttl)
+        except ValueError:
+            # The counter expired meanwhile, the next request restarts it.
+            pass
+        finally:
+            self.cache.delete(lock_key)
+
+    @property
+    def ttl(self):
+        return 2 * self.duration
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class ScopedTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Uses the scope a view declares for the current action in
+    `throttle_scopes`, e.g. `{"create": "orders_create"}`, falling back to
+    the "user" or "anon" scope. Clients are identified by user id when
+    authenticated and by IP address otherwise.
+    """
+
+    def __init__(self):
+        # The rate is only known once the view is, see `allow_request`.
+        self.wait_seconds = None
+
+    @staticmethod
+    def get_view_scope(request, view):
+        throttle_scopes = getattr(view, "throttle_scopes", {})
+        scope = throttle_scopes.get(getattr(view, "action", None))
+
+        if scope:
+            return scope
+        if request.user and request.user.is_authenticated:
+            return "user"
+
+        return "anon"
+
+    def allow_request(self, request, view):
+        self.scope = self.get_view_scope(request, view)
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+
+        return self.cache_format % {"scope": self.scope, "ident": ident}
@@ -1,13 +1,18 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
+from train_station import async_views
 from train_station.views import (
+    AnalyticsViewSet,
     CrewViewSet,
+    FareViewSet,
     TrainTypeViewSet,
     StationViewSet,
     TrainViewSet,
     RouteViewSet,
     JourneyViewSet,
     OrderViewSet,
+    SlowQueryViewSet,
 )
 
 router = DefaultRouter()
@@ -19,8 +24,32 @@ router.register("routes", RouteViewSet)
 router.register("trains", TrainViewSet)
 router.register("journeys", JourneyViewSet)
 router.register("orders", OrderViewSet)
+router.register("analytics", AnalyticsViewSet, basename="analytics")
+router.register("slow-queries", SlowQueryViewSet)
+router.register("fares", FareViewSet, basename="fares")
 
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path(
+        "async/journeys/",
+        async_views.journey_list,
+        name="async-journey-list",
+    ),
+    path(
+        "async/journeys/<int:pk>/",
+        async_views.journey_detail,
+        name="async-journey-detail",
+    ),
+    path(
+        "async/journeys/<int:pk>/seats/",
+        async_views.journey_seats,
+        name="async-journey-seats",
+    ),
+    path(
+        "async/stations/",
+        async_views.station_create,
+        name="async-station-create",
+    ),
+]
 
 app_name = "train_station"
@@ -1,6 +1,7 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from django.db.models import Count, F
+from django.db.models import Q
+from django.utils import timezone
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import viewsets, mixins, status
@@ -10,16 +11,29 @@ from rest_framework.mixins import CreateModelMixin
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 
+from train_station.autocomplete import get_station_index
+from train_station.bulk import BulkCreateMixin
+from train_station.fieldsets import FIELDSET_PARAMETERS, SparseFieldsetMixin
+from train_station.geo import bounding_box, covering_geohashes, nearest
+from train_station.idempotency import IdempotentCreateMixin
+from train_station.images import (
+    delete_station_image_variants,
+    schedule_station_image_processing,
+)
 from train_station.models import (
+    BoardEntry,
     Crew,
     Station,
     Train,
     TrainType,
     Route,
     Order,
+    OrderSummary,
     Journey,
+    SlowQuery,
 )
 from train_station.pagintation import (
+    BoardPagination,
     StationPagination,
     CrewPagination,
     TrainTypePagination,
@@ -27,9 +41,11 @@ from train_station.pagintation import (
     TrainPagination,
     JourneyPagination,
     OrderPagination,
+    SlowQueryPagination,
 )
 from train_station.permissions import IsAdminOrIfAuthenticatedReadOnly
 from train_station.serializers import (
+    BoardEntrySerializer,
     CrewSerializer,
     StationSerializer,
     TrainTypeSerializer,
@@ -39,16 +55,23 @@ from train_station.serializers import (
     RouteDetailSerializer,
     TrainListRetrieveSerializer,
     OrderDetailSerializer,
-    OrderListSerializer,
+    OrderSummarySerializer,
     OrderSerializer,
     JourneyDetailSerializer,
     JourneyListSerializer,
     JourneySerializer,
     StationImageSerializer,
+    StationNearbySerializer,
+    StationSuggestionSerializer,
+    SlowQuerySerializer,
+    FareQuoteSerializer,
+    FareQuoteItemSerializer,
 )
 
 
 class StationViewSet(
+    SparseFieldsetMixin,
+    BulkCreateMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     CreateModelMixin,
@@ -58,12 +81,122 @@ class StationViewSet(
     serializer_class = StationSerializer
     pagination_class = StationPagination
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    throttle_scopes = {"board": "station_board"}
 
     def get_serializer_class(self):
         if self.action == "upload_image":
             return StationImageSerializer
+        if self.action == "nearby":
+            return StationNearbySerializer
+        if self.action == "autocomplete":
+            return StationSuggestionSerializer
+        if self.action == "board":
+            return BoardEntrySerializer
         return self.serializer_class
 
+    @staticmethod
+    def _param_to_float(query_params, name, default=None, bounds=None):
+        value = query_params.get(name, default)
+        if value is None:
+            raise ParseError(detail=f"Query parameter {name} is required.")
+        try:
+            value = float(value)
+        except ValueError:
+            raise ParseError(detail=f"{name} should be a number.")
+        if bounds and not bounds[0] <= value <= bounds[1]:
+            raise ParseError(
+                detail=f"{name} should be in range {bounds[0]} to {bounds[1]}."
+            )
+
+        return value
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "lat", description="Latitude", type=OpenApiTypes.FLOAT
+            ),
+            OpenApiParameter(
+                "lon", description="Longitude", type=OpenApiTypes.FLOAT
+            ),
+            OpenApiParameter(
+                "radius_km",
+                description="Search radius in kilometers (default 50)",
+                type=OpenApiTypes.FLOAT,
+            ),
+            OpenApiParameter(
+                "limit",
+                description="Number of stations to return (default 10)",
+                type=OpenApiTypes.INT,
+            ),
+        ]
+    )
+    @action(methods=["GET"], detail=False, url_path="nearby")
+    def nearby(self, request):
+        params = request.query_params
+        latitude = self._param_to_float(params, "lat", bounds=(-90, 90))
+        longitude = self._param_to_float(params, "lon", bounds=(-180, 180))
+        radius_km = self._param_to_float(
+            params, "radius_km", default=50, bounds=(0, 1000)
+        )
+        limit = int(self._param_to_float(params, "limit", 10, (1, 100)))
+
+        min_latitude, max_latitude, longitude_ranges = bounding_box(
+            latitude, longitude, radius_km
+        )
+        geohash_filter = Q()
+        for prefix in covering_geohashes(
+            min_latitude, max_latitude, longitude_ranges
+        ):
+            geohash_filter |= Q(geohash__startswith=prefix)
+        longitude_filter = Q()
+        for min_longitude, max_longitude in longitude_ranges:
+            longitude_filter |= Q(
+                longitude__range=(min_longitude, max_longitude)
+            )
+
+        candidates = Station.objects.filter(
+            geohash_filter,
+            longitude_filter,
+            latitude__range=(min_latitude, max_latitude),
+        ).values_list("id", "latitude", "longitude")
+        ranked = nearest(latitude, longitude, candidates, radius_km, limit)
+
+        stations = self.get_queryset().in_bulk([pk for pk, _ in ranked])
+        results = []
+        for pk, distance in ranked:
+            stations[pk].distance_km = round(distance, 3)
+            results.append(stations[pk])
+
+        serializer = self.get_serializer(results, many=True)
+        return Response(serializer.data)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "q",
+                description="Beginning of a station name or city",
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                "limit",
+                description="Number of stations to return (default 10)",
+                type=OpenApiTypes.INT,
+            ),
+        ]
+    )
+    @action(methods=["GET"], detail=False, url_path="autocomplete")
+    def autocomplete(self, request):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            raise ParseError(detail="Query parameter q is required.")
+        limit = int(
+            self._param_to_float(request.query_params, "limit", 10, (1, 50))
+        )
+
+        suggestions = get_station_index().suggest(query, limit)
+        serializer = self.get_serializer(suggestions, many=True)
+        return Response(serializer.data)
+
     @action(
         methods=["POST"],
         detail=True,
@@ -76,15 +209,47 @@ class StationViewSet(
 
         if serializer.is_valid():
             serializer.save()
+            delete_station_image_variants(station)
+            schedule_station_image_processing(station.id)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "kind",
+                description="departures (default) or arrivals",
+                type=OpenApiTypes.STR,
+            ),
+        ]
+    )
+    @action(
+        methods=["GET"],
+        detail=True,
+        url_path="board",
+        pagination_class=BoardPagination,
+    )
+    def board(self, request, pk=None):
+        kind = request.query_params.get("kind", "departures")
+        if kind not in ("departures", "arrivals"):
+            raise ParseError(detail="kind should be departures or arrivals.")
+
+        entries = BoardEntry.objects.filter(
+            station_id=self.get_object().id,
+            kind=kind.rstrip("s"),
+            time__gte=timezone.now(),
+        )
+        page = self.paginate_queryset(entries)
+        serializer = self.get_serializer(page, many=True)
+
+        return self.get_paginated_response(serializer.data)
+
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
 
-class CrewViewSet(viewsets.ModelViewSet):
+class CrewViewSet(SparseFieldsetMixin, BulkCreateMixin, viewsets.ModelViewSet):
     queryset = Crew.objects.all()
     serializer_class = CrewSerializer
     pagination_class = CrewPagination
@@ -92,6 +257,7 @@ class CrewViewSet(viewsets.ModelViewSet):
 
 
 class TrainTypeViewSet(
+    SparseFieldsetMixin,
     mixins.ListModelMixin,
     CreateModelMixin,
     mixins.UpdateModelMixin,
@@ -104,6 +270,8 @@ class TrainTypeViewSet(
 
 
 class RouteViewSet(
+    SparseFieldsetMixin,
+    BulkCreateMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.CreateModelMixin,
@@ -124,7 +292,9 @@ class RouteViewSet(
         return self.serializer_class
 
 
-class TrainViewSet(viewsets.ModelViewSet):
+class TrainViewSet(
+    SparseFieldsetMixin, BulkCreateMixin, viewsets.ModelViewSet
+):
     queryset = Train.objects.all()
     serializer_class = TrainSerializer
     pagination_class = TrainPagination
@@ -135,7 +305,7 @@ class TrainViewSet(viewsets.ModelViewSet):
         return [int(str_id) for str_id in qs.split(",")]
 
     def get_queryset(self):
-        queryset = self.queryset
+        queryset = super().get_queryset()
 
         train_type = self.request.query_params.get("train_type", None)
 
@@ -157,62 +327,70 @@ class TrainViewSet(viewsets.ModelViewSet):
                 "train_type",
                 description="Filter by train type",
                 type=OpenApiTypes.STR,
-            )
+            ),
+            *FIELDSET_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
         return super().list(self, request, *args, **kwargs)
 
 
-class JourneyViewSet(viewsets.ModelViewSet):
-    queryset = (
-        Journey.objects.all()
-        .select_related("route", "train")
-        .annotate(
-            tickets_available=(
-                F("train__cargo_number") * F("train__places_in_cargo")
-                - Count("tickets")
-            )
-        )
-    )
-    serializer_class = JourneySerializer
-    pagination_class = JourneyPagination
-    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+def filter_journeys(queryset, query_params):
+    source = query_params.get("source", None)
+    destination = query_params.get("destination", None)
+    departure_date = query_params.get("date", None)
+    departure_time = query_params.get("time", None)
 
-    def get_queryset(self):
-        queryset = self.queryset
+    if source or destination:
+        index = get_station_index()
 
-        source = self.request.query_params.get("source", None)
-        destination = self.request.query_params.get("destination", None)
-        departure_date = self.request.query_params.get("date", None)
-        departure_time = self.request.query_params.get("time", None)
+    if source:
+        queryset = queryset.filter(route__source__in=index.resolve(source))
 
-        if source:
-            queryset = queryset.filter(route__source__name__icontains=source)
+    if destination:
+        queryset = queryset.filter(
+            route__destination__in=index.resolve(destination)
+        )
 
-        if destination:
-            queryset = queryset.filter(
-                route__destination__name__icontains=destination
+    if departure_date:
+        try:
+            date = datetime.strptime(departure_date, "%Y-%m-%d").date()
+        except ValueError:
+            raise ParseError(
+                detail="Invalid date format. Please use YYYY-MM-DD."
             )
-
-        if departure_date:
+        start = datetime.combine(date, datetime.min.time())
+        period = timedelta(days=1)
+        if departure_time:
             try:
-                date = datetime.strptime(departure_date, "%Y-%m-%d").date()
+                time = datetime.strptime(departure_time, "%H:%M").time()
             except ValueError:
                 raise ParseError(
-                    detail="Invalid date format. Please use YYYY-MM-DD."
+                    detail="Invalid time format. Please use HH:MM."
                 )
-            queryset = queryset.filter(departure_time__date=date)
-            if departure_time:
-                try:
-                    time = datetime.strptime(departure_time, "%H:%M").time()
-                except ValueError:
-                    raise ParseError(
-                        detail="Invalid time format. Please use HH:MM."
-                    )
-                queryset = queryset.filter(departure_time__time=time)
+            start = datetime.combine(date, time)
+            period = timedelta(minutes=1)
+        # A range on the partition key, unlike __date or __time, lets
+        # PostgreSQL prune the journey partitions.
+        start = timezone.make_aware(start)
+        queryset = queryset.filter(
+            departure_time__gte=start, departure_time__lt=start + period
+        )
+
+    return queryset.distinct()
+
 
-        return queryset.distinct()
+class JourneyViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
+    queryset = Journey.objects.all()
+    serializer_class = JourneySerializer
+    pagination_class = JourneyPagination
+    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    throttle_scopes = {"list": "journey_search"}
+
+    def get_queryset(self):
+        return filter_journeys(
+            super().get_queryset(), self.request.query_params
+        )
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -227,12 +405,12 @@ class JourneyViewSet(viewsets.ModelViewSet):
         parameters=[
             OpenApiParameter(
                 "source",
-                description="Filter by source",
+                description="Filter by source station name or city",
                 type=OpenApiTypes.STR,
             ),
             OpenApiParameter(
                 "destination",
-                description="Filter by destination",
+                description="Filter by destination station name or city",
                 type=OpenApiTypes.STR,
             ),
             OpenApiParameter(
@@ -245,6 +423,7 @@ class JourneyViewSet(viewsets.ModelViewSet):
                 description="Filter by time",
                 type=OpenApiTypes.TIME,
             ),
+            *FIELDSET_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
@@ -252,6 +431,8 @@ class JourneyViewSet(viewsets.ModelViewSet):
 
 
 class OrderViewSet(
+    SparseFieldsetMixin,
+    IdempotentCreateMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.CreateModelMixin,
@@ -261,9 +442,18 @@ class OrderViewSet(
     serializer_class = OrderSerializer
     pagination_class = OrderPagination
     permission_classes = (IsAuthenticated,)
+    throttle_scopes = {"create": "orders_create"}
 
     def get_queryset(self):
-        queryset = self.queryset.filter(user=self.request.user)
+        if self.action == "list":
+            return self.get_summary_queryset()
+
+        return super().get_queryset().filter(user_id=self.request.user.id)
+
+    def get_summary_queryset(self):
+        queryset = OrderSummary.objects.filter(
+            user_id=self.request.user.id
+        ).order_by("-first_departure", "-order_id")
 
         departure_date = self.request.query_params.get("date", None)
         departure_time = self.request.query_params.get("time", None)
@@ -271,29 +461,25 @@ class OrderViewSet(
         if departure_date:
             try:
                 date = datetime.strptime(departure_date, "%Y-%m-%d").date()
-                queryset = queryset.filter(
-                    tickets_journey__departure_time__date=date
-                )
             except ValueError:
                 raise ParseError(
                     detail="Invalid date format. Please use YYYY-MM-DD."
                 )
+            queryset = queryset.filter(first_departure__date=date)
             if departure_time:
                 try:
                     time = datetime.strptime(departure_time, "%H:%M").time()
-                    queryset = queryset.filter(
-                        tickets__journey__departure_time__time=time
-                    )
                 except ValueError:
                     raise ParseError(
                         detail="Invalid time format. Please use HH:MM."
                     )
+                queryset = queryset.filter(first_departure__time=time)
 
         return queryset
 
     def get_serializer_class(self):
         if self.action == "list":
-            return OrderListSerializer
+            return OrderSummarySerializer
 
         if self.action == "retrieve":
             return OrderDetailSerializer
@@ -301,7 +487,7 @@ class OrderViewSet(
         return self.serializer_class
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        serializer.save(user_id=self.request.user.id)
 
     @extend_schema(
         parameters=[
@@ -315,7 +501,133 @@ class OrderViewSet(
                 description="Filter by time",
                 type=OpenApiTypes.TIME,
             ),
+            *FIELDSET_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
         return super().list(self, request, *args, **kwargs)
+
+
+class AnalyticsViewSet(viewsets.ViewSet):
+    permission_classes = (IsAdminUser,)
+
+    @staticmethod
+    def _param_to_date(query_params, name):
+        value = query_params.get(name, None)
+        if value is None:
+            raise ParseError(detail=f"Query parameter {name} is required.")
+        try:
+            return datetime.strptime(value, "%Y-%m-%d").date()
+        except ValueError:
+            raise ParseError(
+                detail="Invalid date format. Please use YYYY-MM-DD."
+            )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "start",
+                description="First departure day",
+                type=OpenApiTypes.DATE,
+            ),
+            OpenApiParameter(
+                "end",
+                description="Last departure day",
+                type=OpenApiTypes.DATE,
+            ),
+            OpenApiParameter(
+                "group_by",
+                description="route (default), train_type or day",
+                type=OpenApiTypes.STR,
+            ),
+        ],
+        responses=OpenApiTypes.OBJECT,
+    )
+    @action(methods=["GET"], detail=False, url_path="occupancy")
+    def occupancy(self, request):
+        # numpy is only loaded by the workers that serve reports.
+        from train_station import analytics
+
+        start = self._param_to_date(request.query_params, "start")
+        end = self._param_to_date(request.query_params, "end")
+        group_by = request.query_params.get("group_by", "route")
+
+        if group_by not in analytics.GROUP_BY_CHOICES:
+            raise ParseError(
+                detail="group_by should be route, train_type or day."
+            )
+        if not 0 <= (end - start).days < analytics.MAX_REPORT_DAYS:
+            raise ParseError(
+                detail="end should be after start and at most "
+                f"{analytics.MAX_REPORT_DAYS} days later."
+            )
+
+        return Response(analytics.occupancy_report(start, end, group_by))
+
+
+class FareViewSet(viewsets.ViewSet):
+    permission_classes = (IsAuthenticated,)
+
+    @extend_schema(
+        request=FareQuoteSerializer,
+        responses=FareQuoteItemSerializer(many=True),
+    )
+    @action(methods=["POST"], detail=False, url_path="quote")
+    def quote(self, request):
+        # numpy is only loaded by the workers that price journeys.
+        from train_station.fares import quote_seats
+
+        serializer = FareQuoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        quotes, errors = quote_seats(serializer.validated_data["items"])
+        if errors:
+            return Response(
+                {"items": errors}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(FareQuoteItemSerializer(quotes, many=True).data)
+
+
+class SlowQueryViewSet(
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    queryset = SlowQuery.objects.all()
+    serializer_class = SlowQuerySerializer
+    pagination_class = SlowQueryPagination
+    permission_classes = (IsAdminUser,)
+
+    def get_queryset(self):
+        queryset = self.queryset
+        view_name = self.request.query_params.get("view", None)
+        min_duration = self.request.query_params.get("min_ms", None)
+
+        if view_name:
+            queryset = queryset.filter(view_name=view_name)
+        if min_duration:
+            try:
+                queryset = queryset.filter(
+                    duration_ms__gte=float(min_duration)
+                )
+            except ValueError:
+                raise ParseError(detail="min_ms should be a number.")
+
+        return queryset
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "view",
+                description="Filter by view, e.g. JourneyViewSet.list",
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                "min_ms",
+                description="Filter by minimal duration in milliseconds",
+                type=OpenApiTypes.NUMBER,
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS
+
+# Cache backends whose entries only the process that wrote them sees.
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def cache_is_shared(alias=DEFAULT_CACHE_ALIAS):
+    """
+    Throttling buckets and revoked tokens are only shared by workers in
+    such a cache.
+    """
+    return settings.CACHES[alias]["BACKEND"] not in PROCESS_LOCAL_CACHES
@@ -16,6 +16,12 @@ from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
+
+
+def env_bool(name, default=False):
+    return os.environ.get(name, str(default)).lower() in ("1", "true", "yes")
+
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -26,12 +32,14 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = os.environ.get("SECRET_KEY")
 
+# "production" turns debug off and keeps database connections open
+DJANGO_ENV = os.environ.get("DJANGO_ENV", "development")
+PRODUCTION = DJANGO_ENV == "production"
+
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = env_bool("DJANGO_DEBUG", default=not PRODUCTION)
 
-ALLOWED_HOSTS = [
-    "0.0.0.0",
-]
+ALLOWED_HOSTS = os.environ.get("ALLOWED_HOSTS", "0.0.0.0").split(",")
 
 INTERNAL_IPS = [
     "127.0.0.1",
@@ -53,11 +61,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "train_station.metrics.MetricsMiddleware",
+    "train_station.slow_queries.SlowQueryMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "train_station.profiling.ProfilingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -93,10 +104,34 @@ DATABASES = {
         "USER": os.environ.get("POSTGRES_USER"),
         "PASSWORD": os.environ.get("POSTGRES_PASSWORD"),
         "HOST": os.environ.get("POSTGRES_HOST"),
+        "CONN_MAX_AGE": int(
+            os.environ.get("CONN_MAX_AGE", 600 if PRODUCTION else 0)
+        ),
+        "CONN_HEALTH_CHECKS": PRODUCTION,
     }
 }
 
 
+# Cache
+# Throttling state must be shared by all workers, so use Redis when
+# REDIS_URL is set; `manage.py serve` refuses to start without it when
+# DEBUG is off.
+
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -145,6 +180,12 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "ROTATE_REFRESH_TOKENS": True,
+    "TOKEN_OBTAIN_SERIALIZER": (
+        "user.serializers.ClaimsTokenObtainPairSerializer"
+    ),
+    "TOKEN_REFRESH_SERIALIZER": (
+        "user.serializers.DenyListTokenRefreshSerializer"
+    ),
 }
 
 DRF_SPECTACULAR_SETTINGS = {
@@ -163,14 +204,91 @@ DRF_SPECTACULAR_SETTINGS = {
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "train_station.throttling.ScopedTokenBucketThrottle",
     ],
-    "DEFAULT_THROTTLE_RATES": {"anon": "10/minute", "user": "30/minute"},
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": "10/minute",
+        "user": "30/minute",
+        "orders_create": "5/minute",
+        "journey_search": "120/minute",
+        "station_board": "240/minute",
+    },
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.ClaimsJWTAuthentication",
+    ),
+}
+
+# Worker pool used by `manage.py serve`
+SERVER = {
+    "BIND": os.environ.get("SERVER_BIND", "0.0.0.0:8000"),
+    "WORKERS": int(
+        os.environ.get("SERVER_WORKERS", 2 * (os.cpu_count() or 1) + 1)
+    ),
+    "THREADS": int(os.environ.get("SERVER_THREADS", 4)),
+    "ASGI": env_bool("SERVER_ASGI"),
+    "KEEPALIVE": int(os.environ.get("SERVER_KEEPALIVE", 5)),
+    "TIMEOUT": int(os.environ.get("SERVER_TIMEOUT", 30)),
+    "GRACEFUL_TIMEOUT": int(os.environ.get("SERVER_GRACEFUL_TIMEOUT", 30)),
+    "MAX_REQUESTS": int(os.environ.get("SERVER_MAX_REQUESTS", 2000)),
+    "MAX_REQUESTS_JITTER": int(
+        os.environ.get("SERVER_MAX_REQUESTS_JITTER", 200)
     ),
+    "PRELOAD": env_bool("SERVER_PRELOAD"),
+}
+
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+
+# Journeys that arrived longer ago are moved to the archive tables.
+JOURNEY_ARCHIVE_AFTER = timedelta(days=90)
+
+# Number of staff request profiles kept, see train_station.profiling.
+REQUEST_PROFILE_LIMIT = int(os.environ.get("REQUEST_PROFILE_LIMIT", 200))
+
+# Queries of a request taking at least SLOW_QUERY_THRESHOLD are logged,
+# the last SLOW_QUERY_LIMIT are kept and on PostgreSQL a share of
+# SLOW_QUERY_EXPLAIN_RATE is explained, see train_station.slow_queries.
+SLOW_QUERY_THRESHOLD = timedelta(
+    milliseconds=int(os.environ.get("SLOW_QUERY_THRESHOLD_MS", 200))
+)
+SLOW_QUERY_LIMIT = int(os.environ.get("SLOW_QUERY_LIMIT", 1000))
+SLOW_QUERY_EXPLAIN_RATE = float(
+    os.environ.get("SLOW_QUERY_EXPLAIN_RATE", 0.1)
+)
+
+# Import time allowed for a worker boot, see `manage.py importtime`.
+IMPORT_TIME_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", 800))
+
+# Every kilometer is charged at the rate of its distance band (upper
+# bound in km, rate per km), then the train type multiplier and the surge
+# of the highest share of seats sold reached apply, see train_station.fares.
+FARE_TARIFF = {
+    "currency": "UAH",
+    "minimum": 25.0,
+    "bands": ((100, 1.5), (500, 1.1), (None, 0.8)),
+    "train_type_multipliers": {"Intercity": 1.4, "Night": 1.2},
+    "surge": ((0.7, 1.15), (0.9, 1.35)),
 }
 
+# Bulk station creation reverse geocodes with at most GEOCODING_CONCURRENCY
+# requests in flight, started GEOCODING_MIN_DELAY_SECONDS apart as the
+# public Nominatim asks; lower the delay for a self-hosted instance.
+GEOCODING_CONCURRENCY = int(os.environ.get("GEOCODING_CONCURRENCY", 4))
+GEOCODING_MIN_DELAY_SECONDS = float(
+    os.environ.get("GEOCODING_MIN_DELAY_SECONDS", 1.0)
+)
+
+# Bearer token Prometheus has to send to /metrics; without it, /metrics
+# is only served when DEBUG is on.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
 MEDIA_ROOT = "/vol/web/media/"
 MEDIA_URL = "/media/"
+
+# Uploads are always streamed to a temporary file in chunks
+FILE_UPLOAD_HANDLERS = [
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+
+STATION_IMAGE_VARIANT_WIDTHS = (160, 480, 1024)
+STATION_IMAGE_VARIANT_FORMATS = ("webp", "jpeg")
+STATION_IMAGE_WORKERS = int(os.environ.get("STATION_IMAGE_WORKERS", 2))
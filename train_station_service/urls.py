@@ -18,15 +18,21 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+
+from train_station.health import liveness, readiness
+from train_station.lazy import lazy_view
+from train_station.metrics import metrics_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics", metrics_view, name="metrics"),
+    path("health/live", liveness, name="health-live"),
+    path("health/ready", readiness, name="health-ready"),
     path(
         "api/train_station/",
         include("train_station.urls", namespace="train_station"),
          ),
     path("api/user/", include("user.urls", namespace="user")),
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('api/schema/swagger/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+    path('api/schema/', lazy_view("drf_spectacular.views.SpectacularAPIView"), name='schema'),
+    path('api/schema/swagger/', lazy_view("drf_spectacular.views.SpectacularSwaggerView", url_name='schema'), name='swagger-ui'),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
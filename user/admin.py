@@ -2,8 +2,11 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
 from django.utils.translation import gettext as _
 
+from .authentication import revoke_user_tokens
 from .models import User
 
+REVOKING_FIELDS = {"password", "is_active", "is_staff", "is_superuser"}
+
 
 @admin.register(User)
 class UserAdmin(DjangoUserAdmin):
@@ -36,3 +39,15 @@ class UserAdmin(DjangoUserAdmin):
     list_display = ("email", "first_name", "last_name", "is_staff")
     search_fields = ("email", "first_name", "last_name")
     ordering = ("email",)
+    actions = ("revoke_tokens",)
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+
+        if change and REVOKING_FIELDS.intersection(form.changed_data):
+            revoke_user_tokens(obj.id)
+
+    @admin.action(description=_("Revoke issued tokens"))
+    def revoke_tokens(self, request, queryset):
+        for user_id in queryset.values_list("id", flat=True):
+            revoke_user_tokens(user_id)
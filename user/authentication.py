@@ -0,0 +1,117 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from django.utils.translation import gettext as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+# The deny-list must be in a cache shared by all workers, see
+# `user.checks` and `manage.py serve`.
+REVOKED_USER_KEY = "jwt_revoked_user_%s"
+REVOKED_TOKEN_KEY = "jwt_revoked_token_%s"
+
+
+def get_deny_list_timeout():
+    lifetimes = (
+        api_settings.ACCESS_TOKEN_LIFETIME,
+        api_settings.REFRESH_TOKEN_LIFETIME,
+    )
+    return int(max(lifetimes).total_seconds())
+
+
+def revoke_user_tokens(user_id):
+    cache.set(
+        REVOKED_USER_KEY % user_id, int(time.time()), get_deny_list_timeout()
+    )
+
+
+def revoke_token(token):
+    remaining = int(token["exp"] - time.time())
+
+    if remaining > 0:
+        cache.set(
+            REVOKED_TOKEN_KEY % token[api_settings.JTI_CLAIM], True, remaining
+        )
+
+
+def check_not_revoked(token):
+    user_key = REVOKED_USER_KEY % token.get(api_settings.USER_ID_CLAIM)
+    token_key = REVOKED_TOKEN_KEY % token.get(api_settings.JTI_CLAIM)
+    revoked = cache.get_many((user_key, token_key))
+    # "iat" has one second resolution, so tokens issued in the second of
+    # the revocation are rejected as well.
+    user_revoked_at = revoked.get(user_key, -1)
+
+    if token_key in revoked or token.get("iat", 0) <= user_revoked_at:
+        raise AuthenticationFailed(
+            _("Token has been revoked."), code="token_revoked"
+        )
+
+
+class ClaimsUser(TokenUser):
+    """
+    User built from the `user_id`, `email` and `is_staff` token claims.
+
+    The `user.models.User` row is only loaded when something reads an
+    attribute that the token does not carry, or asks for `instance`.
+    """
+
+    @cached_property
+    def instance(self):
+        return get_user_model().objects.get(pk=self.id)
+
+    @cached_property
+    def email(self):
+        return self._claim_or_field("email")
+
+    @cached_property
+    def is_staff(self):
+        return self._claim_or_field("is_staff")
+
+    @cached_property
+    def is_superuser(self):
+        return self._claim_or_field("is_superuser")
+
+    def _claim_or_field(self, name):
+        if name in self.token:
+            return self.token[name]
+
+        return getattr(self.instance, name)
+
+    def __str__(self):
+        return self.email
+
+    def __getattr__(self, attr):
+        if attr in self.token:
+            return self.token[attr]
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+
+        return getattr(self.instance, attr)
+
+
+def get_user_instance(user):
+    return getattr(user, "instance", user)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        check_not_revoked(validated_token)
+
+        return validated_token
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+
+        return ClaimsUser(validated_token)
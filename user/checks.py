@@ -0,0 +1,22 @@
+from django.core.checks import Error, Tags, register
+
+from train_station_service.caches import cache_is_shared
+
+
+@register(Tags.security, Tags.caches, deploy=True)
+def check_deny_list_cache(app_configs, **kwargs):
+    """
+    Revoked tokens are only rejected by every worker when the deny-list
+    lives in a cache shared between processes.
+    """
+    if cache_is_shared():
+        return []
+
+    return [
+        Error(
+            "Revoked JWTs are kept in a process-local cache, so the other "
+            "workers keep accepting them.",
+            hint="Set REDIS_URL to share the cache between workers.",
+            id="user.E001",
+        )
+    ]
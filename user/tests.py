@@ -1,3 +1,79 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from train_station.tests.samples import CREW_URL, STATION_URL, sample_user
+from user.checks import check_deny_list_cache
+
+TOKEN_URL = reverse("user:token_obtain_pair")
+TOKEN_REFRESH_URL = reverse("user:token_refresh")
+ME_URL = reverse("user:manage")
+
+
+class ClaimsJWTAuthenticationTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = sample_user()
+        self.tokens = self.client.post(
+            TOKEN_URL, {"email": "user@test.com", "password": "Password123"}
+        ).data
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}"
+        )
+
+    def test_read_endpoint_does_not_load_user(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(CREW_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_staff_claim_is_used_for_permissions(self):
+        response = self.client.post(STATION_URL, {})
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_full_user_loaded_when_needed(self):
+        response = self.client.patch(ME_URL, {"email": "new@test.com"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.email, "new@test.com")
+
+    def test_password_change_revokes_tokens(self):
+        self.client.patch(ME_URL, {"password": "NewPassword123"})
+
+        response = self.client.get(CREW_URL)
+        refresh = self.client.post(
+            TOKEN_REFRESH_URL, {"refresh": self.tokens["refresh"]}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(refresh.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class DenyListCacheCheckTests(TestCase):
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+            }
+        }
+    )
+    def test_process_local_cache_rejected(self):
+        errors = check_deny_list_cache(None)
+
+        self.assertEqual([error.id for error in errors], ["user.E001"])
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.redis.RedisCache",
+                "LOCATION": "redis://localhost:6379/0",
+            }
+        }
+    )
+    def test_shared_cache_accepted(self):
+        self.assertEqual(check_deny_list_cache(None), [])